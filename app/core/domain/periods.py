@@ -0,0 +1,59 @@
+"""Ignition state machines for ``periodosactivo`` and ``periodosconductores``.
+
+Pure transition functions replicating the stored procedure; the service
+applies the resulting step through the ``PeriodRepository`` port.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.domain.entities import PeriodoActivo, PeriodoConductor
+
+IGNITION_ON = 5
+IGNITION_OFF = 6
+
+# A driver period closed less than this before an ignition-on is reopened
+REOPEN_WINDOW = timedelta(minutes=1)
+
+START = "start"
+CLOSE = "close"
+
+
+def active_period_step(
+    active: Optional[PeriodoActivo], event_code: int, vehicle_on: Optional[bool]
+) -> Optional[str]:
+    """``start`` when the vehicle is on without an open period, ``close``
+    when it is off with one, else ``None``."""
+    is_open = active is not None and active.fechahasta is None
+    if (vehicle_on or event_code == IGNITION_ON) and not is_open:
+        return START
+    if (not vehicle_on or event_code == IGNITION_OFF) and is_open:
+        return CLOSE
+    return None
+
+
+@dataclass(frozen=True)
+class DriverPeriodStep:
+    reopen: Optional[int] = None  # idperiodo whose fechahasta goes back to NULL
+    close: Optional[int] = None  # idperiodo closed at the event date
+    start: bool = False  # Open a new period at the event date
+
+
+def driver_period_step(
+    last: Optional[PeriodoConductor], event_code: int, at: datetime
+) -> DriverPeriodStep:
+    """Transition for an ignition event given the driver's latest period.
+
+    On: reopen a period closed within ``REOPEN_WINDOW``; otherwise close
+    one left open (a missed off) and start a new one. Off: close the open
+    period.
+    """
+    if last is not None and last.fechahasta is not None:
+        if event_code == IGNITION_ON and at - last.fechahasta < REOPEN_WINDOW:
+            return DriverPeriodStep(reopen=last.idperiodo)
+        last = None  # Closed for good; behaves as if there were none
+    close = last.idperiodo if last is not None else None
+    if event_code == IGNITION_ON:
+        return DriverPeriodStep(close=close, start=True)
+    return DriverPeriodStep(close=close)
@@ -1,7 +1,25 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Awaitable
 from app.core.domain.entities import VehicleEvent
 
 class EventPublisher(ABC):
     @abstractmethod
     async def publish_processed_event(self, event: VehicleEvent):
-        pass
\ No newline at end of file
+        pass
+
+    async def flush(self):
+        """Waits until previously published events are handed to the broker."""
+        pass
+
+    async def enqueue(self, event: VehicleEvent) -> Awaitable[None]:
+        """Hands the event over and returns its delivery.
+
+        Raises when the event cannot be handed over; awaiting the delivery
+        raises when the broker did not acknowledge it. Publishers without
+        acknowledgements deliver on hand-over.
+        """
+        await self.publish_processed_event(event)
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
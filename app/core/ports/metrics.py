@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+
+
+class MetricsRecorder(ABC):
+    @abstractmethod
+    def observe_stage(
+        self, stage: str, seconds: float, event_type: int, event_code: int
+    ):
+        """Records how long a processing stage took for an event."""
+        pass
+
+
+class NoOpMetricsRecorder(MetricsRecorder):
+    def observe_stage(
+        self, stage: str, seconds: float, event_type: int, event_code: int
+    ):
+        pass
@@ -78,6 +78,10 @@ class PeriodRepository(ABC):
     @abstractmethod
     async def update_periodo_conductor_end_date(self, period_id: int, end_date: datetime):
         pass
+
+    @abstractmethod
+    async def create_periodo_conductor(self, vehicle_id: str, driver_id: int, start_date: datetime) -> int:
+        pass
     
     @abstractmethod
     async def deactivate_current_driver(self, vehicle_id: str, driver_id: int):
@@ -89,7 +93,9 @@ class SpecialRouteRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_nearby_special_route_detail(self, route_id: int, latitude: float, longitude: float) -> Optional[RutaEspecialDetalle]:
+    async def get_nearby_special_route_detail(self, route_id: int, latitude: float, longitude: float, programacion_id: Optional[int] = None) -> Optional[RutaEspecialDetalle]:
+        """Closest point of the route within its radius, skipping the points
+        already registered for ``programacion_id``."""
         pass
         
     @abstractmethod
@@ -1,14 +1,22 @@
+import asyncio
+import logging
 import math
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta, date
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from app.core.domain.entities import VehicleEvent, Vehicle, EventoDescripcion, GeolocationInfo, \
     PeriodoActivo, PeriodoConductor, ProgramacionEspecialVehiculo, RutaEspecialDetalle, RutaEspecialControl, EventoResumen
+from app.core.domain.periods import CLOSE, START, active_period_step, driver_period_step
 from app.core.domain.services import GeolocationService
 from app.core.ports.repositories import (
     VehicleEventRepository, VehicleRepository, PeriodRepository, SpecialRouteRepository
 )
 from app.core.ports.event_publisher import EventPublisher
+from app.core.ports.metrics import MetricsRecorder, NoOpMetricsRecorder
+
+logger = logging.getLogger(__name__)
 
 # Helper functions for calculations (can be moved to a utilities module if many)
 def _parse_coord_string(coord_str: str) -> Optional[float]:
@@ -65,7 +73,9 @@ class VehicleEventProcessorService:
         period_repo: PeriodRepository,
         special_route_repo: SpecialRouteRepository,
         geolocation_service: GeolocationService,
-        event_publisher: EventPublisher
+        event_publisher: EventPublisher,
+        metrics: Optional[MetricsRecorder] = None,
+        concurrent_lookups: bool = False
     ):
         self.vehicle_event_repo = vehicle_event_repo
         self.vehicle_repo = vehicle_repo
@@ -73,14 +83,52 @@ class VehicleEventProcessorService:
         self.special_route_repo = special_route_repo
         self.geolocation_service = geolocation_service
         self.event_publisher = event_publisher
+        self.metrics = metrics or NoOpMetricsRecorder()
+        # Only when the repositories don't share one session for lookups
+        self.concurrent_lookups = concurrent_lookups
+
+    async def _lookup(self, name: str, event: VehicleEvent, call: Callable[[], Awaitable[Any]]) -> Any:
+        with self._stage(name, event):
+            return await call()
+
+    async def _run_lookups(self, event: VehicleEvent, lookups: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+        """Runs read-only lookups that don't depend on each other.
+
+        Concurrently when the adapters were built for it (each lookup on its
+        own connection); one at a time otherwise, since a single session
+        can't run two statements at once. If one fails the others are
+        cancelled and its original exception propagates.
+        """
+        if not self.concurrent_lookups:
+            return {name: await self._lookup(name, event, call) for name, call in lookups.items()}
+        tasks = {name: asyncio.ensure_future(self._lookup(name, event, call)) for name, call in lookups.items()}
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
+
+    @contextmanager
+    def _stage(self, name: str, event: VehicleEvent):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.metrics.observe_stage(name, time.perf_counter() - start, event.event_type, event.event_code)
 
     async def process_event(self, event: VehicleEvent) -> str:
         # Simulate time init
         time_init = datetime.now()
 
         # 1. Get Vehicle Info
-        vehicle = await self.vehicle_repo.get_active_vehicle_by_id(event.vehicle_id)
+        with self._stage("vehicle_lookup", event):
+            vehicle = await self.vehicle_repo.get_active_vehicle_by_id(event.vehicle_id)
         if not vehicle:
+            time_taken = (datetime.now() - time_init).total_seconds()
+            self.metrics.observe_stage("total", time_taken, event.event_type, event.event_code)
             return f"{event.vehicle_id} INACTIVO"
 
         result_message = ""
@@ -97,15 +145,36 @@ class VehicleEventProcessorService:
            (event.processed_date.date() < (datetime.now() - timedelta(days=1)).date()):
             event.processed_date = datetime.now()
 
-        # 4. Geocoding (getdireccion logic)
+        # 4-5. Independent lookups. They only need the vehicle row and the
+        # event, so they can run concurrently; every write below stays on the
+        # request transaction.
+        has_modem_address = bool(event.address and event.city and event.department)
+        has_gps = not (event.processed_latitude is None or event.processed_longitude is None
+                       or event.processed_latitude == 0.0 or event.processed_longitude == 0.0)
+        full_event = event.event_type in (0, 300) and event.event_code != 1
+        lookups = {
+            "tolerance_lookup": lambda: self.vehicle_repo.get_vehicle_tolerancia_tiempo(vehicle.contratista),
+        }
+        if not has_modem_address and event.processed_latitude and event.processed_longitude:
+            lookups["geocoding"] = lambda: self.geolocation_service.get_address_from_coords(
+                event.processed_latitude, event.processed_longitude
+            )
+        if full_event:
+            lookups["event_description"] = lambda: self.vehicle_event_repo.find_evento_descripcion(event.event_code)
+            lookups["period_lookup"] = lambda: self.period_repo.get_active_periodo(vehicle.ultperiodo)
+            if has_gps:
+                lookups["special_route_lookup"] = lambda: self.special_route_repo.get_active_special_programacion_for_vehicle(
+                    event.vehicle_id, datetime.now() # SP uses localtimestamp for this check
+                )
+        found = await self._run_lookups(event, lookups)
+
+        # Geocoding (getdireccion logic)
         # Prioritize modem-provided address, then use geocoding service
         geolocation_info = None
-        if event.address and event.city and event.department:
+        if has_modem_address:
             geolocation_info = GeolocationInfo(address=event.address, city=event.city, department=event.department)
-        elif event.processed_latitude and event.processed_longitude:
-            geolocation_info = await self.geolocation_service.get_address_from_coords(
-                event.processed_latitude, event.processed_longitude
-            )
+        elif "geocoding" in found:
+            geolocation_info = found["geocoding"]
             # If geocoding service returns nothing, and initial values were provided by modem, use them.
             # This is to replicate the SP's "if direccion_ is null OR direccion_.direccion IS NULL..." part
             if not geolocation_info or not geolocation_info.is_valid():
@@ -123,13 +192,14 @@ class VehicleEventProcessorService:
              # This part might need to be adjusted based on the `getdireccion` function's actual behavior
              # and if `EjesViales` table is meant for caching geocoding results.
              if event.address and event.city and event.department and event.processed_latitude and event.processed_longitude:
-                await self.vehicle_event_repo.insert_ejes_viales(
-                    event.address, event.city, event.processed_latitude, event.processed_longitude, event.department
-                )
+                with self._stage("ejes_viales_insert", event):
+                    await self.vehicle_event_repo.insert_ejes_viales(
+                        event.address, event.city, event.processed_latitude, event.processed_longitude, event.department
+                    )
 
 
-        # 5. Apply time tolerance based on 'Procesos'
-        tolerancia_minutes = await self.vehicle_repo.get_vehicle_tolerancia_tiempo(vehicle.contratista)
+        # Apply time tolerance based on 'Procesos'
+        tolerancia_minutes = found["tolerance_lookup"]
         if tolerancia_minutes:
             event.processed_date += timedelta(minutes=tolerancia_minutes)
 
@@ -162,7 +232,7 @@ class VehicleEventProcessorService:
                     result_message += "Se ha actualizado la info GPS a partir de la ultima info valida@\n"
                 
                 # Check if event is static
-                event_desc = await self.vehicle_event_repo.find_evento_descripcion(event.event_code)
+                event_desc = found["event_description"]
                 if event_desc and event_desc.estatico == 'S' or event.processed_speed < 0.0:
                     event.is_static_event = True
                     event.processed_speed = 0.0
@@ -188,58 +258,64 @@ class VehicleEventProcessorService:
                 # Determine current driver
                 event.current_driver_id = vehicle.idconductor_actual if vehicle.idconductor_actual else vehicle.idconductor
 
-                # Manage active periods (periodosactivo)
-                active_period = await self.period_repo.get_active_periodo(vehicle.ultperiodo)
-
-                if (event.vehicle_on or event.event_code == 5) and (not active_period or active_period.fechahasta is not None):
-                    # Start a new period
-                    event.period_id = await self.period_repo.create_periodo_activo(
-                        event.vehicle_id, event.processed_date, event.current_driver_id
-                    )
-                    vehicle.ultperiodo = event.period_id
-                elif (not event.vehicle_on or event.event_code == 6) and (active_period and active_period.fechahasta is None):
-                    # End current period
-                    await self.period_repo.update_periodo_activo_end_date(vehicle.ultperiodo, event.processed_date)
-                
-                # Driver Period Reset Logic (periodosconductores)
-                if reset_periodo_conductor:
-                    last_driver_period = await self.period_repo.get_last_periodo_conductor_for_reset(
-                        event.vehicle_id, event.current_driver_id, event.processed_date
-                    )
-                    if last_driver_period and (event.processed_date - last_driver_period.fechahasta < timedelta(minutes=1)) and event.event_code == 5:
-                        await self.period_repo.update_periodo_conductor_end_date(last_driver_period.idperiodo, None) # Set fechahasta to NULL
-                    else:
-                        if last_driver_period and last_driver_period.fechahasta is None:
-                            await self.period_repo.update_periodo_conductor_end_date(last_driver_period.idperiodo, event.processed_date)
-                        
-                        # Logic to set idconductor_actual to NULL
-                        # This part of the SP is conditional: "IF (COALESCE((SELECT count(*) FROM progvehiculos WHERE idvehiculo = idveh AND activa = 'S'), 0) <= 0)"
-                        # You'd need to add a method to `ProgramacionVehicularRepository` to check active programs.
-                        # For now, let's just assume the direct update if `idconductor_actual` is set.
-                        # if (await self.programacion_vehicular_repo.count_active_programaciones(event.vehicle_id)) <= 0: # Requires a new repo method
-                        #     await self.vehicle_repo.deactivate_current_driver(event.vehicle_id, event.current_driver_id)
-                        pass # Placeholder for `deactivate_current_driver` logic
+                with self._stage("period_management", event):
+                    # Manage active periods (periodosactivo)
+                    step = active_period_step(found["period_lookup"], event.event_code, event.vehicle_on)
+                    if step == START:
+                        vehicle.ultperiodo = await self.period_repo.create_periodo_activo(
+                            event.vehicle_id, event.processed_date, event.current_driver_id
+                        )
+                    elif step == CLOSE:
+                        await self.period_repo.update_periodo_activo_end_date(vehicle.ultperiodo, event.processed_date)
+                    # Every event carries the vehicle's current period, so the
+                    # vehiculos update below keeps ultperiodo pointing at it
+                    event.period_id = vehicle.ultperiodo
+
+                    # Driver Period Reset Logic (periodosconductores)
+                    if reset_periodo_conductor:
+                        last_driver_period = await self.period_repo.get_last_periodo_conductor_for_reset(
+                            event.vehicle_id, event.current_driver_id, event.processed_date
+                        )
+                        driver_step = driver_period_step(last_driver_period, event.event_code, event.processed_date)
+                        if driver_step.reopen is not None:
+                            await self.period_repo.update_periodo_conductor_end_date(driver_step.reopen, None) # Set fechahasta to NULL
+                        if driver_step.close is not None:
+                            await self.period_repo.update_periodo_conductor_end_date(driver_step.close, event.processed_date)
+
+                            # Logic to set idconductor_actual to NULL
+                            # This part of the SP is conditional: "IF (COALESCE((SELECT count(*) FROM progvehiculos WHERE idvehiculo = idveh AND activa = 'S'), 0) <= 0)"
+                            # You'd need to add a method to `ProgramacionVehicularRepository` to check active programs.
+                            # For now, let's just assume the direct update if `idconductor_actual` is set.
+                            # if (await self.programacion_vehicular_repo.count_active_programaciones(event.vehicle_id)) <= 0: # Requires a new repo method
+                            #     await self.vehicle_repo.deactivate_current_driver(event.vehicle_id, event.current_driver_id)
+                            pass # Placeholder for `deactivate_current_driver` logic
+                        if driver_step.start and event.current_driver_id is not None:
+                            await self.period_repo.create_periodo_conductor(
+                                event.vehicle_id, event.current_driver_id, event.processed_date
+                            )
 
                 # Insert into EVENTS table
-                event.event_db_id = await self.vehicle_event_repo.save_event(event)
+                with self._stage("event_insert", event):
+                    event.event_db_id = await self.vehicle_event_repo.save_event(event)
                 result_message += f"Codigo Evento: {event.event_db_id}@\n"
 
                 # Update eventos_resumen (if not vehicle 0560025196)
                 if event.vehicle_id != '0560025196':
-                    event_summary = await self.vehicle_event_repo.find_eventos_resumen(
-                        event.vehicle_id, event.event_code, event.processed_date.date(), event.processed_date.hour
-                    )
-                    if event_summary:
-                        await self.vehicle_event_repo.update_eventos_resumen(
-                            event.vehicle_id, event.event_code, event.processed_date.date(), event.processed_date.hour, event_summary.valor + 1
-                        )
-                    else:
-                        await self.vehicle_event_repo.insert_eventos_resumen(
-                            event.vehicle_id, event.event_code, 1, event.processed_date.date(), event.processed_date.hour
+                    with self._stage("resumen_update", event):
+                        event_summary = await self.vehicle_event_repo.find_eventos_resumen(
+                            event.vehicle_id, event.event_code, event.processed_date.date(), event.processed_date.hour
                         )
+                        if event_summary:
+                            await self.vehicle_event_repo.update_eventos_resumen(
+                                event.vehicle_id, event.event_code, event.processed_date.date(), event.processed_date.hour, event_summary.valor + 1
+                            )
+                        else:
+                            await self.vehicle_event_repo.insert_eventos_resumen(
+                                event.vehicle_id, event.event_code, 1, event.processed_date.date(), event.processed_date.hour
+                            )
                 
                 # Update VEHICULOS table
-                if event.processed_latitude is None or event.processed_longitude is None or event.processed_latitude == 0.0 or event.processed_longitude == 0.0:
+                if not has_gps:
                     result_message += "El movil no posee informacion de GPS@\n"
                     # Update without GPS coords
                     vehicle.ultimaactualizacion = event.processed_date
@@ -248,7 +324,8 @@ class VehicleEventProcessorService:
                     vehicle.enc_apa = event.ignition_status
                     vehicle.estadosenal = event.signal_status
                     vehicle.encendido = event.vehicle_on
-                    await self.vehicle_repo.update_vehicle_status(vehicle)
+                    with self._stage("vehicle_update", event):
+                        await self.vehicle_repo.update_vehicle_status(vehicle)
                 else:
                     # Calculate bearing
                     ult_lat = _parse_coord_string(vehicle.latitud)
@@ -277,55 +354,58 @@ class VehicleEventProcessorService:
                     vehicle.estadosenal = event.signal_status
                     vehicle.encendido = event.vehicle_on
                     vehicle.indexevento = event.event_db_id
-                    await self.vehicle_repo.update_vehicle_status(vehicle)
+                    with self._stage("vehicle_update", event):
+                        await self.vehicle_repo.update_vehicle_status(vehicle)
 
                     # Special Transport Logic
-                    prog_especial = await self.special_route_repo.get_active_special_programacion_for_vehicle(
-                        event.vehicle_id, datetime.now() # SP uses localtimestamp for this check
-                    )
-
-                    if prog_especial:
-                        detalle_punto = await self.special_route_repo.get_nearby_special_route_detail(
-                            prog_especial.idruta, event.processed_latitude, event.processed_longitude
-                        )
-                        if detalle_punto:
-                            # Calculate time (assuming tiempoglobal in SP is time in minutes from start)
-                            # SP uses localtimestamp - progespecial_.fechasalida, then divide by 60
-                            current_time_minutes = (datetime.now() - prog_especial.fechasalida).total_seconds() / 60.0
+                    with self._stage("special_routes", event):
+                        prog_especial = found["special_route_lookup"]
+                        if prog_especial:
+                            detalle_punto = await self.special_route_repo.get_nearby_special_route_detail(
+                                prog_especial.idruta, event.processed_latitude, event.processed_longitude,
+                                prog_especial.idprogramacion,
+                            )
+                            if detalle_punto:
+                                # Calculate time (assuming tiempoglobal in SP is time in minutes from start)
+                                # SP uses localtimestamp - progespecial_.fechasalida, then divide by 60
+                                current_time_minutes = (datetime.now() - prog_especial.fechasalida).total_seconds() / 60.0
                             
-                            initial_offset = await self.special_route_repo.get_initial_tiempoglobal(prog_especial.idruta)
-                            if initial_offset is None:
-                                initial_offset = 0.0 # Default if not found
+                                initial_offset = await self.special_route_repo.get_initial_tiempoglobal(prog_especial.idruta)
+                                if initial_offset is None:
+                                    initial_offset = 0.0 # Default if not found
                             
-                            val_df = detalle_punto.tiempoglobal
-                            dif_int = current_time_minutes - val_df + initial_offset
-
-                            # Insert into rutas_especiales_control
-                            await self.special_route_repo.insert_ruta_especial_control(
-                                RutaEspecialControl(
-                                    idprogramacion=prog_especial.idprogramacion,
-                                    idpunto=detalle_punto.idpunto,
-                                    fecha=datetime.now(),
-                                    tiempoint=current_time_minutes,
-                                    tiempoglobal=current_time_minutes, # SP uses tint for both
-                                    diferenciaint=dif_int,
-                                    diferenciaglobal=dif_int, # SP uses difint for both
-                                    orden=detalle_punto.orden
+                                val_df = detalle_punto.tiempoglobal
+                                dif_int = current_time_minutes - val_df + initial_offset
+
+                                # Insert into rutas_especiales_control
+                                await self.special_route_repo.insert_ruta_especial_control(
+                                    RutaEspecialControl(
+                                        idprogramacion=prog_especial.idprogramacion,
+                                        idpunto=detalle_punto.idpunto,
+                                        fecha=datetime.now(),
+                                        tiempoint=current_time_minutes,
+                                        tiempoglobal=current_time_minutes, # SP uses tint for both
+                                        diferenciaint=dif_int,
+                                        diferenciaglobal=dif_int, # SP uses difint for both
+                                        orden=detalle_punto.orden
+                                    )
                                 )
-                            )
 
                 # Update Recursos table
                 if vehicle.recurso and vehicle.contratista:
-                    await self.vehicle_repo.update_resource_gps_status(
-                        vehicle.recurso, vehicle.contratista, event.processed_date, True if event.processed_latitude else False
-                    )
+                    with self._stage("resource_update", event):
+                        await self.vehicle_repo.update_resource_gps_status(
+                            vehicle.recurso, vehicle.contratista, event.processed_date, True if event.processed_latitude else False
+                        )
 
                 # Odometer
                 if event.odometer is not None:
-                    await self.vehicle_event_repo.save_odometer(event.vehicle_id, event.odometer, event.processed_date)
+                    with self._stage("odometer", event):
+                        await self.vehicle_event_repo.save_odometer(event.vehicle_id, event.odometer, event.processed_date)
                     result_message += f"ODOMETRO: {event.odometer}@\n"
 
-                await self.event_publisher.publish_processed_event(event)
+                with self._stage("publish", event):
+                    await self.event_publisher.publish_processed_event(event)
 
             else: # Event Type 1 (KEEP ALIVE)
                 result_message += f"Vehiculo {event.vehicle_id} Vivo!!!@\n"
@@ -333,9 +413,11 @@ class VehicleEventProcessorService:
                 vehicle.estadosenal = event.signal_status
                 vehicle.encendido = event.vehicle_on
                 vehicle.indexevento = event.event_db_id # Although SP sets idevt only on save_event, here it might be redundant for keep_alive
-                await self.vehicle_repo.update_vehicle_status(vehicle)
+                with self._stage("vehicle_update", event):
+                    await self.vehicle_repo.update_vehicle_status(vehicle)
 
-                await self.event_publisher.publish_processed_event(event) # Still publish keep-alive
+                with self._stage("publish", event):
+                    await self.event_publisher.publish_processed_event(event) # Still publish keep-alive
 
         elif event.event_type == 128: # OTA Current Position
             if event.processed_latitude is not None and event.processed_latitude != 0.0:
@@ -356,12 +438,18 @@ class VehicleEventProcessorService:
                 vehicle.estadosenal = event.signal_status
                 vehicle.encendido = event.vehicle_on
                 vehicle.indexevento = event.event_db_id # Similar to above, potentially redundant here
-                await self.vehicle_repo.update_vehicle_status(vehicle)
+                with self._stage("vehicle_update", event):
+                    await self.vehicle_repo.update_vehicle_status(vehicle)
 
-                await self.event_publisher.publish_processed_event(event)
+                with self._stage("publish", event):
+                    await self.event_publisher.publish_processed_event(event)
 
         # Calculate and log time taken
         time_taken = (datetime.now() - time_init).total_seconds()
-        print(f"TIME INSERT_EVENT {event.vehicle_id}: ({time_taken})")
+        self.metrics.observe_stage("total", time_taken, event.event_type, event.event_code)
+        logger.debug(
+            "TIME INSERT_EVENT %s: (%s)", event.vehicle_id, time_taken,
+            extra={"vehicle_id": event.vehicle_id, "sampled": True}
+        )
 
         return result_message.strip()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.infrastructure.adapters.api.routes import verify_api_key
+from app.infrastructure.adapters.api.schemas import (
+    DeadLetterItem,
+    DeadLetterListResponse,
+    DeadLetterRequeueResponse,
+)
+from app.infrastructure.adapters.deadletter.store import DeadLetter
+from app.infrastructure.adapters.profiling.sampling_profiler import SamplingProfiler
+from app.infrastructure.config.settings import settings
+from app.infrastructure.dependencies import dead_letter_store
+
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+profiler = SamplingProfiler()
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0),
+    focus: Optional[str] = Query(
+        None,
+        description=(
+            "Only keep samples passing through this function, e.g. process_event"
+        ),
+    ),
+) -> str:
+    """
+    Muestrea la pila del event loop durante ``seconds`` y devuelve las pilas
+    agregadas en formato "collapsed" para generar un flame graph.
+    """
+    if profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A profile is already running"
+        )
+    profiler.start(threading.get_ident(), interval_ms / 1000.0, focus)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = profiler.stop()
+    return stacks
+
+
+def _dead_letters():
+    if dead_letter_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Dead letters are disabled"
+        )
+    return dead_letter_store
+
+
+async def _requeue(record: DeadLetter):
+    record.status = "pending"
+    record.attempts = 0
+    record.next_attempt_at = time.time()
+    await dead_letter_store.save(record)
+
+
+@router.get("/dead-letters", response_model=DeadLetterListResponse)
+async def list_dead_letters(
+    status_filter: Optional[str] = Query(
+        None, alias="status", pattern="^(pending|permanent|exhausted)$"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+) -> DeadLetterListResponse:
+    """Lista los eventos fallidos guardados, los más antiguos primero."""
+    store = _dead_letters()
+    return DeadLetterListResponse(
+        pending=store.pending_count(),
+        items=[DeadLetterItem(**asdict(r)) for r in store.list(status_filter, limit)],
+    )
+
+
+@router.post("/dead-letters/requeue", response_model=DeadLetterRequeueResponse)
+async def requeue_dead_letters(
+    status_filter: str = Query(
+        "exhausted", alias="status", pattern="^(permanent|exhausted)$"
+    ),
+) -> DeadLetterRequeueResponse:
+    """Vuelve a poner en cola todos los eventos aparcados con ``status``."""
+    records = _dead_letters().list(status_filter, len(dead_letter_store))
+    for record in records:
+        await _requeue(record)
+    return DeadLetterRequeueResponse(requeued=len(records))
+
+
+@router.post(
+    "/dead-letters/{record_id}/requeue", response_model=DeadLetterRequeueResponse
+)
+async def requeue_dead_letter(record_id: str) -> DeadLetterRequeueResponse:
+    """Vuelve a poner en cola un evento concreto, con los intentos a cero."""
+    record = _dead_letters().get(record_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Unknown dead letter"
+        )
+    await _requeue(record)
+    return DeadLetterRequeueResponse(requeued=1)
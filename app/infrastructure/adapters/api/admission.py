@@ -0,0 +1,175 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, FrozenSet, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    ADMISSION_DECISIONS,
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_WAIT,
+    QUEUE_DEPTH,
+    event_code_class,
+)
+from app.infrastructure.config.settings import settings
+
+# Highest priority first; freed slots go to the first non-empty lane
+LANES = ("critical", "normal", "low")
+
+
+def parse_codes(spec: str) -> FrozenSet[Tuple[int, int]]:
+    """Parses ``"tipo:code,tipo:code"``; the same code means different
+    things under different event types."""
+    codes = set()
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        event_type, sep, event_code = entry.partition(":")
+        if not sep:
+            raise ValueError(f"Expected tipo:code in critical event codes: '{entry}'")
+        codes.add((int(event_type), int(event_code)))
+    return frozenset(codes)
+
+
+def lane_for(
+    event_type: int,
+    event_code: int,
+    critical_codes: FrozenSet[Tuple[int, int]] = parse_codes(
+        settings.ADMISSION_CRITICAL_EVENT_CODES
+    ),
+) -> str:
+    """Ignition, OTA and configured alarm codes first; keep-alives last."""
+    code_class = event_code_class(event_type, event_code)
+    if code_class in ("ota", "ignition") or (event_type, event_code) in critical_codes:
+        return "critical"
+    if code_class == "keep_alive":
+        return "low"
+    return "normal"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency limit with bounded, prioritised waiting in front of the processor.
+
+    Up to ``max_concurrency`` events run at once. Others wait in their
+    lane's FIFO; a freed slot is handed to the oldest waiter of the highest
+    non-empty lane. A full lane is rejected at once with 429 and a waiter
+    that does not get a slot within ``max_wait`` seconds gets 503, so under
+    overload keep-alives are shed first and nothing waits long enough to
+    hit modem retransmission timeouts.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        low_priority_max_queue: int = settings.ADMISSION_LOW_PRIORITY_MAX_QUEUE,
+        max_wait: float = settings.ADMISSION_MAX_WAIT_MS / 1000.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.queue_limits = {
+            "critical": max_queue,
+            "normal": max_queue,
+            "low": low_priority_max_queue,
+        }
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            lane: deque() for lane in LANES
+        }
+
+    def queued(self, lane: str) -> int:
+        return len(self._waiters[lane])
+
+    async def acquire(self, lane: str):
+        if self.in_flight < self.max_concurrency and not any(self._waiters.values()):
+            self.in_flight += 1
+            ADMISSION_DECISIONS.labels(lane, "admitted").inc()
+            return
+
+        waiters = self._waiters[lane]
+        if len(waiters) >= self.queue_limits[lane]:
+            ADMISSION_DECISIONS.labels(lane, "queue_full").inc()
+            raise AdmissionRejected(
+                status.HTTP_429_TOO_MANY_REQUESTS, f"Admission queue '{lane}' is full"
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self._discard(waiters, future)
+            ADMISSION_DECISIONS.labels(lane, "timeout").inc()
+            raise AdmissionRejected(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                f"No capacity within {self.max_wait * 1000:.0f} ms",
+            )
+        except asyncio.CancelledError:
+            # Client went away; give back a slot that was already handed over
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._discard(waiters, future)
+            raise
+        ADMISSION_WAIT.labels(lane).observe(time.perf_counter() - start)
+        ADMISSION_DECISIONS.labels(lane, "admitted").inc()
+
+    def release(self):
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    future.set_result(None)  # The slot moves to the waiter
+                    return
+        self.in_flight -= 1
+
+    @staticmethod
+    def _discard(waiters: Deque[asyncio.Future], future: asyncio.Future):
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+
+
+admission_controller = AdmissionController()
+ADMISSION_IN_FLIGHT.set_function(lambda: admission_controller.in_flight)
+for _lane in LANES:
+    QUEUE_DEPTH.labels(f"admission_{_lane}").set_function(
+        lambda lane=_lane: admission_controller.queued(lane)
+    )
+
+
+async def admit_event(request: Request):
+    """Route dependency holding an admission slot for the whole request.
+
+    Runs before the database session is opened, so rejected events cost
+    no connection.
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    try:
+        body = await request.json()  # Starlette caches it for the endpoint
+        lane = lane_for(int(body["tipo"]), int(body["idevento_"]))
+    except (ValueError, KeyError, TypeError):
+        lane = "normal"  # Validation rejects it later with a proper 422
+    try:
+        await admission_controller.acquire(lane)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code, detail=e.reason, headers={"Retry-After": "1"}
+        )
+    try:
+        yield
+    finally:
+        admission_controller.release()
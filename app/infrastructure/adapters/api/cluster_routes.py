@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+
+from app.infrastructure.adapters.api.routes import verify_api_key
+from app.infrastructure.adapters.api.schemas import (
+    ClusterJoinRequest,
+    ClusterLeaveRequest,
+    ClusterMembersResponse,
+)
+from app.infrastructure.dependencies import cluster_membership
+
+# Only mounted when CLUSTER_ENABLED; instances share API_KEY
+router = APIRouter(dependencies=[Depends(verify_api_key)])
+
+
+def _members() -> ClusterMembersResponse:
+    return ClusterMembersResponse(
+        node_id=cluster_membership.node_id, members=cluster_membership.members
+    )
+
+
+@router.get("/members", response_model=ClusterMembersResponse)
+async def members() -> ClusterMembersResponse:
+    """Instancias vivas según esta instancia."""
+    return _members()
+
+
+@router.post("/join", response_model=ClusterMembersResponse)
+async def join(request: ClusterJoinRequest) -> ClusterMembersResponse:
+    """Alta (o latido) de una instancia; devuelve la membresía conocida."""
+    cluster_membership.add_member(request.node_id, request.url)
+    return _members()
+
+
+@router.post("/leave", response_model=ClusterMembersResponse)
+async def leave(request: ClusterLeaveRequest) -> ClusterMembersResponse:
+    """Baja ordenada: sus vehículos pasan de inmediato a otras instancias."""
+    cluster_membership.remove_member(request.node_id)
+    return _members()
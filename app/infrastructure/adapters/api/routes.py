@@ -1,12 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader # For basic API Key security example
+from app.infrastructure.adapters.api.admission import admit_event
 from app.infrastructure.adapters.api.schemas import VehicleEventRequest, VehicleEventResponse
 from app.core.services.vehicle_event_processor_service import VehicleEventProcessorService
 from app.core.domain.entities import VehicleEvent
-from app.infrastructure.dependencies import get_vehicle_event_processor_service
+from app.infrastructure.adapters.deadletter.store import (
+    TRANSIENT,
+    DeadLetter,
+    classify_error,
+)
+from app.infrastructure.dependencies import (
+    dead_letter_store,
+    get_vehicle_event_processor_service,
+)
+from app.infrastructure.adapters.database.instrumentation import track_statements
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    DEAD_LETTERS,
+    STATEMENTS_PER_EVENT,
+    event_code_class,
+    event_type_label,
+)
+from app.infrastructure.adapters.tracing.tracing import extract_http_context, tracer
 from app.infrastructure.config.settings import settings
 from typing import Dict
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 API_KEY_NAME = "X-API-Key"
@@ -22,39 +44,57 @@ async def verify_api_key(api_key: str = Depends(api_key_header)):
     return api_key
 
 @router.post("/process-vehicle-event", response_model=VehicleEventResponse, status_code=status.HTTP_200_OK,
-             dependencies=[Depends(verify_api_key)]) # Apply API Key security
+             dependencies=[Depends(verify_api_key), Depends(admit_event)]) # API Key, then admission
 async def process_vehicle_event_api(
     request: VehicleEventRequest,
+    http_request: Request,
     service: VehicleEventProcessorService = Depends(get_vehicle_event_processor_service)
 ) -> Dict[str, str]:
     """
     Procesa un evento de un vehículo recibido a través de la API.
     Transforma los datos del Request a la entidad de dominio y los procesa.
     """
-    event = VehicleEvent(
-        event_type=request.tipo,
-        vehicle_id=request.idveh,
-        event_code=request.idevento_,
-        system_date_str=request.fechasys_,
-        speed=request.speed,
-        latitude_raw=request.lat,
-        longitude_raw=request.lon,
-        odometer=request.odometer,
-        ip_address=request.ip,
-        port=request.port,
-        geofence_index=request.indexgeocerca,
-        vehicle_on=request.vehicleon_,
-        signal_status=request.signal_,
-        realtime_date=request.realtime_,
-        address=request.address_,
-        city=request.city_,
-        department=request.department_,
-        keep_alive_date=request.fechakeep
-    )
+    event = request.to_entity()
+
+    with tracer.start_as_current_span(
+        "process_vehicle_event", context=extract_http_context(http_request.headers)
+    ) as span:
+        span.set_attribute("vehicle_id", event.vehicle_id)
+        span.set_attribute("event_code", event.event_code)
+        span.set_attribute("event_type", event.event_type)
+        return await _process(service, event, request)
 
+
+async def _process(service: VehicleEventProcessorService, event: VehicleEvent, request: VehicleEventRequest) -> Dict[str, str]:
     try:
-        result_message = await service.process_event(event)
+        with track_statements() as statements:
+            result_message = await service.process_event(event)
+        STATEMENTS_PER_EVENT.labels(
+            event_type_label(event.event_type), event_code_class(event.event_type, event.event_code)
+        ).observe(statements.statements)
         return {"status": "OK", "message": result_message}
     except Exception as e:
-        print(f"Error processing vehicle event for {request.idveh}: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
\ No newline at end of file
+        logger.exception("Error processing vehicle event", extra={"vehicle_id": request.idveh})
+        # Only failures a later retry can fix are parked; invalid data or a
+        # violated constraint would fail again, so the client hears about it
+        if dead_letter_store is None or classify_error(e) != TRANSIENT:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {e}")
+        record = await dead_letter_store.add(request.model_dump(mode="json"), e)
+        DEAD_LETTERS.labels(record.error_class).inc()
+        # Raised, not returned, so the request transaction still rolls back
+        raise EventDeadLettered(record) from e
+
+
+class EventDeadLettered(Exception):
+    """The event failed transiently and was stored for retry; answered with 202."""
+
+    def __init__(self, record: DeadLetter):
+        super().__init__(record.id)
+        self.record = record
+
+
+async def dead_letter_handler(request: Request, exc: EventDeadLettered) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": "ACCEPTED", "message": f"Queued for retry ({exc.record.id})"},
+    )
\ No newline at end of file
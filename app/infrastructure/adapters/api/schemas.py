@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+from app.core.domain.entities import VehicleEvent
 
 class VehicleEventRequest(BaseModel):
     tipo: int = Field(..., description="Tipo de evento (0, 300 para normal, 128 para OTA)")
@@ -22,7 +24,57 @@ class VehicleEventRequest(BaseModel):
     department_: Optional[str] = Field(None, description="Departamento proporcionado por el modem")
     fechakeep: datetime = Field(..., description="Fecha de keep-alive (fecha de respaldo)")
 
+    def to_entity(self) -> VehicleEvent:
+        return VehicleEvent(
+            event_type=self.tipo,
+            vehicle_id=self.idveh,
+            event_code=self.idevento_,
+            system_date_str=self.fechasys_,
+            speed=self.speed,
+            latitude_raw=self.lat,
+            longitude_raw=self.lon,
+            odometer=self.odometer,
+            ip_address=self.ip,
+            port=self.port,
+            geofence_index=self.indexgeocerca,
+            vehicle_on=self.vehicleon_,
+            signal_status=self.signal_,
+            realtime_date=self.realtime_,
+            address=self.address_,
+            city=self.city_,
+            department=self.department_,
+            keep_alive_date=self.fechakeep
+        )
+
 class VehicleEventResponse(BaseModel):
     status: str = Field(..., json_schema_extra={"example": "OK"})
     message: Optional[str] = None
 
+
+class ClusterJoinRequest(BaseModel):
+    node_id: str = Field(..., max_length=100, description="ID de la instancia")
+    url: str = Field(..., description="URL base con la que los pares la alcanzan")
+
+class ClusterLeaveRequest(BaseModel):
+    node_id: str = Field(..., max_length=100, description="ID de la instancia que se retira")
+
+class ClusterMembersResponse(BaseModel):
+    node_id: str
+    members: Dict[str, str] = Field(..., description="ID de instancia -> URL base")
+
+class DeadLetterItem(BaseModel):
+    id: str
+    payload: dict
+    error: str
+    error_class: str = Field(..., description="transient o permanent")
+    status: str = Field(..., description="pending, permanent o exhausted")
+    attempts: int
+    created_at: float
+    next_attempt_at: float
+
+class DeadLetterListResponse(BaseModel):
+    pending: int
+    items: List[DeadLetterItem]
+
+class DeadLetterRequeueResponse(BaseModel):
+    requeued: int
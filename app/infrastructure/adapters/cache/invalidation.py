@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.adapters.cache.local_cache import CacheRegistry
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    CACHE_INVALIDATION_LAG,
+    CACHE_INVALIDATIONS,
+)
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Must match migrations/0005_cache_invalidation.sql
+CHANNEL = "cache_invalidation"
+
+
+async def notify_invalidation(
+    session: AsyncSession, table: str, key: Optional[str] = None
+):
+    """Announces a change from code paths not covered by the triggers.
+
+    Delivered when the session's transaction commits, like the triggers.
+    """
+    payload = json.dumps({"table": table, "key": key, "ts": time.time()})
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": payload},
+    )
+
+
+class InvalidationListener:
+    """Evicts local cache entries when ``cache_invalidation`` notifications arrive.
+
+    Uses one dedicated asyncpg connection outside the pool (LISTEN needs a
+    session of its own). The connection is pinged every ``ping_interval``;
+    whenever it is (re)established every registered cache is cleared, since
+    notifications sent while disconnected are lost. Combined with the cache
+    TTL this bounds staleness even if the listener is down.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        registry: CacheRegistry,
+        name: str = "primary",
+        ping_interval: float = settings.CACHE_INVALIDATION_PING_SECONDS,
+        max_backoff: float = 30.0,
+    ):
+        # asyncpg takes a plain postgresql:// DSN
+        self.dsn = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.registry = registry
+        self.name = name
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+        # Set while LISTEN is active; changes after this point are not missed
+        self.ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(CHANNEL, self._on_notification)
+                self.registry.invalidate_all()
+                self.ready.set()
+                logger.info("Listening for cache invalidations on %s", self.name)
+                backoff = 1.0
+                while True:
+                    await asyncio.sleep(self.ping_interval)
+                    await conn.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.ready.clear()
+                logger.warning(
+                    "Cache invalidation listener on %s lost: %s", self.name, e
+                )
+                self.registry.invalidate_all()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        self.handle(payload)
+
+    def handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+            table = message["table"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed cache invalidation: %r", payload)
+            return
+        key = message.get("key")
+        if not self.registry.invalidate(table, None if key is None else str(key)):
+            return
+        CACHE_INVALIDATIONS.labels(table).inc()
+        sent_at = message.get("ts")
+        if isinstance(sent_at, (int, float)):
+            CACHE_INVALIDATION_LAG.observe(max(time.time() - sent_at, 0.0))
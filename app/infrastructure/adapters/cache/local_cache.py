@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Protocol
+
+from app.infrastructure.adapters.metrics.prometheus_metrics import CACHE_REQUESTS
+from app.infrastructure.config.settings import settings
+
+
+class LocalCache:
+    """Bounded in-process LRU with a TTL; ``None`` results are cached too.
+
+    The TTL is only the safety net: entries are normally evicted as soon as
+    an invalidation for their table arrives (see ``invalidation.py``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = settings.CACHE_MAX_ENTRIES,
+        ttl: float = settings.CACHE_TTL_SECONDS,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped by every invalidation so a load that raced one is not stored
+        self._version = 0
+        self._hit = CACHE_REQUESTS.labels(name, "hit")
+        self._miss = CACHE_REQUESTS.labels(name, "miss")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._hit.inc()
+            return entry[0]
+        self._miss.inc()
+        version = self._version
+        value = await loader()
+        if version == self._version:
+            self._store(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a value this process just wrote, instead of reloading it."""
+        self._version += 1  # A load that started before the write is stale
+        self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Evicts one key, or everything when ``key`` is ``None``."""
+        self._version += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Evicts the entries ``predicate(key, value)`` accepts; returns how many."""
+        self._version += 1
+        dropped = [k for k, (v, _) in self._entries.items() if predicate(k, v)]
+        for key in dropped:
+            del self._entries[key]
+        return len(dropped)
+
+
+async def cached(
+    cache: Optional[LocalCache], key: Hashable, loader: Callable[[], Awaitable[Any]]
+):
+    """Runs ``loader`` through ``cache``, or directly when caching is off."""
+    if cache is None:
+        return await loader()
+    return await cache.get_or_load(key, loader)
+
+
+class Invalidatable(Protocol):
+    def invalidate(self, key: Optional[Any] = None): ...
+
+
+class CacheRegistry:
+    """Maps table names to the local caches holding data derived from them."""
+
+    def __init__(self):
+        self._by_table: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+
+    def register(
+        self,
+        table: str,
+        cache: Invalidatable,
+        key: Optional[Callable[[str], Hashable]] = str,
+    ):
+        """``key`` turns the notified key (text) into the cache key.
+
+        With ``key=None`` any change to the table clears the whole cache, for
+        caches whose entries cannot be traced back to a row.
+        """
+
+        def _invalidate(raw: Optional[str]):
+            cache.invalidate(None if raw is None or key is None else key(raw))
+
+        self._by_table.setdefault(table, []).append(_invalidate)
+
+    @property
+    def tables(self) -> List[str]:
+        return list(self._by_table)
+
+    def invalidate(self, table: str, key: Optional[str] = None) -> bool:
+        handlers = self._by_table.get(table)
+        if not handlers:
+            return False
+        for handler in handlers:
+            handler(key)
+        return True
+
+    def invalidate_all(self):
+        for table in self._by_table:
+            self.invalidate(table)
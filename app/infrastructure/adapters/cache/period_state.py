@@ -0,0 +1,52 @@
+from typing import Any, Callable, Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.adapters.cache.local_cache import LocalCache
+from app.infrastructure.config.settings import settings
+
+
+class PeriodStateStore:
+    """In-process state behind the ignition state machines (core/domain/periods).
+
+    ``active`` maps ``idperiodo`` to its ``periodosactivo`` row, which is
+    what ``vehiculos.ultperiodo`` points at; ``drivers`` maps ``(vehicle,
+    driver)`` to the latest ``periodosconductores`` row, or ``None`` when
+    there is none. With both warm an ignition event reads nothing and only
+    its INSERT/UPDATEs reach the database.
+
+    Like ``VehicleStateStore`` this assumes a single writer per vehicle, and
+    is evicted alongside it when a vehicle changes owner in the cluster.
+    The repository's writes are staged on the session and applied after it
+    commits, so a rolled-back event never changes the state.
+    """
+
+    _STAGED = "period_state_updates"
+
+    def __init__(
+        self,
+        max_entries: int = settings.CACHE_MAX_ENTRIES,
+        ttl: float = settings.CACHE_TTL_SECONDS,
+    ):
+        self.active = LocalCache("periodo_activo", max_entries, ttl)
+        self.drivers = LocalCache("periodo_conductor", max_entries, ttl)
+
+    def stage(
+        self, session: AsyncSession, cache: LocalCache, key: Hashable, value: Any
+    ):
+        session.info.setdefault(self._STAGED, []).append((cache, key, value))
+
+    def apply_committed(self, session: AsyncSession):
+        # In write order: a close followed by a start leaves the new period
+        for cache, key, value in session.info.pop(self._STAGED, []):
+            cache.put(key, value)
+
+    def invalidate_vehicles(self, predicate: Callable[[str], bool]) -> int:
+        """Drops the periods of the vehicles ``predicate`` accepts.
+
+        Cached misses in ``active`` go too: the period they stand for may
+        have been opened since by the instance that owned the vehicle.
+        """
+        return self.active.invalidate_matching(
+            lambda _, periodo: periodo is None or predicate(periodo.idvehiculo)
+        ) + self.drivers.invalidate_matching(lambda key, _: predicate(key[0]))
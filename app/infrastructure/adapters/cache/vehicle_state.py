@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.domain.entities import Vehicle
+from app.infrastructure.adapters.database.models import Vehiculos
+from app.infrastructure.adapters.metrics.prometheus_metrics import CACHE_REQUESTS
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# ── Snapshot layout ─────────────────────────────────────────────────────────
+# Little-endian, no padding: a header followed by ``count`` fixed-size
+# records, so a record is read straight from the mapped file at
+# ``HEADER.size + i * RECORD.size``. Each record starts with a bitmap of
+# null fields; strings are UTF-8, NUL padded. Changing the layout bumps
+# ``_VERSION`` and old snapshots are simply ignored.
+_MAGIC = b"VSNP"
+_VERSION = 1
+_LAYOUT: Tuple[Tuple[str, str], ...] = (
+    ("idvehiculo", "32s"),
+    ("estado", "1s"),
+    ("tipo_modem", "16s"),
+    ("velocidad", "d"),
+    ("direccion", "100s"),
+    ("latitud", "16s"),
+    ("longitud", "16s"),
+    ("municipio", "48s"),
+    ("departamento", "48s"),
+    ("ultperiodo", "q"),
+    ("enc_apa", "4s"),
+    ("idconductor", "q"),
+    ("idconductor_actual", "q"),
+    ("ultimaactualizacion", "q"),  # Microseconds since 1970-01-01, naive
+    ("ultimoevento", "q"),
+    ("rumbo", "i"),
+    ("rumbo_linea_tiempo", "i"),
+    ("indexgeoc", "i"),
+    ("estadosenal", "8s"),
+    ("encendido", "?"),
+    ("indexevento", "q"),
+    ("contratista", "32s"),
+    ("recurso", "32s"),
+)
+HEADER = struct.Struct("<4sHHIq")  # magic, version, record size, count, written at
+RECORD = struct.Struct("<I" + "".join(code for _, code in _LAYOUT))
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Columns other systems edit; the service never changes them itself
+_EXTERNAL_COLUMNS = ("estado", "contratista", "idconductor", "recurso", "tipo_modem")
+
+
+def _micros(moment: datetime) -> int:
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def encode_vehicle(vehicle: Vehicle) -> Optional[bytes]:
+    """Packs one record, or ``None`` when a string does not fit its field."""
+    nulls = 0
+    values = []
+    for index, (name, code) in enumerate(_LAYOUT):
+        value = getattr(vehicle, name)
+        if value is None:
+            nulls |= 1 << index
+            value = b"" if code.endswith("s") else 0
+        elif code.endswith("s"):
+            value = value.encode("utf-8")
+            if len(value) > int(code[:-1]):
+                return None
+        elif name == "ultimaactualizacion":
+            value = _micros(value)
+        values.append(value)
+    return RECORD.pack(nulls, *values)
+
+
+def decode_vehicle(raw: Tuple) -> Vehicle:
+    nulls, values = raw[0], raw[1:]
+    fields = {}
+    for index, ((name, code), value) in enumerate(zip(_LAYOUT, values)):
+        if nulls & (1 << index):
+            value = None
+        elif code.endswith("s"):
+            value = value.rstrip(b"\0").decode("utf-8")
+        elif name == "ultimaactualizacion":
+            value = _EPOCH + timedelta(microseconds=value)
+        fields[name] = value
+    return Vehicle(**fields)
+
+
+def write_snapshot(path: str, vehicles: Iterable[Vehicle]) -> Tuple[int, int]:
+    """Writes atomically (temp file + rename); returns (written, skipped)."""
+    records: List[bytes] = []
+    skipped = 0
+    for vehicle in vehicles:
+        record = encode_vehicle(vehicle)
+        if record is None:
+            skipped += 1
+        else:
+            records.append(record)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                _MAGIC, _VERSION, RECORD.size, len(records), _micros(datetime.now())
+            )
+        )
+        f.writelines(records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(records), skipped
+
+
+def read_snapshot(path: str) -> List[Vehicle]:
+    """Reads every record through a read-only memory map; [] if unusable."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, record_size, count, _ = HEADER.unpack_from(mapped)
+                if (magic, version, record_size) != (_MAGIC, _VERSION, RECORD.size):
+                    logger.warning("Ignoring vehicle snapshot with another layout")
+                    return []
+                if len(mapped) < HEADER.size + count * RECORD.size:
+                    logger.warning("Ignoring truncated vehicle snapshot %s", path)
+                    return []
+                return [
+                    decode_vehicle(
+                        RECORD.unpack_from(mapped, HEADER.size + i * RECORD.size)
+                    )
+                    for i in range(count)
+                ]
+    except FileNotFoundError:
+        return []
+
+
+class VehicleStateStore:
+    """In-process copy of ``vehiculos`` rows, persisted for warm restarts.
+
+    Serving ``get_active_vehicle_by_id`` from memory is only correct while
+    this process is the only writer of its vehicles' state (a single
+    instance, or ``CLUSTER_ENABLED`` affinity with one worker each). Other
+    systems' edits arrive through the cache invalidation bus; with affinity,
+    vehicles are dropped when their owner changes or an event for one is
+    processed here because its owner was unreachable.
+
+    Updates are staged on the session and applied after it commits, so a
+    rolled-back event never leaks into the store. The store is written to
+    ``path`` every ``interval`` seconds and on shutdown; at startup the
+    snapshot is loaded and reconciled against one scan of ``vehiculos``:
+    entries whose ``ultimaactualizacion`` or externally edited columns
+    differ, or that no longer exist, are dropped and reload on first use.
+    """
+
+    _STAGED = "vehicle_state_updates"
+
+    def __init__(
+        self,
+        path: str = settings.VEHICLE_SNAPSHOT_PATH,
+        interval: float = settings.VEHICLE_SNAPSHOT_INTERVAL_SECONDS,
+    ):
+        self.path = path
+        self.interval = interval
+        self._vehicles: Dict[str, Vehicle] = {}
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._hit = CACHE_REQUESTS.labels("vehicle_state", "hit")
+        self._miss = CACHE_REQUESTS.labels("vehicle_state", "miss")
+
+    def __len__(self) -> int:
+        return len(self._vehicles)
+
+    def get(self, vehicle_id: str) -> Optional[Vehicle]:
+        vehicle = self._vehicles.get(vehicle_id)
+        if vehicle is None:
+            self._miss.inc()
+            return None
+        self._hit.inc()
+        # Callers mutate the entity before saving it
+        return vehicle.model_copy()
+
+    def put(self, vehicle: Vehicle):
+        self._vehicles[vehicle.idvehiculo] = vehicle.model_copy()
+        self._dirty = True
+
+    def invalidate(self, vehicle_id: Optional[str] = None):
+        if vehicle_id is None:
+            self._vehicles.clear()
+        else:
+            self._vehicles.pop(vehicle_id, None)
+        self._dirty = True
+
+    def invalidate_matching(self, predicate: Callable[[str], bool]) -> int:
+        """Drops the vehicles whose id ``predicate`` accepts; returns how many."""
+        dropped = [v for v in self._vehicles if predicate(v)]
+        for vehicle_id in dropped:
+            del self._vehicles[vehicle_id]
+        self._dirty = self._dirty or bool(dropped)
+        return len(dropped)
+
+    def stage(self, session: AsyncSession, vehicle: Vehicle):
+        session.info.setdefault(self._STAGED, {})[
+            vehicle.idvehiculo
+        ] = vehicle.model_copy()
+
+    def apply_committed(self, session: AsyncSession):
+        for vehicle in session.info.pop(self._STAGED, {}).values():
+            self.put(vehicle)
+
+    # ── Snapshot lifecycle ──────────────────────────────────────────────────
+    async def start(self, directories: Iterable[async_sessionmaker]):
+        start = time.perf_counter()
+        loaded = await asyncio.to_thread(read_snapshot, self.path)
+        self._vehicles = {v.idvehiculo: v for v in loaded}
+        try:
+            dropped = await self.reconcile(directories)
+        except Exception:
+            logger.exception("Vehicle snapshot reconcile failed, starting cold")
+            self._vehicles.clear()
+            dropped = len(loaded)
+        logger.info(
+            "Loaded %d vehicles from snapshot in %.0f ms",
+            len(self._vehicles),
+            (time.perf_counter() - start) * 1000,
+            extra={"dropped": dropped},
+        )
+        self._dirty = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.save()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception:
+                logger.exception("Vehicle snapshot write failed")
+
+    async def save(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        vehicles = list(self._vehicles.values())
+        written, skipped = await asyncio.to_thread(write_snapshot, self.path, vehicles)
+        logger.info(
+            "Wrote vehicle snapshot with %d vehicles",
+            written,
+            extra={"skipped": skipped},
+        )
+
+    async def reconcile(self, directories: Iterable[async_sessionmaker]) -> int:
+        if not self._vehicles:
+            return 0
+        columns = [getattr(Vehiculos, name) for name in _EXTERNAL_COLUMNS]
+        stmt = select(Vehiculos.idvehiculo, Vehiculos.ultimaactualizacion, *columns)
+        current = {}
+        for directory in directories:
+            async with directory() as session:
+                for row in await session.execute(stmt):
+                    current[row[0]] = tuple(row[1:])
+        stale = [
+            vehicle_id
+            for vehicle_id, vehicle in self._vehicles.items()
+            if current.get(vehicle_id)
+            != (
+                vehicle.ultimaactualizacion,
+                *(getattr(vehicle, name) for name in _EXTERNAL_COLUMNS),
+            )
+        ]
+        for vehicle_id in stale:
+            del self._vehicles[vehicle_id]
+        return len(stale)
@@ -0,0 +1,153 @@
+import json
+import logging
+from typing import Callable, Optional
+
+import httpx
+
+from app.infrastructure.adapters.cluster.membership import ClusterMembership
+from app.infrastructure.adapters.metrics.prometheus_metrics import CLUSTER_ROUTED
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Set on forwarded requests; the receiver always processes them locally so a
+# brief disagreement between rings can never bounce an event back and forth.
+FORWARDED_HEADER = b"x-cluster-forwarded-by"
+
+# Caller headers worth keeping when proxying an event to its owner
+_FORWARD_HEADERS = {b"x-api-key", b"content-type", b"traceparent", b"tracestate"}
+# Owner response headers passed back; Retry-After carries its admission backoff
+_RESPONSE_HEADERS = ("content-type", "retry-after")
+
+
+def _vehicle_id(body: bytes) -> Optional[str]:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    vehicle_id = payload.get("idveh") if isinstance(payload, dict) else None
+    return str(vehicle_id) if vehicle_id else None
+
+
+class VehicleAffinityMiddleware:
+    """ASGI middleware sending each vehicle's events to its owning instance.
+
+    Only ``POST`` requests to ``path`` are inspected. Events owned by this
+    instance (or already forwarded once) go straight to the app; the rest
+    are proxied to the owner (``forward``) or answered with a 307 pointing
+    at it (``redirect``). If the owner cannot be reached the event is
+    processed here, trading affinity for availability until the ring
+    drops the failed peer. ``on_local_fallback`` is then called with the
+    vehicle id before and after processing, so local per-vehicle state the
+    owner may have changed is not used, nor kept once this event wrote it.
+    """
+
+    def __init__(
+        self,
+        app,
+        membership: ClusterMembership,
+        path: str,
+        mode: str = settings.CLUSTER_ROUTING_MODE,
+        on_local_fallback: Optional[Callable[[str], None]] = None,
+    ):
+        if mode not in ("forward", "redirect"):
+            raise ValueError(f"Unknown CLUSTER_ROUTING_MODE '{mode}'")
+        self.app = app
+        self.membership = membership
+        self.path = path
+        self.mode = mode
+        self.on_local_fallback = on_local_fallback
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] != self.path
+            or any(name == FORWARDED_HEADER for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        vehicle_id = _vehicle_id(body)
+        owner_url = self.membership.owner_url(vehicle_id) if vehicle_id else None
+        if owner_url is None:
+            CLUSTER_ROUTED.labels("local").inc()
+            await self.app(scope, _replay(body, receive), send)
+            return
+
+        target = owner_url + self.path
+        if scope.get("query_string"):
+            target += "?" + scope["query_string"].decode("latin-1")
+        if self.mode == "redirect":
+            CLUSTER_ROUTED.labels("redirected").inc()
+            await _respond(send, 307, b"", [(b"location", target.encode("latin-1"))])
+            return
+
+        try:
+            response = await self._forward(target, scope, body)
+        except httpx.HTTPError as e:
+            CLUSTER_ROUTED.labels("forward_failed").inc()
+            logger.warning(
+                "Forward to %s failed, processing locally: %s",
+                owner_url,
+                e,
+                extra={"vehicle_id": vehicle_id},
+            )
+            if self.on_local_fallback is not None:
+                self.on_local_fallback(vehicle_id)
+            try:
+                await self.app(scope, _replay(body, receive), send)
+            finally:
+                if self.on_local_fallback is not None:
+                    self.on_local_fallback(vehicle_id)
+            return
+        CLUSTER_ROUTED.labels("forwarded").inc()
+        headers = [
+            (name.encode(), response.headers[name].encode("latin-1"))
+            for name in _RESPONSE_HEADERS
+            if name in response.headers
+        ]
+        await _respond(send, response.status_code, response.content, headers)
+
+    async def _forward(self, target: str, scope, body: bytes) -> httpx.Response:
+        client = self.membership.client
+        if client is None:
+            raise httpx.TransportError("Cluster membership is not started")
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+            if name in _FORWARD_HEADERS
+        }
+        headers[FORWARDED_HEADER.decode()] = self.membership.node_id
+        return await client.post(target, content=body, headers=headers)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive):
+    """``receive`` that yields the buffered body once, then defers to the server."""
+    sent = False
+
+    async def _receive():
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return _receive
+
+
+async def _respond(send, status: int, body: bytes, headers):
+    headers = [*headers, (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,43 @@
+import bisect
+import hashlib
+from typing import Dict, List, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping vehicle ids to node ids.
+
+    Each node is placed ``virtual_nodes`` times so load spreads evenly and a
+    join or leave only moves about ``1 / len(nodes)`` of the keys. Rings are
+    immutable; membership changes build a new one.
+    """
+
+    def __init__(self, nodes: Dict[str, str], virtual_nodes: int = 128):
+        self.nodes = dict(nodes)  # node id -> base URL
+        self.virtual_nodes = virtual_nodes
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node_id}#{i}"), node_id)
+            for node_id in self.nodes
+            for i in range(virtual_nodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [node_id for _, node_id in points]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def owner(self, key: str) -> str:
+        if not self._hashes:
+            raise LookupError("The hash ring has no nodes")
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def moved_fraction(self, other: "HashRing", samples: int = 4096) -> float:
+        """Share of a sample keyspace whose owner differs between two rings."""
+        if not self.nodes or not other.nodes:
+            return 1.0
+        moved = sum(self.owner(str(i)) != other.owner(str(i)) for i in range(samples))
+        return moved / samples
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.infrastructure.adapters.cluster.hash_ring import HashRing
+from app.infrastructure.adapters.metrics.prometheus_metrics import CLUSTER_MEMBERS
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RingListener = Callable[[HashRing, HashRing], None]
+
+
+def owner_changed(previous: HashRing, ring: HashRing) -> Callable[[str], bool]:
+    """Predicate for the vehicles whose owner differs between two rings."""
+    return lambda vehicle_id: previous.owner(vehicle_id) != ring.owner(vehicle_id)
+
+
+class ClusterMembership:
+    """Tracks live service instances and the hash ring built from them.
+
+    Protocol, all over the ``/cluster`` endpoints of each instance:
+
+    * on start, and then on every heartbeat, an instance announces itself
+      (``POST /cluster/join``) to the seeds and known peers and merges the
+      member lists they return, so joins spread without a coordinator and
+      both sides of a healed partition find each other again;
+    * a peer missing ``failure_threshold`` heartbeats in a row is dropped,
+      and is only re-added when it answers again or joins again;
+    * on graceful stop it sends ``POST /cluster/leave`` so peers take over
+      its vehicles immediately.
+
+    Every membership change rebuilds the ring and calls the listeners with
+    the previous and the new ring, which is where per-vehicle local state
+    can be dropped for vehicles that moved away.
+    """
+
+    def __init__(
+        self,
+        node_id: str,
+        node_url: str,
+        seeds: Dict[str, str],
+        virtual_nodes: int = settings.CLUSTER_VIRTUAL_NODES,
+        heartbeat_interval: float = settings.CLUSTER_HEARTBEAT_INTERVAL_SECONDS,
+        failure_threshold: int = settings.CLUSTER_FAILURE_THRESHOLD,
+        timeout: float = settings.CLUSTER_FORWARD_TIMEOUT_SECONDS,
+    ):
+        self.node_id = node_id
+        self.node_url = node_url.rstrip("/")
+        self.seeds = {k: v.rstrip("/") for k, v in seeds.items() if k != node_id}
+        self.virtual_nodes = virtual_nodes
+        self.heartbeat_interval = heartbeat_interval
+        self.failure_threshold = failure_threshold
+        self.timeout = timeout
+        self.members: Dict[str, str] = {node_id: self.node_url}
+        self.ring = HashRing(self.members, virtual_nodes)
+        self.client: Optional[httpx.AsyncClient] = None
+        self._failures: Dict[str, int] = {}
+        self._listeners: List[RingListener] = []
+        self._task: Optional[asyncio.Task] = None
+        CLUSTER_MEMBERS.set(1)
+
+    # ── Ring ────────────────────────────────────────────────────────────────
+    def add_listener(self, listener: RingListener):
+        self._listeners.append(listener)
+
+    def owner_url(self, vehicle_id: str) -> Optional[str]:
+        """Base URL of the owning instance, ``None`` when it is this one."""
+        owner = self.ring.owner(vehicle_id)
+        return None if owner == self.node_id else self.members[owner]
+
+    def add_member(self, node_id: str, url: str) -> bool:
+        self._failures.pop(node_id, None)
+        url = url.rstrip("/")
+        if self.members.get(node_id) == url:
+            return False
+        self.members[node_id] = url
+        self._rebuild(f"{node_id} joined")
+        return True
+
+    def remove_member(self, node_id: str, reason: str = "left") -> bool:
+        if node_id == self.node_id or node_id not in self.members:
+            return False
+        del self.members[node_id]
+        self._rebuild(f"{node_id} {reason}")
+        return True
+
+    def merge(self, members: Dict[str, str]):
+        """Adds peers learned from another instance, except ones we saw fail."""
+        for node_id, url in members.items():
+            if self._failures.get(node_id, 0) >= self.failure_threshold:
+                continue
+            if node_id not in self.members:
+                self.add_member(node_id, url)
+
+    def _rebuild(self, reason: str):
+        previous = self.ring
+        self.ring = HashRing(self.members, self.virtual_nodes)
+        CLUSTER_MEMBERS.set(len(self.members))
+        logger.info(
+            "Cluster ring rebuilt: %s",
+            reason,
+            extra={
+                "members": sorted(self.members),
+                "moved_fraction": round(previous.moved_fraction(self.ring), 3),
+            },
+        )
+        for listener in self._listeners:
+            try:
+                listener(previous, self.ring)
+            except Exception:
+                logger.exception("Cluster ring listener failed")
+
+    # ── Protocol ────────────────────────────────────────────────────────────
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout, headers={"X-API-Key": settings.API_KEY}
+        )
+        await asyncio.gather(
+            *(self._announce(url) for url in self.seeds.values()),
+            return_exceptions=True,
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.client is None:
+            return
+        peers = [
+            url for node_id, url in self.members.items() if node_id != self.node_id
+        ]
+        await asyncio.gather(
+            *(
+                self.client.post(f"{url}/cluster/leave", json={"node_id": self.node_id})
+                for url in peers
+            ),
+            return_exceptions=True,
+        )
+        await self.client.aclose()
+        self.client = None
+
+    async def _announce(self, url: str) -> Dict[str, str]:
+        response = await self.client.post(
+            f"{url}/cluster/join",
+            json={"node_id": self.node_id, "url": self.node_url},
+        )
+        response.raise_for_status()
+        members = response.json()["members"]
+        self.merge(members)
+        return members
+
+    async def _run(self):
+        while True:
+            try:
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cluster heartbeat failed")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def heartbeat(self):
+        peers = {**self.seeds, **self.members}
+        peers.pop(self.node_id, None)
+        await asyncio.gather(
+            *(self._probe(node_id, url) for node_id, url in peers.items())
+        )
+
+    async def _probe(self, node_id: str, url: str):
+        try:
+            members = await self._announce(url)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            failures = self._failures.get(node_id, 0) + 1
+            self._failures[node_id] = failures
+            if failures >= self.failure_threshold:
+                if self.remove_member(node_id, reason="stopped answering"):
+                    logger.warning("Cluster peer %s unreachable: %s", node_id, e)
+            return
+        self.add_member(node_id, members.get(node_id, url))
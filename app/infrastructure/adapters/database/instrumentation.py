@@ -0,0 +1,152 @@
+import functools
+import hashlib
+import inspect
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event as sa_event
+
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    DB_STATEMENTS,
+    REPOSITORY_CALL_LATENCY,
+    SLOW_QUERIES,
+)
+from app.infrastructure.adapters.tracing.tracing import tracer
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StatementCounter:
+    """Round trips issued inside a ``track_statements()`` block."""
+
+    def __init__(self):
+        self.statements = 0
+        self.repository_calls = 0
+        self.fingerprints: List[str] = []
+
+
+# SQLAlchemy's async layer copies the context into its greenlets, so the
+# cursor listeners below see the counter set by the awaiting coroutine.
+_current_counter: ContextVar[Optional[StatementCounter]] = ContextVar(
+    "statement_counter", default=None
+)
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def count_statement(statement: str):
+    """Adds one round trip to the enclosing ``track_statements()`` block."""
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.statements += 1
+        counter.fingerprints.append(statement_fingerprint(statement))
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_statements(limit: int, label: str = "") -> Iterator[StatementCounter]:
+    """Test helper: fails when the block sends more than ``limit`` statements."""
+    with track_statements() as counter:
+        yield counter
+    if counter.statements > limit:
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} issued {counter.statements} SQL statements "
+            f"(budget {limit}): {', '.join(counter.fingerprints)}"
+        )
+
+
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"  # string literals
+    r"|\$\d+"  # asyncpg positional parameters
+    r"|%\(\w+\)s|:\w+|\?"  # named / qmark parameters
+    r"|\b\d+(?:\.\d+)?\b"  # numbers
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    return _WHITESPACE.sub(" ", _LITERALS.sub("?", statement)).strip()
+
+
+def statement_fingerprint(statement: str) -> str:
+    """Short stable id for a statement, independent of its parameter values."""
+    normalized = normalize_statement(statement)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def instrument_engine(engine, name: str = "primary"):
+    """Counts statements globally and per event, and logs slow ones.
+
+    Accepts an ``AsyncEngine`` or a plain ``Engine``.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    statements_metric = DB_STATEMENTS.labels(name)
+    slow_metric = SLOW_QUERIES.labels(name)
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000.0
+
+    @sa_event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @sa_event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        statements_metric.inc()
+        count_statement(statement)
+        if elapsed >= threshold:
+            slow_metric.inc()
+            logger.warning(
+                "Slow query %s (%.1f ms): %s",
+                statement_fingerprint(statement),
+                elapsed * 1000,
+                normalize_statement(statement)[:300],
+            )
+
+
+def instrumented(component: str):
+    """Class decorator timing and tracing every public coroutine method."""
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, name, _timed(component, name, method))
+        return cls
+
+    return decorate
+
+
+def _timed(component: str, name: str, method):
+    histogram = REPOSITORY_CALL_LATENCY.labels(component, name)
+    span_name = f"{component}.{name}"
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        counter = _current_counter.get()
+        if counter is not None:
+            counter.repository_calls += 1
+        start = time.perf_counter()
+        with tracer.start_as_current_span(span_name) as span:
+            span.set_attribute("db.system", "postgresql")
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+    return wrapper
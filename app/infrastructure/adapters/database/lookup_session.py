@@ -0,0 +1,25 @@
+from typing import Any, Optional
+
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class PooledLookupSession:
+    """Stands in for an ``AsyncSession`` in read-only repository lookups.
+
+    Each ``execute`` checks a connection out of the pool for that one
+    statement and hands it back right away, so several lookups of the same
+    event can run at once; a shared ``AsyncSession`` runs one statement at
+    a time. The rows are fetched before the connection is released and the
+    returned result is detached from it.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def execute(
+        self, statement: Any, params: Optional[Any] = None, **kwargs: Any
+    ) -> Result:
+        async with self.session_factory() as session:
+            result = await session.execute(statement, params, **kwargs)
+            return result.freeze()()
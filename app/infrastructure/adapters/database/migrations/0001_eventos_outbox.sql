@@ -0,0 +1,12 @@
+-- Transactional outbox used when OUTBOX_ENABLED=true (see EventosOutbox).
+CREATE TABLE IF NOT EXISTS eventos_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    idvehiculo VARCHAR(25),
+    payload TEXT,
+    fecha_creacion TIMESTAMP DEFAULT now(),
+    fecha_publicacion TIMESTAMP
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_eventos_outbox_pendientes
+    ON eventos_outbox (id)
+    WHERE fecha_publicacion IS NULL;
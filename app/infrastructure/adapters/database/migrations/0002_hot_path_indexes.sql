@@ -0,0 +1,29 @@
+-- Indexes behind the per-event queries in repositories.py.
+
+-- get_last_event_with_gps: newest event of a vehicle, walked backwards
+-- until the two-day window filter matches.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_eventos_vehiculo_idevento
+    ON eventos (idvehiculo, idevento DESC);
+
+-- get_last_periodo_conductor_for_reset: last period of a vehicle/driver.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_periodosconductores_vehiculo_conductor
+    ON periodosconductores (idvehiculo, idconductor, fechadesde DESC);
+
+-- get_active_special_programacion_for_vehicle: only open programs are
+-- ever looked up, so the partial index stays small.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_prog_especiales_vehiculo_abiertas
+    ON prog_especiales_vehiculos (idvehiculo, fechasalida DESC)
+    WHERE finalizado = 'N' AND cancelada = 'N' AND activa = 'S';
+
+-- get_initial_tiempoglobal and the route detail lookup.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_rutas_especiales_detalles_ruta
+    ON rutas_especiales_detalles (idruta, orden);
+
+-- Anti-join in get_nearby_special_route_detail.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_rutas_especiales_control_prog_punto
+    ON rutas_especiales_control (idprogramacion, idpunto);
+
+-- update_resource_gps_status: the production table may not carry the
+-- composite key declared on the ORM model.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recursos_recurso_contratista
+    ON "Recursos" (recurso, contratista);
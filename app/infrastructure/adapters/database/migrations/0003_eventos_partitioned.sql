@@ -0,0 +1,109 @@
+-- Turns eventos into a table partitioned by RANGE (fecha). The current table
+-- is kept as the partition for everything before the cut-over, so no rows are
+-- copied; PartitionManager (EVENTOS_PARTITIONING_ENABLED) creates the
+-- partitions from the cut-over onwards and applies the retention policy.
+-- Nothing here holds a lock that blocks inserts for a full-table scan: the
+-- scans run in autocommit (VALIDATE, CONCURRENTLY) and the swap at the end
+-- only touches the catalog. After a failure the file runs again from the
+-- top, so every step is guarded.
+
+-- Range partitions do not accept NULL keys.
+UPDATE eventos SET fecha = coalesce(fecha_insercion, now()) WHERE fecha IS NULL;
+
+-- A validated CHECK matching the future partition bound lets SET NOT NULL and
+-- ATTACH skip their full-table scans. Rows dated past the cut-over (bad modem
+-- clocks) would violate it; they are reported instead of moving the cut-over,
+-- which would keep every new event in the legacy partition until that date.
+-- NOT VALID only takes the lock for a moment; new rows are checked from here.
+DO $$
+DECLARE
+    cutover timestamp := date_trunc('day', now()) + interval '2 days';
+    future bigint;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'eventos_legacy_fecha_check'
+    ) OR (SELECT relkind FROM pg_class WHERE oid = 'eventos'::regclass) <> 'r' THEN
+        RETURN;
+    END IF;
+
+    SELECT count(*) INTO future FROM eventos WHERE fecha >= cutover;
+    IF future > 0 THEN
+        RAISE EXCEPTION '% eventos rows are dated on or after the cut-over %',
+            future, cutover
+            USING HINT = 'Correct their fecha (or move them out) and run the '
+                'migration again.';
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE eventos ADD CONSTRAINT eventos_legacy_fecha_check '
+        'CHECK (fecha IS NOT NULL AND fecha < %L) NOT VALID',
+        cutover
+    );
+END
+$$;
+
+-- Both scan the table without blocking inserts.
+ALTER TABLE eventos VALIDATE CONSTRAINT eventos_legacy_fecha_check;
+
+-- The partitioned table's primary key must include fecha; ATTACH takes this
+-- index over instead of building one on the legacy rows.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS eventos_legacy_idevento_fecha
+    ON eventos (idevento, fecha);
+
+-- The swap itself only touches the catalog.
+DO $$
+DECLARE
+    cutover timestamp;
+    id_sequence text;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'eventos'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    SELECT substring(pg_get_constraintdef(oid) FROM '''([^'']+)''')::timestamp
+    INTO cutover
+    FROM pg_constraint WHERE conname = 'eventos_legacy_fecha_check';
+    id_sequence := pg_get_serial_sequence('eventos', 'idevento');
+
+    ALTER TABLE eventos RENAME TO eventos_legacy;
+    ALTER INDEX IF EXISTS ix_eventos_vehiculo_idevento
+        RENAME TO eventos_legacy_vehiculo_idevento;
+    -- Frees the name for the partitioned table's primary key
+    IF EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'eventos_pkey'
+            AND conrelid = 'eventos_legacy'::regclass
+    ) THEN
+        ALTER TABLE eventos_legacy
+            RENAME CONSTRAINT eventos_pkey TO eventos_legacy_pkey;
+    END IF;
+    -- Proven by the CHECK, so no scan; LIKE copies it to the parent
+    ALTER TABLE eventos_legacy ALTER COLUMN fecha SET NOT NULL;
+    -- ATTACH only reuses an index that backs a constraint
+    ALTER TABLE eventos_legacy ADD CONSTRAINT eventos_legacy_idevento_fecha
+        UNIQUE USING INDEX eventos_legacy_idevento_fecha;
+
+    -- LIKE does not copy the primary key, and one on a partitioned table must
+    -- include the partition key.
+    CREATE TABLE eventos (
+        LIKE eventos_legacy INCLUDING DEFAULTS,
+        CONSTRAINT eventos_pkey PRIMARY KEY (idevento, fecha)
+    ) PARTITION BY RANGE (fecha);
+    IF id_sequence IS NOT NULL THEN
+        -- Keep the id sequence when the legacy partition is dropped
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY eventos.idevento', id_sequence);
+    END IF;
+
+    -- Rows outside every range partition (bad modem clocks, or before the
+    -- manager has created the partition) land here and are moved out later.
+    CREATE TABLE eventos_default PARTITION OF eventos DEFAULT;
+    CREATE INDEX ix_eventos_vehiculo_idevento ON eventos (idvehiculo, idevento DESC);
+
+    -- Reuses both legacy indexes instead of building new ones
+    EXECUTE format(
+        'ALTER TABLE eventos ATTACH PARTITION eventos_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        cutover
+    );
+END
+$$;
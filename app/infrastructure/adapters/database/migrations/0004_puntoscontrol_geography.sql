@@ -0,0 +1,12 @@
+-- Control points stored as geography so special-route matching compares
+-- against an indexed column instead of building and reprojecting a geometry
+-- from latitud/longitud for every row. Generated, so existing writers of
+-- puntoscontrol keep working unchanged.
+ALTER TABLE puntoscontrol
+    ADD COLUMN IF NOT EXISTS geom geography(Point, 4326)
+    GENERATED ALWAYS AS (
+        ST_SetSRID(ST_MakePoint(longitud, latitud), 4326)::geography
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_puntoscontrol_geom
+    ON puntoscontrol USING gist (geom);
@@ -0,0 +1,77 @@
+-- Publishes changes to tables that the service caches in process on the
+-- cache_invalidation channel, as {"table", "key", "ts"} JSON. Row triggers
+-- pass the key column as argument; statement triggers (TRUNCATE, tables
+-- without a usable key) send a null key, which clears the whole cache.
+-- NOTIFY is transactional, so listeners only hear about committed changes.
+CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    new_key text;
+    old_key text;
+BEGIN
+    IF TG_LEVEL = 'ROW' AND TG_NARGS > 0 THEN
+        IF TG_OP <> 'DELETE' THEN
+            new_key := to_jsonb(NEW) ->> TG_ARGV[0];
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            old_key := to_jsonb(OLD) ->> TG_ARGV[0];
+        END IF;
+    END IF;
+    PERFORM pg_notify('cache_invalidation', json_build_object(
+        'table', TG_TABLE_NAME,
+        'key', COALESCE(new_key, old_key),
+        'ts', extract(epoch FROM clock_timestamp())
+    )::text);
+    IF new_key IS NOT NULL AND old_key IS NOT NULL AND new_key <> old_key THEN
+        PERFORM pg_notify('cache_invalidation', json_build_object(
+            'table', TG_TABLE_NAME,
+            'key', old_key,
+            'ts', extract(epoch FROM clock_timestamp())
+        )::text);
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS cache_invalidation ON eventosdesc;
+CREATE TRIGGER cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON eventosdesc
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('evento');
+
+-- Tolerances are matched by contractor pattern, so any change clears them
+DROP TRIGGER IF EXISTS cache_invalidation ON "Procesos";
+CREATE TRIGGER cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON "Procesos"
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation ON rutas_especiales_detalles;
+CREATE TRIGGER cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON rutas_especiales_detalles
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('idruta');
+
+-- The service updates vehiculos on every event; only contractor moves
+-- affect cached state (shard routing), so other updates stay silent.
+DROP TRIGGER IF EXISTS cache_invalidation ON vehiculos;
+CREATE TRIGGER cache_invalidation
+    AFTER INSERT OR DELETE OR UPDATE OF contratista ON vehiculos
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('idvehiculo');
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON eventosdesc;
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON eventosdesc
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON "Procesos";
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON "Procesos"
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON rutas_especiales_detalles;
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON rutas_especiales_detalles
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON vehiculos;
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON vehiculos
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
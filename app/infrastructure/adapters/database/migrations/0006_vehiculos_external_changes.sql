@@ -0,0 +1,9 @@
+-- The in-process vehicle state store also needs to hear about edits other
+-- systems make to vehiculos (deactivation, driver, resource or modem
+-- changes). Columns the service itself writes on every event stay silent.
+DROP TRIGGER IF EXISTS cache_invalidation ON vehiculos;
+CREATE TRIGGER cache_invalidation
+    AFTER INSERT OR DELETE
+        OR UPDATE OF estado, contratista, idconductor, recurso, tipo_modem
+    ON vehiculos
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('idvehiculo');
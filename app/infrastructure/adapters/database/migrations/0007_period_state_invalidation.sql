@@ -0,0 +1,28 @@
+-- The in-process period state (PERIOD_STATE_CACHE_ENABLED) needs to hear
+-- about edits other systems make to periodosactivo and periodosconductores.
+-- The service itself inserts periods and moves fechahasta on ignition
+-- events; those writes stay silent, or every ignition would evict the state
+-- it just stored. External changes to fechahasta are only picked up after
+-- CACHE_TTL_SECONDS.
+DROP TRIGGER IF EXISTS cache_invalidation ON periodosactivo;
+CREATE TRIGGER cache_invalidation
+    AFTER DELETE OR UPDATE OF idperiodo, idvehiculo, fechadesde, idconductor
+    ON periodosactivo
+    FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation('idperiodo');
+
+-- Cached per (vehicle, driver), which one key column cannot address
+DROP TRIGGER IF EXISTS cache_invalidation ON periodosconductores;
+CREATE TRIGGER cache_invalidation
+    AFTER DELETE OR UPDATE OF idperiodo, idvehiculo, fechadesde, idconductor
+    ON periodosconductores
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON periodosactivo;
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON periodosactivo
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
+
+DROP TRIGGER IF EXISTS cache_invalidation_truncate ON periodosconductores;
+CREATE TRIGGER cache_invalidation_truncate
+    AFTER TRUNCATE ON periodosconductores
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation();
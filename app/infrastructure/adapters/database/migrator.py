@@ -0,0 +1,315 @@
+"""Applies the SQL files in ``migrations/`` and checks hot-path query plans.
+
+    python -m app.infrastructure.adapters.database.migrator upgrade
+    python -m app.infrastructure.adapters.database.migrator status
+    python -m app.infrastructure.adapters.database.migrator check
+
+Files run in version order and are recorded in ``schema_migrations``.
+A file without autocommit statements runs in one transaction, together
+with its version row, so a failure leaves nothing behind. Statements that
+must not hold a transaction open, ``CREATE INDEX CONCURRENTLY`` (with
+``IF NOT EXISTS``) and ``VALIDATE CONSTRAINT``, run one at a time in
+autocommit mode; the statements between them run in one transaction per
+stretch, and the version is recorded with the last one. A failure there
+makes the whole file run again on the next ``upgrade``, so such files
+must be idempotent. A failed concurrent build leaves an INVALID index
+that ``IF NOT EXISTS`` would skip: ``status`` lists them so they can be
+dropped before running ``upgrade`` again.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_CONCURRENTLY = re.compile(r"\bCONCURRENTLY\b", re.IGNORECASE)
+_DO_BLOCK = re.compile(r"\s*DO\b", re.IGNORECASE)
+_VALIDATE = re.compile(r"^ALTER\s+TABLE\b.*\bVALIDATE\s+CONSTRAINT\b", re.I | re.S)
+_IF_NOT_EXISTS = re.compile(r"\bIF\s+NOT\s+EXISTS\b", re.IGNORECASE)
+
+# Representative statements for every per-event lookup in repositories.py.
+# Literals instead of parameters: only the plan shape matters here.
+HOT_PATH_QUERIES: Dict[str, str] = {
+    "vehicle_lookup": (
+        "SELECT * FROM vehiculos WHERE idvehiculo = 'SOBUSA305' AND estado = 'Y'"
+    ),
+    "last_event_with_gps": (
+        "SELECT * FROM eventos WHERE idvehiculo = 'SOBUSA305' "
+        "AND latitud <> 'null' AND longitud <> 'null' "
+        "AND fecha > now() - interval '2 days' ORDER BY idevento DESC LIMIT 1"
+    ),
+    "event_description": "SELECT * FROM eventosdesc WHERE evento = '2'",
+    "eventos_resumen": (
+        "SELECT * FROM eventos_resumen WHERE idvehiculo = 'SOBUSA305' "
+        "AND idevento = 2 AND fecha = current_date AND hora = 8"
+    ),
+    "active_period": "SELECT * FROM periodosactivo WHERE idperiodo = 1",
+    "driver_period": (
+        "SELECT * FROM periodosconductores WHERE idvehiculo = 'SOBUSA305' "
+        "AND idconductor = 1 ORDER BY fechadesde DESC LIMIT 1"
+    ),
+    "special_program": (
+        "SELECT * FROM prog_especiales_vehiculos WHERE idvehiculo = 'SOBUSA305' "
+        "AND fechasalida >= current_date AND fechasalida < current_date + 1 "
+        "AND finalizado = 'N' AND cancelada = 'N' AND activa = 'S' "
+        "ORDER BY fechasalida DESC LIMIT 1"
+    ),
+    "control_point": (
+        "SELECT d.* FROM rutas_especiales_detalles d "
+        "JOIN puntoscontrol p ON p.idpunto = d.idpunto "
+        "WHERE d.idruta = 1 AND ST_DWithin(p.geom, "
+        "ST_SetSRID(ST_MakePoint(-74.78, 10.96), 4326)::geography, p.radio) "
+        "ORDER BY p.geom <-> ST_SetSRID(ST_MakePoint(-74.78, 10.96), 4326)::geography "
+        "LIMIT 1"
+    ),
+    "route_start": (
+        "SELECT tiempoglobal FROM rutas_especiales_detalles "
+        "WHERE idruta = 1 ORDER BY orden LIMIT 1"
+    ),
+    "route_control": (
+        "SELECT * FROM rutas_especiales_control "
+        "WHERE idprogramacion = 1 AND idpunto = 1"
+    ),
+    "resource": (
+        "SELECT * FROM \"Recursos\" WHERE recurso = 'SOBUSA305' "
+        "AND contratista = 'CONTRATISTA1'"
+    ),
+    "outbox_pending": (
+        "SELECT * FROM eventos_outbox WHERE fecha_publicacion IS NULL "
+        "ORDER BY id LIMIT 500"
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    path: Path
+
+    def statements(self) -> List[str]:
+        return split_statements(self.path.read_text(encoding="utf-8"))
+
+    def steps(self) -> List[Tuple[bool, List[str]]]:
+        """Groups the statements into ``(autocommit, statements)`` steps, in
+        file order."""
+        steps: List[Tuple[bool, List[str]]] = []
+        for statement in self.statements():
+            autocommit = _needs_autocommit(statement)
+            if autocommit and _CONCURRENTLY.search(statement):
+                if not _IF_NOT_EXISTS.search(statement):
+                    raise ValueError(
+                        f"{self.path.name}: CONCURRENTLY statements must use "
+                        "IF NOT EXISTS"
+                    )
+            if steps and steps[-1][0] == autocommit:
+                steps[-1][1].append(statement)
+            else:
+                steps.append((autocommit, [statement]))
+        return steps
+
+
+def _needs_autocommit(statement: str) -> bool:
+    # DO blocks may mention either inside their body; they run transactional
+    if _DO_BLOCK.match(statement):
+        return False
+    return bool(_CONCURRENTLY.search(statement) or _VALIDATE.search(statement))
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file name must be NNNN_name.sql: {path.name}")
+        migrations.append(Migration(match.group(1), match.group(2), path))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicated migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """Splits on semicolons ending a line, dropping ``--`` comment lines.
+
+    Lines inside ``$$``-quoted bodies (``DO`` blocks, functions) are kept
+    together with their statement.
+    """
+    statements: List[str] = []
+    current: List[str] = []
+    in_body = False
+    for line in sql.splitlines():
+        if not in_body and line.lstrip().startswith("--"):
+            continue
+        current.append(line)
+        in_body ^= line.count("$$") % 2 == 1
+        if not in_body and line.rstrip().endswith(";"):
+            statements.append("\n".join(current).strip()[:-1].rstrip())
+            current = []
+    if "\n".join(current).strip():
+        statements.append("\n".join(current).strip())
+    return statements
+
+
+async def _ensure_version_table(conn):
+    await conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(4) PRIMARY KEY, name TEXT NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        )
+    )
+
+
+async def applied_versions(conn) -> List[str]:
+    await _ensure_version_table(conn)
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    return sorted(row[0] for row in result)
+
+
+async def upgrade(engine: AsyncEngine) -> List[str]:
+    """Applies pending migrations and returns their versions."""
+    applied: List[str] = []
+    async with engine.connect() as conn:
+        async with conn.begin():
+            done = set(await applied_versions(conn))
+        # Checked up front so a malformed file stops the run before it starts
+        pending = [
+            (migration, migration.steps())
+            for migration in load_migrations()
+            if migration.version not in done
+        ]
+        for migration, steps in pending:
+            logger.info("Applying migration %s_%s", migration.version, migration.name)
+            for position, (autocommit, statements) in enumerate(steps, start=1):
+                if autocommit:
+                    await _run_autocommit(engine, statements)
+                    continue
+                async with conn.begin():
+                    for statement in statements:
+                        await conn.execute(text(statement))
+                    if position == len(steps):
+                        await _record(conn, migration)
+            if not steps or steps[-1][0]:
+                async with conn.begin():
+                    await _record(conn, migration)
+            applied.append(migration.version)
+    return applied
+
+
+async def _record(conn, migration: Migration):
+    await conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+        {"v": migration.version, "n": migration.name},
+    )
+
+
+async def _run_autocommit(engine: AsyncEngine, statements: List[str]):
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+async def invalid_indexes(conn) -> List[str]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid"
+        )
+    )
+    return [row[0] for row in result]
+
+
+def find_seq_scans(plan: Any) -> List[str]:
+    """Relations read by a ``Seq Scan`` node anywhere in an EXPLAIN JSON plan."""
+    found: List[str] = []
+    if isinstance(plan, list):
+        for item in plan:
+            found.extend(find_seq_scans(item))
+    elif isinstance(plan, dict):
+        if plan.get("Node Type") == "Seq Scan":
+            found.append(plan.get("Relation Name", "?"))
+        for key in ("Plan", "Plans"):
+            if key in plan:
+                found.extend(find_seq_scans(plan[key]))
+    return found
+
+
+async def check_hot_path_plans(engine: AsyncEngine) -> Dict[str, List[str]]:
+    """Returns the hot-path queries that still need a sequential scan.
+
+    Sequential scans are disabled while planning, so small tables that the
+    planner would scan anyway only show up when no usable index exists.
+    """
+    findings: Dict[str, List[str]] = {}
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for name, query in HOT_PATH_QUERIES.items():
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            relations = find_seq_scans(plan)
+            if relations:
+                findings[name] = relations
+        await conn.rollback()
+    return findings
+
+
+async def _main(command: str) -> int:
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        if command == "upgrade":
+            applied = await upgrade(engine)
+            print(f"Applied: {', '.join(applied) or 'nothing, already up to date'}")
+        elif command == "status":
+            async with engine.connect() as conn:
+                done = set(await applied_versions(conn))
+                invalid = await invalid_indexes(conn)
+                await conn.commit()
+            for migration in load_migrations():
+                mark = "applied" if migration.version in done else "pending"
+                print(f"{migration.version}_{migration.name}: {mark}")
+            if invalid:
+                print(
+                    f"INVALID indexes (drop and re-run upgrade): {', '.join(invalid)}"
+                )
+                return 1
+        else:
+            findings = await check_hot_path_plans(engine)
+            for name, relations in findings.items():
+                print(f"{name}: sequential scan on {', '.join(relations)}")
+            if findings:
+                return 1
+            print(f"{len(HOT_PATH_QUERIES)} hot-path queries use indexes")
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "check"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.command)))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,16 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Computed,
     Date,
     DateTime,
     Float,
+    Index,
     Integer,
     Numeric,
     SmallInteger,
     String,
+    Text,
     text,
 )
 from sqlalchemy.dialects.postgresql import ENUM
@@ -54,7 +57,13 @@ class Vehiculos(Base):
 
 
 class Eventos(Base):
+    # Partitioned by RANGE (fecha) in production (migration 0003), where the
+    # primary key is (idevento, fecha); the partitions are managed by
+    # PartitionManager.
     __tablename__ = "eventos"
+    __table_args__ = (
+        Index("ix_eventos_vehiculo_idevento", "idvehiculo", text("idevento DESC")),
+    )
     idevento = Column(BigInteger, primary_key=True, autoincrement=True)
     idvehiculo = Column(String(25))
     evento = Column(String(5))  # event code stored as text in DB
@@ -121,6 +130,14 @@ class PeriodosActivo(Base):
 
 class PeriodosConductores(Base):
     __tablename__ = "periodosconductores"
+    __table_args__ = (
+        Index(
+            "ix_periodosconductores_vehiculo_conductor",
+            "idvehiculo",
+            "idconductor",
+            text("fechadesde DESC"),
+        ),
+    )
     idperiodo = Column(
         BigInteger, primary_key=True, autoincrement=True
     )  # Assuming a primary key
@@ -177,6 +194,16 @@ class EventosResumen(Base):
 # Special Transport Tables
 class ProgEspecialesVehiculos(Base):
     __tablename__ = "prog_especiales_vehiculos"
+    __table_args__ = (
+        Index(
+            "ix_prog_especiales_vehiculo_abiertas",
+            "idvehiculo",
+            text("fechasalida DESC"),
+            postgresql_where=text(
+                "finalizado = 'N' AND cancelada = 'N' AND activa = 'S'"
+            ),
+        ),
+    )
     idprogramacion = Column(BigInteger, primary_key=True)
     idvehiculo = Column(String)
     fechasalida = Column(DateTime)
@@ -188,6 +215,7 @@ class ProgEspecialesVehiculos(Base):
 
 class RutasEspecialesDetalles(Base):
     __tablename__ = "rutas_especiales_detalles"
+    __table_args__ = (Index("ix_rutas_especiales_detalles_ruta", "idruta", "orden"),)
     id = Column(
         BigInteger, primary_key=True, autoincrement=True
     )  # Assuming primary key
@@ -199,14 +227,27 @@ class RutasEspecialesDetalles(Base):
 
 class PuntosControl(Base):  # Not `PuntosControlEspeciales`
     __tablename__ = "puntoscontrol"
+    __table_args__ = (
+        Index("ix_puntoscontrol_geom", "geom", postgresql_using="gist"),
+    )
     idpunto = Column(BigInteger, primary_key=True)
     latitud = Column(Float)
     longitud = Column(Float)
     radio = Column(Float)  # In meters
+    geom = Column(
+        ga.Geography("POINT", srid=4326, spatial_index=False),
+        Computed(
+            "ST_SetSRID(ST_MakePoint(longitud, latitud), 4326)::geography",
+            persisted=True,
+        ),
+    )  # Migration 0004
 
 
 class RutasEspecialesControl(Base):
     __tablename__ = "rutas_especiales_control"
+    __table_args__ = (
+        Index("ix_rutas_especiales_control_prog_punto", "idprogramacion", "idpunto"),
+    )
     id = Column(
         BigInteger, primary_key=True, autoincrement=True
     )  # Assuming primary key
@@ -218,3 +259,21 @@ class RutasEspecialesControl(Base):
     diferenciaint = Column(Float)
     diferenciaglobal = Column(Float)
     orden = Column(Integer)
+
+
+class EventosOutbox(Base):
+    # Processed events written in the same transaction as ``eventos`` and
+    # relayed to the broker by ``OutboxRelay``.
+    __tablename__ = "eventos_outbox"
+    __table_args__ = (
+        Index(
+            "ix_eventos_outbox_pendientes",
+            "id",
+            postgresql_where=text("fecha_publicacion IS NULL"),
+        ),
+    )
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    idvehiculo = Column(String(25))
+    payload = Column(Text)  # VehicleEvent serialized as JSON
+    fecha_creacion = Column(DateTime, server_default=text("now()"))
+    fecha_publicacion = Column(DateTime)  # NULL until the relay publishes it
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "eventos"
+DEFAULT_PARTITION = "eventos_default"
+
+# Arbitrary key so several replicas never manage partitions at the same time
+_ADVISORY_LOCK_ID = 7_320_451
+
+# Never queue writers behind a long query while waiting for a lock on eventos
+_LOCK_TIMEOUT = "SET LOCAL lock_timeout = '5s'"
+
+_BOUND = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    start: Optional[datetime]  # None for MINVALUE
+    end: Optional[datetime]  # None for MAXVALUE
+
+
+def floor_boundary(moment: datetime, interval: str) -> datetime:
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day.replace(day=1) if interval == "monthly" else day
+
+
+def next_boundary(moment: datetime, interval: str) -> datetime:
+    """First partition boundary strictly after ``moment``."""
+    start = floor_boundary(moment, interval)
+    if interval == "monthly":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    suffix = (
+        start.strftime("%Y%m") if interval == "monthly" else start.strftime("%Y%m%d")
+    )
+    return f"{PARENT_TABLE}_p{suffix}"
+
+
+def parse_partition_bound(name: str, bound: str) -> Optional[Partition]:
+    """Parses ``pg_get_expr(relpartbound)``; ``None`` for the default partition."""
+    match = _BOUND.search(bound)
+    if not match:
+        return None
+
+    def _value(raw: str) -> Optional[datetime]:
+        return (
+            None
+            if raw in ("MINVALUE", "MAXVALUE")
+            else datetime.fromisoformat(raw.strip("'"))
+        )
+
+    return Partition(name, _value(match.group(1)), _value(match.group(2)))
+
+
+class PartitionManager:
+    """Keeps ``eventos`` partitions created ahead of time and applies retention.
+
+    Partitions are created as plain tables, filled with any matching rows
+    that already landed in ``eventos_default`` and then attached, so a late
+    run never fails on rows that arrived before their partition existed.
+    Expired partitions are detached (kept for archiving) or dropped.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval: str = settings.EVENTOS_PARTITION_INTERVAL,
+        ahead: int = settings.EVENTOS_PARTITIONS_AHEAD,
+        retention_days: int = settings.EVENTOS_RETENTION_DAYS,
+        retention_action: str = settings.EVENTOS_RETENTION_ACTION,
+        check_interval: float = settings.EVENTOS_PARTITION_CHECK_INTERVAL_SECONDS,
+    ):
+        if interval not in ("daily", "monthly"):
+            raise ValueError(f"Unknown EVENTOS_PARTITION_INTERVAL '{interval}'")
+        if retention_action not in ("detach", "drop"):
+            raise ValueError(f"Unknown EVENTOS_RETENTION_ACTION '{retention_action}'")
+        self.engine = engine
+        self.interval = interval
+        self.ahead = ahead
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(self.check_interval)
+
+    async def maintain(self, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        # The advisory lock lives on its own session; each change below runs
+        # in a separate transaction so a failure leaves nothing half done.
+        async with self.engine.connect() as lock_conn:
+            locked = (
+                await lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(:id)"), {"id": _ADVISORY_LOCK_ID}
+                )
+            ).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                return
+            try:
+                async with self.engine.connect() as conn:
+                    partitions = await self.list_partitions(conn)
+                for start, end in self.missing_ranges(partitions, now):
+                    await self._create_partition(start, end)
+                for partition in self.expired(partitions, now):
+                    await self._retire(partition)
+            finally:
+                await lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": _ADVISORY_LOCK_ID}
+                )
+                await lock_conn.commit()
+
+    async def list_partitions(self, conn) -> List[Partition]:
+        result = await conn.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        partitions = [parse_partition_bound(name, bound) for name, bound in result]
+        return sorted(
+            (p for p in partitions if p is not None),
+            key=lambda p: p.start or datetime.min,
+        )
+
+    def missing_ranges(self, partitions: List[Partition], now: datetime):
+        """Ranges from the highest existing bound up to ``ahead`` intervals past now."""
+        horizon = floor_boundary(now, self.interval)
+        for _ in range(self.ahead + 1):
+            horizon = next_boundary(horizon, self.interval)
+        ends = [p.end for p in partitions if p.end is not None]
+        start = max(ends) if ends else floor_boundary(now, self.interval)
+        while start < horizon:
+            end = next_boundary(start, self.interval)
+            yield start, end
+            start = end
+
+    def expired(self, partitions: List[Partition], now: datetime) -> List[Partition]:
+        if self.retention_days <= 0:
+            return []
+        cutoff = floor_boundary(now, "daily") - timedelta(days=self.retention_days)
+        return [p for p in partitions if p.end is not None and p.end <= cutoff]
+
+    async def _create_partition(self, start: datetime, end: datetime):
+        name = partition_name(start, self.interval)
+        params = {"start": start, "end": end}
+        async with self.engine.begin() as conn:
+            await conn.execute(text(_LOCK_TIMEOUT))
+            await conn.execute(
+                text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)")
+            )
+            moved = await conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    "WHERE fecha >= :start AND fecha < :end RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                params,
+            )
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start.isoformat(' ')}') "
+                    f"TO ('{end.isoformat(' ')}')"
+                )
+            )
+        logger.info(
+            "Created partition %s [%s, %s)",
+            name,
+            start,
+            end,
+            extra={"moved_rows": moved.rowcount},
+        )
+
+    async def _retire(self, partition: Partition):
+        async with self.engine.begin() as conn:
+            await conn.execute(text(_LOCK_TIMEOUT))
+            await conn.execute(
+                text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}")
+            )
+            if self.retention_action == "drop":
+                await conn.execute(text(f"DROP TABLE {partition.name}"))
+        logger.info(
+            "Retired partition %s (%s), data before %s",
+            partition.name,
+            self.retention_action,
+            partition.end,
+        )
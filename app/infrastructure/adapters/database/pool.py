@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.adapters.database.repositories import (
+    PeriodRepositoryImpl,
+    SpecialRouteRepositoryImpl,
+    VehicleEventRepositoryImpl,
+    VehicleRepositoryImpl,
+)
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_UTILIZATION,
+)
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Matches nothing: warm-up lookups only need the statements, not rows
+_PREWARM_ID = "__prewarm__"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection.
+
+    The metric label is the pool's ``logging_name`` (``pool_logging_name``
+    on the engine).
+    """
+
+    def _do_get(self):
+        engine_name = self._orig_logging_name or "primary"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(engine_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine_name).observe(
+                time.perf_counter() - start
+            )
+
+
+def engine_options(name: str = "primary") -> Dict[str, Any]:
+    """Keyword arguments for ``create_async_engine`` built from Settings."""
+    connect_args: Dict[str, Any] = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+    return {
+        "echo": False,
+        "poolclass": TimedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def instrument_pool(engine: AsyncEngine, name: str = "primary"):
+    """Exposes in-use, idle and capacity connections plus utilization."""
+    pool = engine.pool
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    DB_POOL_CONNECTIONS.labels(name, "in_use").set_function(pool.checkedout)
+    DB_POOL_CONNECTIONS.labels(name, "idle").set_function(pool.checkedin)
+    DB_POOL_CONNECTIONS.labels(name, "capacity").set_function(lambda: capacity)
+    DB_POOL_UTILIZATION.labels(name).set_function(
+        lambda: pool.checkedout() / capacity if capacity else 0.0
+    )
+
+
+# Read-only lookups of the per-event path; running them prepares the exact
+# statements the repositories send on that connection.
+_WARMUP_CALLS = (
+    lambda s: VehicleRepositoryImpl(s).get_active_vehicle_by_id(_PREWARM_ID),
+    lambda s: VehicleRepositoryImpl(s).get_vehicle_tolerancia_tiempo(_PREWARM_ID),
+    lambda s: VehicleEventRepositoryImpl(s).find_evento_descripcion(-1),
+    lambda s: VehicleEventRepositoryImpl(s).get_last_event_with_gps(_PREWARM_ID),
+    lambda s: VehicleEventRepositoryImpl(s).find_eventos_resumen(
+        _PREWARM_ID, -1, date.today(), 0
+    ),
+    lambda s: PeriodRepositoryImpl(s).get_active_periodo(-1),
+    lambda s: PeriodRepositoryImpl(s).get_last_periodo_conductor_for_reset(
+        _PREWARM_ID, -1, datetime.now()
+    ),
+    lambda s: SpecialRouteRepositoryImpl(s).get_active_special_programacion_for_vehicle(
+        _PREWARM_ID, datetime.now()
+    ),
+    lambda s: SpecialRouteRepositoryImpl(s).get_nearby_special_route_detail(
+        -1, 0.0, 0.0, -1
+    ),
+    lambda s: SpecialRouteRepositoryImpl(s).get_initial_tiempoglobal(-1),
+)
+
+
+async def _warm_connection(engine: AsyncEngine) -> int:
+    warmed = 0
+    async with engine.connect() as conn:
+        session = AsyncSession(bind=conn, autoflush=False)
+        for call in _WARMUP_CALLS:
+            try:
+                await call(session)
+                warmed += 1
+            except Exception as e:
+                logger.debug("Warm-up statement failed: %s", e)
+            finally:
+                await session.rollback()
+        await session.close()
+    return warmed
+
+
+async def prewarm_pool(
+    engine: AsyncEngine,
+    connections: int = settings.DB_PREWARM_CONNECTIONS,
+    timeout: float = settings.DB_PREWARM_TIMEOUT_SECONDS,
+):
+    """Opens pooled connections concurrently and prepares the hot statements.
+
+    Never fails startup: an unreachable database only logs a warning and
+    requests then connect lazily as before.
+    """
+    # Overflow connections are closed on checkin, so only the base pool helps
+    connections = min(connections, engine.pool.size())
+    if connections <= 0:
+        return
+    start = time.perf_counter()
+    try:
+        warmed = await asyncio.wait_for(
+            asyncio.gather(*(_warm_connection(engine) for _ in range(connections))),
+            timeout,
+        )
+    except Exception as e:
+        logger.warning("Database pool prewarm failed: %s", e)
+        return
+    logger.info(
+        "Prewarmed %d database connections in %.0f ms",
+        connections,
+        (time.perf_counter() - start) * 1000,
+        extra={"statements": sum(warmed)},
+    )
@@ -1,9 +1,11 @@
 # flake8: noqa
+import logging
 import re
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
-from sqlalchemy import and_, func, select, text
+import geoalchemy2 as ga
+from sqlalchemy import cast, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -27,6 +29,10 @@ from app.core.ports.repositories import (
     VehicleEventRepository,
     VehicleRepository,
 )
+from app.infrastructure.adapters.cache.local_cache import LocalCache, cached
+from app.infrastructure.adapters.cache.period_state import PeriodStateStore
+from app.infrastructure.adapters.cache.vehicle_state import VehicleStateStore
+from app.infrastructure.adapters.database.instrumentation import instrumented
 from app.infrastructure.adapters.database.models import (
     EjesViales,
     Eventos,
@@ -44,6 +50,12 @@ from app.infrastructure.adapters.database.models import (
     RutasEspecialesDetalles,
     Vehiculos,
 )
+from app.infrastructure.adapters.database.write_behind import (
+    OdometerWriter,
+    ResourceStatusWriter,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _parse_float(value: Optional[str]) -> Optional[float]:
@@ -158,9 +170,37 @@ def _to_evento_resumen_entity(model: EventosResumen) -> Optional[EventoResumen]:
     )
 
 
+def _cached_load_session(
+    lookup_session: AsyncSession,
+    read_session: AsyncSession,
+    cache: Optional[LocalCache],
+) -> AsyncSession:
+    # Invalidations follow commits on the primary: a lagging replica could
+    # hand back the row just evicted and it would stay cached until the TTL
+    return read_session if cache is None else lookup_session
+
+
+@instrumented("vehicle_event_repository")
 class VehicleEventRepositoryImpl(VehicleEventRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+        descripcion_cache: Optional[LocalCache] = None,
+        odometer_writer: Optional[OdometerWriter] = None,
+        lookup_session: Optional[AsyncSession] = None,
+    ):
         self.session = session
+        # Lag-tolerant lookups may go to a replica; everything else, including
+        # reads of rows this pipeline writes, stays on the primary session.
+        self.read_session = read_session or session
+        # Primary session for cached lookups, separate so they can run
+        # alongside the event's other reads
+        self.lookup_session = lookup_session or session
+        # Shared across requests, evicted by the cache invalidation listener
+        self.descripcion_cache = descripcion_cache
+        # Buffers readings for a bulk insert once the event commits
+        self.odometer_writer = odometer_writer
 
     async def save_event(self, event: VehicleEvent) -> int:
         new_event = Eventos(
@@ -187,6 +227,9 @@ class VehicleEventRepositoryImpl(VehicleEventRepository):
         return new_event.idevento
 
     async def save_odometer(self, vehicle_id: str, value: float, date: datetime):
+        if self.odometer_writer is not None:
+            self.odometer_writer.stage(self.session, (vehicle_id, value, date))
+            return
         new_odometer = Odometros(idvehiculo=vehicle_id, valor=value, fecha=date)
         self.session.add(new_odometer)
         await self.session.flush()
@@ -204,8 +247,9 @@ class VehicleEventRepositoryImpl(VehicleEventRepository):
                 Eventos.latitud
                 != "N",  # Handle malformed string like 'N' which can become 0.0
                 Eventos.longitud != "W",
-                Eventos.fecha
-                > datetime.now() - timedelta(days=2),  # SP uses 'now() - 2 days'
+                # SP uses 'now() - 2 days'. Also what lets the planner prune
+                # every eventos partition but the last few days.
+                Eventos.fecha > datetime.now() - timedelta(days=2),
             )
             .order_by(Eventos.idevento.desc())
             .limit(1)
@@ -249,16 +293,16 @@ class VehicleEventRepositoryImpl(VehicleEventRepository):
         longitude: float,
         department: str,
     ):
-        print("ejes viales")
+        logger.debug("Inserting EjesViales entry", extra={"city": city, "sampled": True})
         new_entry = EjesViales(
             direccion=address,
             municipio=city,
             latitud=latitude,
             longitud=longitude,
             dirnoform=address,
-            the_geom=func.ST_GeomFromText(f"POINT({longitude} {latitude})", 4326),
+            the_geom=func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
             flat_geom=func.ST_Transform(
-                func.ST_GeomFromText(f"POINT({longitude} {latitude})", 4326), 21892
+                func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), 21892
             ),
             xpos=0,
             ypos=0,
@@ -269,11 +313,17 @@ class VehicleEventRepositoryImpl(VehicleEventRepository):
     async def find_evento_descripcion(
         self, event_code: int
     ) -> Optional[EventoDescripcion]:
-        stmt = select(EventosDesc).where(
-            EventosDesc.evento == str(event_code)
-        )  # event is text in DB
-        result = await self.session.execute(stmt)
-        return _to_evento_descripcion_entity(result.scalar_one_or_none())
+        async def _load():
+            stmt = select(EventosDesc).where(
+                EventosDesc.evento == str(event_code)
+            )  # event is text in DB
+            session = _cached_load_session(
+                self.lookup_session, self.read_session, self.descripcion_cache
+            )
+            result = await session.execute(stmt)
+            return _to_evento_descripcion_entity(result.scalar_one_or_none())
+
+        return await cached(self.descripcion_cache, str(event_code), _load)
 
     async def find_eventos_resumen(
         self, vehicle_id: str, event_code: int, date: date, hour: int
@@ -316,16 +366,38 @@ class VehicleEventRepositoryImpl(VehicleEventRepository):
         await self.session.flush()
 
 
+@instrumented("vehicle_repository")
 class VehicleRepositoryImpl(VehicleRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+        tolerancia_cache: Optional[LocalCache] = None,
+        vehicle_state: Optional[VehicleStateStore] = None,
+        resource_writer: Optional[ResourceStatusWriter] = None,
+        lookup_session: Optional[AsyncSession] = None,
+    ):
         self.session = session
+        self.read_session = read_session or session
+        self.lookup_session = lookup_session or session
+        self.tolerancia_cache = tolerancia_cache
+        self.vehicle_state = vehicle_state
+        # Coalesces "Recursos" GPS status per resource once the event commits
+        self.resource_writer = resource_writer
 
     async def get_active_vehicle_by_id(self, vehicle_id: str) -> Optional[Vehicle]:
+        if self.vehicle_state is not None:
+            vehicle = self.vehicle_state.get(vehicle_id)
+            if vehicle is not None:
+                return vehicle
         stmt = select(Vehiculos).where(
             Vehiculos.idvehiculo == vehicle_id, Vehiculos.estado == "Y"
         )
         result = await self.session.execute(stmt)
-        return _to_vehicle_entity(result.scalar_one_or_none())
+        vehicle = _to_vehicle_entity(result.scalar_one_or_none())
+        if vehicle is not None and self.vehicle_state is not None:
+            self.vehicle_state.stage(self.session, vehicle)
+        return vehicle
 
     async def update_vehicle_status(self, vehicle: Vehicle):
         stmt = select(Vehiculos).where(Vehiculos.idvehiculo == vehicle.idvehiculo)
@@ -361,28 +433,42 @@ class VehicleRepositoryImpl(VehicleRepository):
             )  # Can be set to NULL by SP logic
 
             await self.session.flush()
+            if self.vehicle_state is not None:
+                self.vehicle_state.stage(self.session, _to_vehicle_entity(vehicle_orm))
         else:
             # This scenario (vehicle not found but exists in SP 'if(found)') shouldn't happen if `get_active_vehicle_by_id`
             # is called first and returns a vehicle. If it can happen, handle accordingly.
             pass
 
     async def get_vehicle_tolerancia_tiempo(self, vehicle_contratista: str) -> int:
-        # Example of a simplified regex matching for direct string comparison:
-        stmt = (
-            select(Procesos)
-            .where(
-                Procesos.contratistas.ilike(f"%{vehicle_contratista}%"),
-                Procesos.toleranciatiempo != 0,
+        async def _load():
+            # Example of a simplified regex matching for direct string comparison:
+            stmt = (
+                select(Procesos)
+                .where(
+                    Procesos.contratistas.ilike(f"%{vehicle_contratista}%"),
+                    Procesos.toleranciatiempo != 0,
+                )
+                .limit(1)
             )
-            .limit(1)
-        )
-        result = await self.session.execute(stmt)
-        proceso = result.scalar_one_or_none()
-        return proceso.toleranciatiempo if proceso else 0
+            session = _cached_load_session(
+                self.lookup_session, self.read_session, self.tolerancia_cache
+            )
+            result = await session.execute(stmt)
+            proceso = result.scalar_one_or_none()
+            return proceso.toleranciatiempo if proceso else 0
+
+        return await cached(self.tolerancia_cache, vehicle_contratista, _load)
 
     async def update_resource_gps_status(
         self, recurso_id: str, contratista_id: str, event_date: datetime, gps_ok: bool
     ):
+        if self.resource_writer is not None:
+            self.resource_writer.stage(
+                self.session,
+                (recurso_id, contratista_id, event_date, "OK" if gps_ok else "NOTOK"),
+            )
+            return
         stmt = select(Recursos).where(
             Recursos.recurso == recurso_id, Recursos.contratista == contratista_id
         )
@@ -396,14 +482,30 @@ class VehicleRepositoryImpl(VehicleRepository):
             await self.session.flush()
 
 
+@instrumented("period_repository")
 class PeriodRepositoryImpl(PeriodRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        lookup_session: Optional[AsyncSession] = None,
+        period_state: Optional[PeriodStateStore] = None,
+    ):
         self.session = session
+        # Periods are never read from a replica: a lagging read would open a
+        # second period. A separate primary session lets the lookup run
+        # alongside the event's other reads.
+        self.lookup_session = lookup_session or session
+        self.period_state = period_state
 
     async def get_active_periodo(self, period_id: int) -> Optional[PeriodoActivo]:
-        stmt = select(PeriodosActivo).where(PeriodosActivo.idperiodo == period_id)
-        result = await self.session.execute(stmt)
-        return _to_periodo_activo_entity(result.scalar_one_or_none())
+        async def _load():
+            stmt = select(PeriodosActivo).where(PeriodosActivo.idperiodo == period_id)
+            result = await self.lookup_session.execute(stmt)
+            return _to_periodo_activo_entity(result.scalar_one_or_none())
+
+        if self.period_state is None:
+            return await _load()
+        return await self.period_state.active.get_or_load(period_id, _load)
 
     async def create_periodo_activo(
         self, vehicle_id: str, start_date: datetime, driver_id: Optional[int]
@@ -413,15 +515,29 @@ class PeriodRepositoryImpl(PeriodRepository):
         )
         self.session.add(new_periodo)
         await self.session.flush()
+        if self.period_state is not None:
+            self.period_state.stage(
+                self.session,
+                self.period_state.active,
+                new_periodo.idperiodo,
+                _to_periodo_activo_entity(new_periodo),
+            )
         return new_periodo.idperiodo
 
     async def update_periodo_activo_end_date(self, period_id: int, end_date: datetime):
-        stmt = select(PeriodosActivo).where(PeriodosActivo.idperiodo == period_id)
+        # One UPDATE ... RETURNING instead of loading the row first
+        stmt = (
+            update(PeriodosActivo)
+            .where(PeriodosActivo.idperiodo == period_id)
+            .values(fechahasta=end_date)
+            .returning(PeriodosActivo)
+        )
         result = await self.session.execute(stmt)
-        periodo_orm = result.scalar_one_or_none()
-        if periodo_orm:
-            periodo_orm.fechahasta = end_date
-            await self.session.flush()
+        periodo = _to_periodo_activo_entity(result.scalar_one_or_none())
+        if self.period_state is not None:
+            self.period_state.stage(
+                self.session, self.period_state.active, period_id, periodo
+            )
 
     async def get_last_periodo_conductor_for_reset(
         self, vehicle_id: str, driver_id: int, current_date: datetime
@@ -431,18 +547,26 @@ class PeriodRepositoryImpl(PeriodRepository):
         # It's looking for a period that ended very recently.
         # The SP code here is a bit ambiguous as `fecha_` is an input and `fechahasta` is a column.
         # Assuming it means current_date - fechahasta < 1 minute.
-        stmt = (
-            select(PeriodosConductores)
-            .where(
-                PeriodosConductores.idvehiculo == vehicle_id,
-                PeriodosConductores.idconductor == driver_id,
-            )
-            .order_by(PeriodosConductores.fechadesde.desc())
-            .limit(1)
-        )  # Get the last one
+        async def _load():
+            stmt = (
+                select(PeriodosConductores)
+                .where(
+                    PeriodosConductores.idvehiculo == vehicle_id,
+                    PeriodosConductores.idconductor == driver_id,
+                )
+                .order_by(PeriodosConductores.fechadesde.desc())
+                .limit(1)
+            )  # Get the last one
 
-        result = await self.session.execute(stmt)
-        last_period = _to_periodo_conductor_entity(result.scalar_one_or_none())
+            result = await self.session.execute(stmt)
+            return _to_periodo_conductor_entity(result.scalar_one_or_none())
+
+        if self.period_state is None:
+            last_period = await _load()
+        else:
+            last_period = await self.period_state.drivers.get_or_load(
+                (vehicle_id, driver_id), _load
+            )
 
         if last_period and last_period.fechahasta:
             if (current_date - last_period.fechahasta) < timedelta(minutes=1):
@@ -456,14 +580,37 @@ class PeriodRepositoryImpl(PeriodRepository):
     async def update_periodo_conductor_end_date(
         self, period_id: int, end_date: Optional[datetime]
     ):
-        stmt = select(PeriodosConductores).where(
-            PeriodosConductores.idperiodo == period_id
+        stmt = (
+            update(PeriodosConductores)
+            .where(PeriodosConductores.idperiodo == period_id)
+            .values(fechahasta=end_date)
+            .returning(PeriodosConductores)
         )
         result = await self.session.execute(stmt)
-        periodo_orm = result.scalar_one_or_none()
-        if periodo_orm:
-            periodo_orm.fechahasta = end_date
-            await self.session.flush()
+        self._stage_driver_period(
+            _to_periodo_conductor_entity(result.scalar_one_or_none())
+        )
+
+    async def create_periodo_conductor(
+        self, vehicle_id: str, driver_id: int, start_date: datetime
+    ) -> int:
+        new_periodo = PeriodosConductores(
+            idvehiculo=vehicle_id, idconductor=driver_id, fechadesde=start_date
+        )
+        self.session.add(new_periodo)
+        await self.session.flush()
+        self._stage_driver_period(_to_periodo_conductor_entity(new_periodo))
+        return new_periodo.idperiodo
+
+    def _stage_driver_period(self, periodo: Optional[PeriodoConductor]):
+        if self.period_state is None or periodo is None:
+            return
+        self.period_state.stage(
+            self.session,
+            self.period_state.drivers,
+            (periodo.idvehiculo, periodo.idconductor),
+            periodo,
+        )
 
     async def deactivate_current_driver(self, vehicle_id: str, driver_id: int):
         stmt = select(Vehiculos).where(
@@ -477,18 +624,32 @@ class PeriodRepositoryImpl(PeriodRepository):
             await self.session.flush()
 
 
+@instrumented("special_route_repository")
 class SpecialRouteRepositoryImpl(SpecialRouteRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_session: Optional[AsyncSession] = None,
+        tiempoglobal_cache: Optional[LocalCache] = None,
+        lookup_session: Optional[AsyncSession] = None,
+    ):
         self.session = session
+        self.read_session = read_session or session
+        self.lookup_session = lookup_session or session
+        self.tiempoglobal_cache = tiempoglobal_cache
 
     async def get_active_special_programacion_for_vehicle(
         self, vehicle_id: str, current_date: datetime
     ) -> Optional[ProgramacionEspecialVehiculo]:
+        # Range on the raw column instead of date(fechasalida) so the
+        # ix_prog_especiales_vehiculo_abiertas index can be used
+        day_start = datetime.combine(current_date.date(), datetime.min.time())
         stmt = (
             select(ProgEspecialesVehiculos)
             .where(
                 ProgEspecialesVehiculos.idvehiculo == vehicle_id,
-                func.date(ProgEspecialesVehiculos.fechasalida) == current_date.date(),
+                ProgEspecialesVehiculos.fechasalida >= day_start,
+                ProgEspecialesVehiculos.fechasalida < day_start + timedelta(days=1),
                 ProgEspecialesVehiculos.finalizado == "N",
                 ProgEspecialesVehiculos.cancelada == "N",
                 ProgEspecialesVehiculos.activa == "S",
@@ -496,47 +657,43 @@ class SpecialRouteRepositoryImpl(SpecialRouteRepository):
             .order_by(ProgEspecialesVehiculos.fechasalida.desc())
             .limit(1)
         )
-        result = await self.session.execute(stmt)
+        result = await self.read_session.execute(stmt)
         return _to_programacion_especial_vehiculo_entity(result.scalar_one_or_none())
 
     async def get_nearby_special_route_detail(
-        self, route_id: int, latitude: float, longitude: float
+        self,
+        route_id: int,
+        latitude: float,
+        longitude: float,
+        programacion_id: Optional[int] = None,
     ) -> Optional[RutaEspecialDetalle]:
-        current_point = func.ST_GeomFromText(f"POINT({longitude} {latitude})", 4326)
+        # Bound coordinates compared with the stored, GiST-indexed geography
+        # (meters), nearest first. The radius varies per point, so ST_DWithin
+        # only rechecks the candidates found through the route and KNN order.
+        current_point = cast(
+            func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+            ga.Geography("POINT", srid=4326),
+        )
+        already_controlled = (
+            select(RutasEspecialesControl.idpunto)
+            .where(
+                RutasEspecialesControl.idprogramacion == programacion_id,
+                RutasEspecialesControl.idpunto == RutasEspecialesDetalles.idpunto,
+            )
+            .exists()
+        )
 
         stmt = (
             select(RutasEspecialesDetalles)
             .join(
                 PuntosControl, RutasEspecialesDetalles.idpunto == PuntosControl.idpunto
             )
-            .outerjoin(
-                RutasEspecialesControl,
-                and_(
-                    RutasEspecialesControl.idpunto == RutasEspecialesDetalles.idpunto,
-                    RutasEspecialesControl.idprogramacion
-                    == ProgEspecialesVehiculos.idprogramacion,  # This join needs to be careful
-                ),
-            )
             .where(
                 RutasEspecialesDetalles.idruta == route_id,
-                func.ST_Distance(
-                    func.ST_Transform(
-                        current_point, 2163
-                    ),  # Transform to a projected CRS for distance in meters
-                    func.ST_Transform(
-                        func.ST_GeomFromText(
-                            text(
-                                "'POINT(' || puntoscontrol.longitud || ' ' || "
-                                "puntoscontrol.latitud || ')'"
-                            ),
-                            4326,
-                        ),
-                        2163,
-                    ),
-                )
-                <= PuntosControl.radio,
-                RutasEspecialesControl.idpunto.is_(None),  # rc.idpunto IS NULL
+                func.ST_DWithin(PuntosControl.geom, current_point, PuntosControl.radio),
+                ~already_controlled,
             )
+            .order_by(PuntosControl.geom.op("<->")(current_point))
             .limit(1)
         )
         result = await self.session.execute(stmt)
@@ -546,14 +703,20 @@ class SpecialRouteRepositoryImpl(SpecialRouteRepository):
         # SP query:
         # SELECT tiempoglobal FROM rutas_especiales_detalles
         # WHERE idruta = progespecial_.idruta ORDER BY orden LIMIT 1;
-        stmt = (
-            select(RutasEspecialesDetalles.tiempoglobal)
-            .where(RutasEspecialesDetalles.idruta == route_id)
-            .order_by(RutasEspecialesDetalles.orden)
-            .limit(1)
-        )
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        async def _load():
+            stmt = (
+                select(RutasEspecialesDetalles.tiempoglobal)
+                .where(RutasEspecialesDetalles.idruta == route_id)
+                .order_by(RutasEspecialesDetalles.orden)
+                .limit(1)
+            )
+            session = _cached_load_session(
+                self.lookup_session, self.read_session, self.tiempoglobal_cache
+            )
+            result = await session.execute(stmt)
+            return result.scalar_one_or_none()
+
+        return await cached(self.tiempoglobal_cache, route_id, _load)
 
     async def insert_ruta_especial_control(
         self,
@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.infrastructure.adapters.database.models import Vehiculos
+from app.infrastructure.adapters.metrics.prometheus_metrics import CACHE_REQUESTS
+from app.infrastructure.config.settings import settings
+
+# DATABASE_URL is always the shard called "default"
+DEFAULT_SHARD = "default"
+
+
+def parse_mapping(spec: str) -> Dict[str, str]:
+    """Parses ``"a=x,b=y"``; values may contain ``=`` (only the first splits)."""
+    mapping = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        if not value:
+            raise ValueError(f"Expected key=value, got '{item}'")
+        mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def _id_key(vehicle_id: str) -> Tuple[int, object]:
+    # Numeric ids compare as numbers, anything else lexicographically
+    return (0, int(vehicle_id)) if vehicle_id.isdigit() else (1, vehicle_id)
+
+
+@dataclass(frozen=True)
+class VehicleRange:
+    low: str
+    high: str  # Inclusive
+    shard: str
+
+    def contains(self, vehicle_id: str) -> bool:
+        return _id_key(self.low) <= _id_key(vehicle_id) <= _id_key(self.high)
+
+
+def parse_vehicle_ranges(spec: str) -> List[VehicleRange]:
+    """Parses ``"1:4999=east,5000:9999=west"`` into inclusive id ranges."""
+    ranges = []
+    for bounds, shard in parse_mapping(spec).items():
+        low, sep, high = bounds.partition(":")
+        if not sep:
+            raise ValueError(f"Expected low:high=shard, got '{bounds}={shard}'")
+        ranges.append(VehicleRange(low.strip(), high.strip(), shard))
+    return ranges
+
+
+class ShardRouter:
+    """Resolves the database shard that owns a vehicle's rows.
+
+    Explicit vehicle-id ranges win; otherwise the vehicle's contractor is
+    read from the directory database (``vehiculos`` on the default shard)
+    and mapped through ``contractor_shards``. Anything unmapped stays on
+    the default shard. Resolutions are kept in a bounded LRU with a TTL, so
+    only the first event of a vehicle pays the directory lookup.
+    """
+
+    def __init__(
+        self,
+        shards: Iterable[str],
+        directory: async_sessionmaker,
+        contractor_shards: Optional[Dict[str, str]] = None,
+        vehicle_ranges: Optional[List[VehicleRange]] = None,
+        cache_size: int = settings.SHARD_CACHE_SIZE,
+        cache_ttl: float = settings.SHARD_CACHE_TTL_SECONDS,
+    ):
+        self.shards = set(shards) | {DEFAULT_SHARD}
+        self.directory = directory
+        self.contractor_shards = contractor_shards or {}
+        self.vehicle_ranges = vehicle_ranges or []
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+        targets = set(self.contractor_shards.values())
+        targets.update(r.shard for r in self.vehicle_ranges)
+        unknown = targets - self.shards
+        if unknown:
+            raise ValueError(f"Unknown shards in routing config: {sorted(unknown)}")
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.shards) > 1
+
+    async def shard_for_vehicle(self, vehicle_id: Optional[str]) -> str:
+        if not self.enabled or not vehicle_id:
+            return DEFAULT_SHARD
+
+        cached = self._cache.get(vehicle_id)
+        if cached is not None and cached[1] > time.monotonic():
+            self._cache.move_to_end(vehicle_id)
+            CACHE_REQUESTS.labels("vehicle_shard", "hit").inc()
+            return cached[0]
+        CACHE_REQUESTS.labels("vehicle_shard", "miss").inc()
+
+        shard = await self._resolve(vehicle_id)
+        self._cache[vehicle_id] = (shard, time.monotonic() + self.cache_ttl)
+        self._cache.move_to_end(vehicle_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return shard
+
+    def invalidate(self, vehicle_id: Optional[str] = None):
+        """Forgets one vehicle (e.g. after a contractor change) or all of them."""
+        if vehicle_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(vehicle_id, None)
+
+    async def _resolve(self, vehicle_id: str) -> str:
+        for vehicle_range in self.vehicle_ranges:
+            if vehicle_range.contains(vehicle_id):
+                return vehicle_range.shard
+        if not self.contractor_shards:
+            return DEFAULT_SHARD
+        contractor = await self._contractor_of(vehicle_id)
+        return self.contractor_shards.get(contractor or "", DEFAULT_SHARD)
+
+    async def _contractor_of(self, vehicle_id: str) -> Optional[str]:
+        async with self.directory() as session:
+            result = await session.execute(
+                select(Vehiculos.contratista).where(Vehiculos.idvehiculo == vehicle_id)
+            )
+            return result.scalar_one_or_none()
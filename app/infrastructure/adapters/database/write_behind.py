@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, String, column, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.infrastructure.adapters.database.models import Odometros, Recursos
+from app.infrastructure.adapters.metrics.prometheus_metrics import WRITE_BEHIND_ROWS
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ResourceStatus = Tuple[str, str, datetime, str]  # recurso, contratista, fecha, estado
+OdometerReading = Tuple[str, float, datetime]  # idvehiculo, valor, fecha
+
+
+class WriteBehindWriter(ABC):
+    """Buffers low-value writes of committed events and flushes them in bulk.
+
+    Repositories stage rows on the request session; ``apply_committed``
+    moves them into the buffer once that transaction committed, so a
+    rolled-back event writes nothing. A background task flushes every
+    ``flush_interval`` seconds, or as soon as ``batch_size`` rows are
+    waiting, in a transaction of its own. A failed flush puts the batch
+    back for the next attempt. Rows still buffered when the process dies
+    are lost, which is the trade-off for taking them off the event path.
+    """
+
+    name = "write_behind"
+    _STAGED = "write_behind"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        flush_interval: float = settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = settings.WRITE_BEHIND_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def stage(self, session: AsyncSession, row: tuple):
+        session.info.setdefault(self._STAGED, []).append(row)
+
+    def apply_committed(self, session: AsyncSession):
+        for row in session.info.pop(self._STAGED, []):
+            self._add(row)
+        if self.pending_count() >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Drain what is left; give up on the first failure
+        try:
+            while await self.flush():
+                pass
+        except Exception:
+            logger.exception(
+                "Dropping %d buffered %s rows", self.pending_count(), self.name
+            )
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.flush() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Write-behind flush of %s failed", self.name)
+
+    async def flush(self) -> int:
+        batch = self._take(self.batch_size)
+        if not batch:
+            return 0
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await self._write(session, batch)
+        except BaseException:
+            self._restore(batch)
+            raise
+        WRITE_BEHIND_ROWS.labels(self.name, "written").inc(len(batch))
+        return len(batch)
+
+    @abstractmethod
+    def pending_count(self) -> int:
+        pass
+
+    @abstractmethod
+    def _add(self, row: tuple):
+        """Buffers one committed row."""
+
+    @abstractmethod
+    def _take(self, limit: int):
+        """Removes and returns up to ``limit`` buffered rows."""
+
+    @abstractmethod
+    def _restore(self, batch):
+        """Puts back a batch whose flush failed."""
+
+    @abstractmethod
+    async def _write(self, session: AsyncSession, batch):
+        pass
+
+
+class ResourceStatusWriter(WriteBehindWriter):
+    """``"Recursos"`` GPS status, coalesced to the latest per resource."""
+
+    name = "recursos"
+    _STAGED = "resource_status_updates"
+
+    def __init__(self, session_factory: async_sessionmaker, **kwargs):
+        super().__init__(session_factory, **kwargs)
+        self._pending: Dict[Tuple[str, str], Tuple[datetime, str]] = {}
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _add(self, row: ResourceStatus):
+        recurso, contratista, fecha, estado = row
+        current = self._pending.get((recurso, contratista))
+        if current is not None:
+            WRITE_BEHIND_ROWS.labels(self.name, "coalesced").inc()
+            if fecha < current[0]:
+                return  # An older event arriving late
+        self._pending[(recurso, contratista)] = (fecha, estado)
+
+    def _take(self, limit: int) -> Dict[Tuple[str, str], Tuple[datetime, str]]:
+        keys = list(itertools.islice(self._pending, limit))
+        return {key: self._pending.pop(key) for key in keys}
+
+    def _restore(self, batch: Dict[Tuple[str, str], Tuple[datetime, str]]):
+        for (recurso, contratista), (fecha, estado) in batch.items():
+            current = self._pending.get((recurso, contratista))
+            if current is None or fecha >= current[0]:
+                self._pending[(recurso, contratista)] = (fecha, estado)
+
+    async def _write(
+        self,
+        session: AsyncSession,
+        batch: Dict[Tuple[str, str], Tuple[datetime, str]],
+    ):
+        # One UPDATE ... FROM (VALUES ...) for the whole batch
+        rows = values(
+            column("recurso", String),
+            column("contratista", String),
+            column("fechagps", DateTime),
+            column("estadogps", String),
+            name="v",
+        ).data([(r, c, fecha, estado) for (r, c), (fecha, estado) in batch.items()])
+        await session.execute(
+            update(Recursos)
+            .where(
+                Recursos.recurso == rows.c.recurso,
+                Recursos.contratista == rows.c.contratista,
+            )
+            .values(fechagps=rows.c.fechagps, estadogps=rows.c.estadogps)
+            .execution_options(synchronize_session=False)
+        )
+
+
+class OdometerWriter(WriteBehindWriter):
+    """``odometros`` readings, inserted in bulk.
+
+    A reading is skipped when it moved less than ``min_delta`` and came
+    less than ``min_interval`` seconds after the vehicle's last kept
+    reading (both 0 by default: every reading is kept). At most
+    ``max_pending`` readings are buffered; beyond that the oldest go.
+    """
+
+    name = "odometros"
+    _STAGED = "odometer_readings"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        min_delta: float = settings.ODOMETER_MIN_DELTA,
+        min_interval: float = settings.ODOMETER_MIN_INTERVAL_SECONDS,
+        max_pending: int = settings.WRITE_BEHIND_MAX_PENDING,
+        **kwargs,
+    ):
+        super().__init__(session_factory, **kwargs)
+        self.min_delta = min_delta
+        self.min_interval = timedelta(seconds=min_interval)
+        self.max_pending = max_pending
+        self._pending: Deque[OdometerReading] = deque()
+        self._last_kept: Dict[str, Tuple[float, datetime]] = {}
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _add(self, row: OdometerReading):
+        vehicle_id, value, fecha = row
+        last = self._last_kept.get(vehicle_id)
+        if (
+            last is not None
+            and abs(value - last[0]) < self.min_delta
+            and fecha - last[1] < self.min_interval
+        ):
+            WRITE_BEHIND_ROWS.labels(self.name, "skipped").inc()
+            return
+        self._last_kept[vehicle_id] = (value, fecha)
+        self._append(row)
+
+    def _append(self, row: OdometerReading, left: bool = False):
+        if len(self._pending) >= self.max_pending:
+            WRITE_BEHIND_ROWS.labels(self.name, "dropped").inc()
+            if left:
+                return
+            self._pending.popleft()
+        if left:
+            self._pending.appendleft(row)
+        else:
+            self._pending.append(row)
+
+    def _take(self, limit: int) -> List[OdometerReading]:
+        return [self._pending.popleft() for _ in range(min(limit, len(self._pending)))]
+
+    def _restore(self, batch: List[OdometerReading]):
+        for row in reversed(batch):
+            self._append(row, left=True)
+
+    async def _write(self, session: AsyncSession, batch: List[OdometerReading]):
+        # (idvehiculo, fecha) is the key: the last reading for it wins, and
+        # rows already stored (a flush retried after commit) are left alone
+        readings = {(vehicle_id, fecha): value for vehicle_id, value, fecha in batch}
+        await session.execute(
+            pg_insert(Odometros)
+            .values(
+                [
+                    {"idvehiculo": vehicle_id, "valor": value, "fecha": fecha}
+                    for (vehicle_id, fecha), value in readings.items()
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["idvehiculo", "fecha"])
+        )
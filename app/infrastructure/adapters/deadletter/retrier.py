@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+from app.infrastructure.adapters.deadletter.store import (
+    PERMANENT,
+    DeadLetterStore,
+    classify_error,
+)
+from app.infrastructure.adapters.metrics.prometheus_metrics import DEAD_LETTER_RETRIES
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Replay = Callable[[dict], Awaitable[str]]
+
+
+def backoff_delay(attempts: int, base: float, maximum: float) -> float:
+    """Exponential backoff after ``attempts`` failures, half of it jittered."""
+    delay = min(maximum, base * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class DeadLetterRetrier:
+    """Background task replaying pending dead letters off the request path.
+
+    Due records are replayed one at a time in arrival order. A transient
+    failure schedules the next attempt with exponential backoff until
+    ``max_attempts``; a permanent one parks the record for an operator,
+    who can inspect and requeue it from ``/admin/dead-letters``.
+    """
+
+    def __init__(
+        self,
+        store: DeadLetterStore,
+        replay: Replay,
+        poll_interval: float = settings.DEAD_LETTER_RETRY_POLL_SECONDS,
+        batch_size: int = settings.DEAD_LETTER_RETRY_BATCH,
+        base_delay: float = settings.DEAD_LETTER_RETRY_BASE_SECONDS,
+        max_delay: float = settings.DEAD_LETTER_RETRY_MAX_SECONDS,
+        max_attempts: int = settings.DEAD_LETTER_MAX_ATTEMPTS,
+    ):
+        self.store = store
+        self.replay = replay
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.retry_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Dead-letter retry pass failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def retry_due(self, now: Optional[float] = None) -> int:
+        """Replays every due record once; returns how many succeeded."""
+        succeeded = 0
+        for record in self.store.due(now or time.time(), self.batch_size):
+            record.attempts += 1
+            try:
+                await self.replay(record.payload)
+            except Exception as e:
+                record.error = f"{type(e).__name__}: {e}"
+                record.error_class = classify_error(e)
+                if record.error_class == PERMANENT:
+                    record.status = PERMANENT
+                elif record.attempts >= self.max_attempts:
+                    record.status = "exhausted"
+                else:
+                    record.next_attempt_at = time.time() + backoff_delay(
+                        record.attempts, self.base_delay, self.max_delay
+                    )
+                DEAD_LETTER_RETRIES.labels(
+                    "retry" if record.status == "pending" else record.status
+                ).inc()
+                logger.warning(
+                    "Dead-letter replay failed: %s",
+                    record.error,
+                    extra={
+                        "dead_letter_id": record.id,
+                        "attempts": record.attempts,
+                        "vehicle_id": record.payload.get("idveh"),
+                    },
+                )
+            else:
+                record.status = "done"
+                succeeded += 1
+                DEAD_LETTER_RETRIES.labels("succeeded").inc()
+            await self.store.save(record)
+        return succeeded
@@ -0,0 +1,190 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import IO, Dict, List, Optional, Tuple
+
+from sqlalchemy import exc as sa_exc
+
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# SQLSTATE classes/codes worth retrying: connection problems, serialization
+# failures and deadlocks, resource exhaustion, cancellations (statement
+# timeout, admin shutdown), lock timeouts and system errors.
+_TRANSIENT_SQLSTATES = ("08", "40", "53", "57", "58", "55P03")
+
+# Claimed path and its lock file, held for the life of the process
+_claimed: Dict[str, Tuple[str, IO]] = {}
+
+
+def claim_path(base: str) -> str:
+    """Returns a dead-letter file this process owns among those of ``base``.
+
+    Each uvicorn worker takes the first free slot (``base`` itself, then
+    ``name.1.jsonl``, ``name.2.jsonl``...) under an exclusive ``flock``, so
+    workers never replay or compact each other's records. The lock goes
+    away with the process, and the worker replacing it takes over its file.
+    """
+    if base in _claimed:
+        return _claimed[base][0]
+    root, ext = os.path.splitext(base)
+    slot = 0
+    while True:
+        path = f"{root}.{slot}{ext}" if slot else base
+        lock = open(f"{path}.lock", "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            slot += 1
+            continue
+        _claimed[base] = (path, lock)
+        return path
+
+
+def _sqlstate(error: BaseException) -> Optional[str]:
+    for candidate in (error, getattr(error, "orig", None), error.__cause__):
+        code = getattr(candidate, "sqlstate", None) or getattr(
+            candidate, "pgcode", None
+        )
+        if isinstance(code, str):
+            return code
+    return None
+
+
+def classify_error(error: BaseException) -> str:
+    """``transient`` when retrying the same event later can succeed."""
+    if isinstance(
+        error,
+        (sa_exc.OperationalError, sa_exc.TimeoutError, asyncio.TimeoutError, OSError),
+    ):
+        return TRANSIENT
+    if isinstance(error, sa_exc.DBAPIError):
+        if error.connection_invalidated:
+            return TRANSIENT
+        code = _sqlstate(error)
+        if code and code.startswith(_TRANSIENT_SQLSTATES):
+            return TRANSIENT
+    return PERMANENT
+
+
+@dataclass
+class DeadLetter:
+    payload: dict  # The request body, replayed as-is
+    error: str
+    error_class: str
+    # pending (waiting for a retry) | done | permanent | exhausted
+    status: str = "pending"
+    attempts: int = 0
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.time)
+    next_attempt_at: float = field(default_factory=time.time)
+
+
+class DeadLetterStore:
+    """Append-only JSON-lines file of failed events.
+
+    Every change appends the full record; on load the last line per ``id``
+    wins and a torn last line (crash mid-write) is skipped. The file is
+    rewritten with only the records still needing attention once it holds
+    ``compact_ratio`` times more lines than that. Appends run in a thread
+    and are serialised, so a burst of failures never blocks the event loop
+    on disk writes.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.DEAD_LETTER_PATH,
+        compact_ratio: int = 4,
+    ):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self._records: Dict[str, DeadLetter] = {}
+        self._lines = 0
+        self._lock = asyncio.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        record = DeadLetter(**json.loads(line))
+                    except (ValueError, TypeError):
+                        logger.warning("Skipping unreadable dead-letter line")
+                        continue
+                    self._records[record.id] = record
+        except FileNotFoundError:
+            return
+        for record_id in [r.id for r in self._records.values() if r.status == "done"]:
+            del self._records[record_id]
+
+    def get(self, record_id: str) -> Optional[DeadLetter]:
+        return self._records.get(record_id)
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[DeadLetter]:
+        records = [r for r in self._records.values() if status in (None, r.status)]
+        return sorted(records, key=lambda r: r.created_at)[:limit]
+
+    def due(self, now: float, limit: int) -> List[DeadLetter]:
+        """Pending records ready for a retry, oldest first (arrival order)."""
+        return [
+            r
+            for r in self.list("pending", len(self._records))
+            if r.next_attempt_at <= now
+        ][:limit]
+
+    def pending_count(self) -> int:
+        return sum(r.status == "pending" for r in self._records.values())
+
+    async def add(self, payload: dict, error: BaseException) -> DeadLetter:
+        error_class = classify_error(error)
+        record = DeadLetter(
+            payload=payload,
+            error=f"{type(error).__name__}: {error}",
+            error_class=error_class,
+            status="pending" if error_class == TRANSIENT else PERMANENT,
+        )
+        await self.save(record)
+        return record
+
+    async def save(self, record: DeadLetter):
+        async with self._lock:
+            if record.status == "done":
+                self._records.pop(record.id, None)
+            else:
+                self._records[record.id] = record
+            line = json.dumps(asdict(record), default=str) + "\n"
+            await asyncio.to_thread(self._append, line)
+            self._lines += 1
+            if self._lines > self.compact_ratio * max(len(self._records), 64):
+                await asyncio.to_thread(self._compact, list(self._records.values()))
+
+    def _append(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self, records: List[DeadLetter]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(asdict(record), default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._lines = len(records)
@@ -1,10 +1,15 @@
+import logging
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text # Importar text para ejecutar SQL raw
 
 from app.core.domain.services import GeolocationService
 from app.core.domain.entities import GeolocationInfo
+from app.infrastructure.adapters.database.instrumentation import instrumented
 
+logger = logging.getLogger(__name__)
+
+@instrumented("geolocation")
 class PostgresGeolocationAdapter(GeolocationService):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -44,6 +49,6 @@ class PostgresGeolocationAdapter(GeolocationService):
             return GeolocationInfo(address='No Disponible', city='No Disponible', department='No Disponible') # Default if no row
 
         except Exception as e:
-            print(f"Error calling getdireccion in PostgreSQL: {e}")
+            logger.warning("Error calling getdireccion in PostgreSQL: %s", e)
             # En caso de error, retorna un objeto con info 'No Disponible'
             return GeolocationInfo(address='No Disponible', city='No Disponible', department='No Disponible')
\ No newline at end of file
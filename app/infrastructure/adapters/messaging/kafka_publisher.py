@@ -1,32 +1,128 @@
-from aiokafka import AIOKafkaProducer
-import json
 import asyncio
-from app.core.ports.event_publisher import EventPublisher
+import logging
+from typing import Optional, Set
+
+from aiokafka import AIOKafkaProducer
+from opentelemetry.trace import SpanKind
+
 from app.core.domain.entities import VehicleEvent
+from app.core.ports.event_publisher import EventPublisher
+from app.infrastructure.adapters.messaging.serializers import (
+    SCHEMA_VERSION,
+    get_event_serializer,
+)
+from app.infrastructure.adapters.metrics.prometheus_metrics import PUBLISH_RESULTS
+from app.infrastructure.adapters.tracing.tracing import inject_kafka_headers, tracer
 from app.infrastructure.config.settings import settings
-import pydantic
+
+logger = logging.getLogger(__name__)
+
+
 class KafkaEventPublisher(EventPublisher):
     def __init__(self):
-        self.producer = AIOKafkaProducer(
-            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS
-        )
+        # AIOKafkaProducer binds to the running loop, so it is created in start()
+        self.producer: Optional[AIOKafkaProducer] = None
+        self.wait_for_delivery = settings.KAFKA_WAIT_FOR_DELIVERY
+        self.serializer = get_event_serializer(settings.KAFKA_SERIALIZER)
+        self._headers = [
+            ("content-type", self.serializer.content_type.encode("utf-8")),
+            ("schema-version", str(SCHEMA_VERSION).encode("utf-8")),
+        ]
+        self._pending: Set[asyncio.Future] = set()
+        # Delivery counters, updated from the producer callbacks
+        self.delivered_count = 0
+        self.failed_count = 0
+        self._delivered_metric = PUBLISH_RESULTS.labels("delivered")
+        self._failed_metric = PUBLISH_RESULTS.labels("failed")
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
 
     async def start(self):
+        self.producer = AIOKafkaProducer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            linger_ms=settings.KAFKA_LINGER_MS,
+            max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+            compression_type=settings.KAFKA_COMPRESSION_TYPE or None,
+        )
         await self.producer.start()
 
     async def stop(self):
+        if self.producer is None:
+            return
+        # Deliver whatever is still sitting in the accumulator before closing
+        await self.flush()
         await self.producer.stop()
 
+    async def flush(self):
+        await self.producer.flush()
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
     async def publish_processed_event(self, event: VehicleEvent):
+        with tracer.start_as_current_span(
+            "kafka.publish", kind=SpanKind.PRODUCER
+        ) as span:
+            span.set_attribute("vehicle_id", event.vehicle_id)
+            span.set_attribute("event_code", event.event_code)
+            try:
+                delivery = await self._send(event)
+            except Exception:
+                return  # Counted and logged by _send
+            if self.wait_for_delivery:
+                # Failures are counted and logged by _on_delivery; wait()
+                # leaves the delivery alone if this request is cancelled
+                await asyncio.wait([delivery])
+
+    async def enqueue(self, event: VehicleEvent) -> asyncio.Future:
+        with tracer.start_as_current_span(
+            "kafka.publish", kind=SpanKind.PRODUCER
+        ) as span:
+            span.set_attribute("vehicle_id", event.vehicle_id)
+            span.set_attribute("event_code", event.event_code)
+            return await self._send(event)
+
+    async def _send(self, event: VehicleEvent) -> asyncio.Future:
         topic = settings.KAFKA_PROCESSED_EVENTS_TOPIC
-        # Usa model_dump_json para Pydantic v2, y json() para v1
-        if int(pydantic.VERSION.split(".")[0]) >= 2:
-            message = event.model_dump_json().encode("utf-8")
-        else:
-            message = event.json().encode("utf-8")
+        # Keyed by vehicle so all events of a vehicle land on the same partition
+        key = event.vehicle_id.encode("utf-8")
 
         try:
-            await self.producer.send_and_wait(topic, message)
-            print(f"✅ Published processed event to {topic}: {message}")
+            message = self.serializer.serialize(event)
+            # Consumers continue the trace from the traceparent header
+            headers = self._headers + inject_kafka_headers()
+            # send() only waits for room in the batch accumulator, not for the ack
+            delivery = await self.producer.send(
+                topic, message, key=key, headers=headers
+            )
         except Exception as e:
-            print(f"❌ Failed to publish event: {e}")
+            self._record_failure()
+            logger.error(
+                "Failed to enqueue event: %s", e, extra={"vehicle_id": event.vehicle_id}
+            )
+            raise
+
+        self._pending.add(delivery)
+        delivery.add_done_callback(self._on_delivery)
+        return delivery
+
+    def _on_delivery(self, delivery: asyncio.Future):
+        self._pending.discard(delivery)
+        if delivery.cancelled():
+            self._record_failure()
+            return
+        error = delivery.exception()
+        if error is not None:
+            self._record_failure()
+            logger.error("Failed to publish event: %s", error)
+        else:
+            self._record_delivery()
+
+    def _record_delivery(self):
+        self.delivered_count += 1
+        self._delivered_metric.inc()
+
+    def _record_failure(self):
+        self.failed_count += 1
+        self._failed_metric.inc()
@@ -1,12 +1,25 @@
+import logging
+
 from app.core.domain.entities import VehicleEvent
 from app.core.ports.event_publisher import EventPublisher
+
+logger = logging.getLogger(__name__)
+
+
 class NoOpEventPublisher(EventPublisher):
     async def start(self) -> None:
-        print("⚠️ Kafka disabled: no-op start")
+        logger.warning("Kafka disabled: no-op start")
 
     async def stop(self) -> None:
-        print("⚠️ Kafka disabled: no-op stop")
+        logger.warning("Kafka disabled: no-op stop")
 
     async def publish_processed_event(self, event: VehicleEvent) -> None:
         # Log the event locally instead of publishing to Kafka
-        print(f"📤 [NoOpEventPublisher] {event}")
+        logger.debug(
+            "Processed event not published (Kafka disabled)",
+            extra={
+                "vehicle_id": event.vehicle_id,
+                "event_code": event.event_code,
+                "sampled": True,
+            },
+        )
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.domain.entities import VehicleEvent
+from app.core.ports.event_publisher import EventPublisher
+from app.infrastructure.adapters.database.models import EventosOutbox
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEventPublisher(EventPublisher):
+    """Writes processed events to ``eventos_outbox`` in the request transaction.
+
+    The row commits (or rolls back) together with the ``eventos`` insert, so
+    the broker never sees an event that was not persisted.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def publish_processed_event(self, event: VehicleEvent):
+        self.session.add(
+            EventosOutbox(
+                idvehiculo=event.vehicle_id,
+                payload=event.model_dump_json(),
+            )
+        )
+
+
+class OutboxRelay:
+    """Background task that moves pending outbox rows to the real publisher.
+
+    Rows are claimed in id order with ``FOR UPDATE SKIP LOCKED`` so several
+    relays can run side by side, and each row is marked with
+    ``fecha_publicacion`` once the broker acknowledged it (at-least-once).
+    Rows whose delivery failed stay pending and are retried, possibly after
+    later rows of the same vehicle.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        publisher: EventPublisher,
+        batch_size: int = settings.OUTBOX_RELAY_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_RELAY_POLL_INTERVAL_SECONDS,
+        retention: timedelta = timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+        cleanup_interval: float = settings.OUTBOX_CLEANUP_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.cleanup_interval = cleanup_interval
+        self.last_published_id: Optional[int] = None
+        self.published_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._last_cleanup = datetime.min
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                relayed = await self.relay_batch()
+                if datetime.now() - self._last_cleanup >= timedelta(
+                    seconds=self.cleanup_interval
+                ):
+                    await self.cleanup()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay error")
+                relayed = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def relay_batch(self) -> int:
+        async with self.session_factory() as session:
+            async with session.begin():
+                stmt = (
+                    select(EventosOutbox)
+                    .where(EventosOutbox.fecha_publicacion.is_(None))
+                    .order_by(EventosOutbox.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = (await session.execute(stmt)).scalars().all()
+                if not rows:
+                    return 0
+
+                deliveries = []
+                for row in rows:
+                    try:
+                        event = VehicleEvent.model_validate_json(row.payload)
+                        deliveries.append((row.id, await self.publisher.enqueue(event)))
+                    except Exception as e:
+                        # The rest of the batch stays pending for the next run
+                        logger.error("Outbox relay stopped at id %s: %s", row.id, e)
+                        break
+                if not deliveries:
+                    return 0
+
+                await self.publisher.flush()
+                results = await asyncio.gather(
+                    *(delivery for _, delivery in deliveries), return_exceptions=True
+                )
+                # Only acknowledged rows are marked; the rest are retried
+                published_ids: List[int] = []
+                for (row_id, _), result in zip(deliveries, results):
+                    if isinstance(result, BaseException):
+                        logger.error(
+                            "Outbox delivery of id %s failed: %s", row_id, result
+                        )
+                    else:
+                        published_ids.append(row_id)
+
+                if published_ids:
+                    await session.execute(
+                        update(EventosOutbox)
+                        .where(EventosOutbox.id.in_(published_ids))
+                        .values(fecha_publicacion=datetime.now())
+                    )
+                    self.last_published_id = published_ids[-1]
+                    self.published_count += len(published_ids)
+                return len(published_ids)
+
+    async def cleanup(self) -> int:
+        self._last_cleanup = datetime.now()
+        async with self.session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(EventosOutbox).where(
+                        EventosOutbox.fecha_publicacion
+                        < datetime.now() - self.retention
+                    )
+                )
+                return result.rowcount or 0
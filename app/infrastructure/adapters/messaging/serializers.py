@@ -0,0 +1,187 @@
+import struct
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from app.core.domain.entities import GeolocationInfo, VehicleEvent
+
+SCHEMA_VERSION = 1
+
+# Fields of VehicleEvent that downstream consumers receive, in wire order.
+# New fields must be appended and SCHEMA_VERSION bumped; never reorder.
+_SCHEMA_V1: Tuple[Tuple[str, str], ...] = (
+    ("event_type", "i32"),
+    ("vehicle_id", "str"),
+    ("event_code", "i32"),
+    ("system_date_str", "str"),
+    ("speed", "f64"),
+    ("latitude_raw", "str"),
+    ("longitude_raw", "str"),
+    ("odometer", "f64"),
+    ("ip_address", "str"),
+    ("port", "i32"),
+    ("geofence_index", "i64"),
+    ("vehicle_on", "bool"),
+    ("signal_status", "str"),
+    ("realtime_date", "dt"),
+    ("address", "str"),
+    ("city", "str"),
+    ("department", "str"),
+    ("keep_alive_date", "dt"),
+    ("processed_latitude", "f64"),
+    ("processed_longitude", "f64"),
+    ("processed_speed", "f64"),
+    ("processed_date", "dt"),
+    ("geo_address", "str"),
+    ("geo_city", "str"),
+    ("geo_department", "str"),
+    ("is_static_event", "bool"),
+    ("is_ignition_event", "bool"),
+    ("period_id", "i64"),
+    ("ignition_status", "str"),
+    ("current_driver_id", "i64"),
+    ("event_db_id", "i64"),
+)
+
+_PUBLISHED_FIELDS = {name for name, _ in _SCHEMA_V1 if not name.startswith("geo_")} | {
+    "geolocation"
+}
+
+_HEADER = struct.Struct("<2sBQ")  # magic, schema version, presence bitmap
+_MAGIC = b"VE"
+_STRUCTS = {
+    "i32": struct.Struct("<i"),
+    "i64": struct.Struct("<q"),
+    "f64": struct.Struct("<d"),
+    "bool": struct.Struct("<?"),
+    "dt": struct.Struct("<q"),
+}
+_STR_LEN = struct.Struct("<H")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class EventSerializer(ABC):
+    content_type: str
+
+    @abstractmethod
+    def serialize(self, event: VehicleEvent) -> bytes:
+        pass
+
+    @abstractmethod
+    def deserialize(self, data: bytes) -> VehicleEvent:
+        pass
+
+
+class JsonEventSerializer(EventSerializer):
+    """The full ``VehicleEvent`` as JSON, the shape consumers always received."""
+
+    content_type = "application/json"
+
+    def serialize(self, event: VehicleEvent) -> bytes:
+        return event.model_dump_json().encode("utf-8")
+
+    def deserialize(self, data: bytes) -> VehicleEvent:
+        return VehicleEvent.model_validate_json(data)
+
+
+class CompactJsonEventSerializer(JsonEventSerializer):
+    """Schema-limited JSON without null fields; opt-in, consumers must
+    tolerate missing keys."""
+
+    def serialize(self, event: VehicleEvent) -> bytes:
+        return event.model_dump_json(
+            include=_PUBLISHED_FIELDS, exclude_none=True
+        ).encode("utf-8")
+
+
+class BinaryEventSerializer(EventSerializer):
+    """Compact little-endian encoding of ``_SCHEMA_V1``.
+
+    Layout: magic ``VE``, schema version byte, 64-bit presence bitmap (bit i
+    set when field i is not null), then the present fields in schema order.
+    Strings are a uint16 length followed by UTF-8 bytes and datetimes are
+    microseconds since the Unix epoch (aware values are converted to UTC).
+    """
+
+    content_type = "application/x-vehicle-event"
+
+    def serialize(self, event: VehicleEvent) -> bytes:
+        values = _flatten(event)
+        bitmap = 0
+        parts: List[bytes] = []
+        for index, (name, kind) in enumerate(_SCHEMA_V1):
+            value = values.get(name)
+            if value is None:
+                continue
+            bitmap |= 1 << index
+            if kind == "str":
+                encoded = value.encode("utf-8")
+                parts.append(_STR_LEN.pack(len(encoded)))
+                parts.append(encoded)
+            elif kind == "dt":
+                parts.append(_STRUCTS["dt"].pack(_to_micros(value)))
+            else:
+                parts.append(_STRUCTS[kind].pack(value))
+        return _HEADER.pack(_MAGIC, SCHEMA_VERSION, bitmap) + b"".join(parts)
+
+    def deserialize(self, data: bytes) -> VehicleEvent:
+        magic, version, bitmap = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported vehicle event payload (v{version})")
+        offset = _HEADER.size
+        values: Dict[str, Any] = {}
+        for index, (name, kind) in enumerate(_SCHEMA_V1):
+            if not bitmap & (1 << index):
+                continue
+            if kind == "str":
+                (length,) = _STR_LEN.unpack_from(data, offset)
+                offset += _STR_LEN.size
+                values[name] = data[offset : offset + length].decode("utf-8")
+                offset += length
+            else:
+                packer = _STRUCTS[kind]
+                (value,) = packer.unpack_from(data, offset)
+                offset += packer.size
+                values[name] = _EPOCH + value * _MICROSECOND if kind == "dt" else value
+        return _unflatten(values)
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _flatten(event: VehicleEvent) -> Dict[str, Any]:
+    values = {name: getattr(event, name, None) for name, _ in _SCHEMA_V1}
+    if event.geolocation is not None:
+        values["geo_address"] = event.geolocation.address
+        values["geo_city"] = event.geolocation.city
+        values["geo_department"] = event.geolocation.department
+    return values
+
+
+def _unflatten(values: Dict[str, Any]) -> VehicleEvent:
+    geo = {
+        key: values.pop(f"geo_{key}", None) for key in ("address", "city", "department")
+    }
+    if any(value is not None for value in geo.values()):
+        values["geolocation"] = GeolocationInfo(**geo)
+    return VehicleEvent(**values)
+
+
+_SERIALIZERS = {
+    "json": JsonEventSerializer,
+    "json-compact": CompactJsonEventSerializer,
+    "binary": BinaryEventSerializer,
+}
+
+
+def get_event_serializer(name: str) -> EventSerializer:
+    try:
+        return _SERIALIZERS[name.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown KAFKA_SERIALIZER '{name}', expected one of {sorted(_SERIALIZERS)}"
+        )
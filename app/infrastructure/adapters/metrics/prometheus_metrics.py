@@ -0,0 +1,168 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.ports.metrics import MetricsRecorder
+
+# Buckets tuned for per-stage latencies: 0.5 ms up to 5 s
+_STAGE_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+STAGE_LATENCY = Histogram(
+    "vehicle_event_stage_duration_seconds",
+    "Time spent in each stage of process_event",
+    ["stage", "event_type", "event_code_class"],
+    buckets=_STAGE_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "vehicle_event_cache_requests_total",
+    "Lookups served by in-process caches",
+    ["cache", "result"],  # result: hit | miss
+)
+CACHE_INVALIDATIONS = Counter(
+    "vehicle_event_cache_invalidations_total",
+    "Invalidation notifications applied to local caches",
+    ["table"],
+)
+CACHE_INVALIDATION_LAG = Histogram(
+    "vehicle_event_cache_invalidation_lag_seconds",
+    "Time from the database change to the local eviction",
+    buckets=_STAGE_BUCKETS,
+)
+DB_STATEMENTS = Counter(
+    "vehicle_event_db_statements_total",
+    "SQL statements sent to the database",
+    ["engine"],
+)
+QUEUE_DEPTH = Gauge(
+    "vehicle_event_queue_depth",
+    "Items waiting in internal queues",
+    ["queue"],
+)
+SLOW_QUERIES = Counter(
+    "vehicle_event_db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+    ["engine"],
+)
+STATEMENTS_PER_EVENT = Histogram(
+    "vehicle_event_db_statements_per_event",
+    "SQL round trips issued while processing one event",
+    ["event_type", "event_code_class"],
+    buckets=(1, 2, 4, 6, 8, 10, 12, 15, 20, 30, 50),
+)
+REPOSITORY_CALL_LATENCY = Histogram(
+    "vehicle_event_repository_call_duration_seconds",
+    "Time spent in each repository / adapter method",
+    ["component", "method"],
+    buckets=_STAGE_BUCKETS,
+)
+PUBLISH_RESULTS = Counter(
+    "vehicle_event_publish_total",
+    "Outcome of processed-event deliveries to the broker",
+    ["result"],  # delivered | failed
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "vehicle_event_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+    buckets=_STAGE_BUCKETS,
+)
+DB_POOL_TIMEOUTS = Counter(
+    "vehicle_event_db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+    ["engine"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "vehicle_event_db_pool_connections",
+    "Pooled database connections by state",
+    ["engine", "state"],  # state: in_use | idle | capacity
+)
+DB_POOL_UTILIZATION = Gauge(
+    "vehicle_event_db_pool_utilization_ratio",
+    "Connections in use over pool size plus max overflow",
+    ["engine"],
+)
+
+WRITE_BEHIND_ROWS = Counter(
+    "vehicle_event_write_behind_rows_total",
+    "Rows handled by the write-behind writers",
+    ["writer", "result"],  # result: written | coalesced | skipped | dropped
+)
+
+ADMISSION_DECISIONS = Counter(
+    "vehicle_event_admission_total",
+    "Admission decisions by priority lane",
+    ["lane", "result"],  # result: admitted | queue_full | timeout
+)
+ADMISSION_WAIT = Histogram(
+    "vehicle_event_admission_wait_seconds",
+    "Time queued events waited for a processing slot",
+    ["lane"],
+    buckets=_STAGE_BUCKETS,
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "vehicle_event_admission_in_flight",
+    "Events currently holding a processing slot",
+)
+DEAD_LETTERS = Counter(
+    "vehicle_event_dead_letters_total",
+    "Failed events stored in the dead-letter store",
+    ["error_class"],  # transient | permanent
+)
+DEAD_LETTER_RETRIES = Counter(
+    "vehicle_event_dead_letter_retries_total",
+    "Dead-letter replay outcomes",
+    ["result"],  # succeeded | retry | exhausted | permanent
+)
+CLUSTER_MEMBERS = Gauge(
+    "vehicle_event_cluster_members",
+    "Instances currently on this node's hash ring",
+)
+CLUSTER_ROUTED = Counter(
+    "vehicle_event_cluster_routed_total",
+    "Events by where the affinity layer sent them",
+    ["result"],  # local | forwarded | redirected | forward_failed
+)
+
+
+# Event types the service handles (GPS, extended GPS, OTA position)
+_KNOWN_EVENT_TYPES = frozenset((0, 300, 128))
+
+
+def event_type_label(event_type: int) -> str:
+    """``event_type`` comes from the request, so unknown values share one label."""
+    return str(event_type) if event_type in _KNOWN_EVENT_TYPES else "other"
+
+
+def event_code_class(event_type: int, event_code: int) -> str:
+    """Collapses event codes into a small label set to bound cardinality."""
+    if event_type == 128:
+        return "ota"
+    if event_code == 1:
+        return "keep_alive"
+    if event_code in (5, 6):
+        return "ignition"
+    return "other"
+
+
+class PrometheusMetricsRecorder(MetricsRecorder):
+    def observe_stage(
+        self, stage: str, seconds: float, event_type: int, event_code: int
+    ):
+        STAGE_LATENCY.labels(
+            stage,
+            event_type_label(event_type),
+            event_code_class(event_type, event_code),
+        ).observe(seconds)
@@ -0,0 +1,64 @@
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for the event loop thread.
+
+    A helper thread snapshots the target thread's Python stack every
+    ``interval`` seconds and aggregates them in collapsed format
+    (``frame;frame;frame count``), which flamegraph.pl, speedscope and
+    inferno read directly. Nothing runs while the profiler is stopped.
+    """
+
+    def __init__(self):
+        self._samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(
+        self, target_thread_id: int, interval: float, focus: Optional[str] = None
+    ):
+        if self.running:
+            raise RuntimeError("Profiler already running")
+        self._samples = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(target_thread_id, interval, focus),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        if self._thread is None:
+            return ""
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self._samples.most_common()
+        )
+
+    def _sample(self, target_thread_id: int, interval: float, focus: Optional[str]):
+        while not self._stop.wait(interval):
+            frame = sys._current_frames().get(target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            # With a focus only stacks that pass through that function count,
+            # which restricts the profile to the requests being processed
+            if focus and not any(entry.startswith(f"{focus} ") for entry in stack):
+                continue
+            self._samples[";".join(reversed(stack))] += 1
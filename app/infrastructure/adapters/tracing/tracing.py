@@ -0,0 +1,78 @@
+import logging
+from typing import IO, Iterable, List, Mapping, Optional, Tuple
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Until configure_tracing() installs a provider the API hands out no-op spans,
+# so instrumented code costs next to nothing with tracing disabled.
+tracer = trace.get_tracer("vehicle_event_ms")
+
+_provider: Optional[TracerProvider] = None
+_export_file: Optional[IO[str]] = None
+
+
+def configure_tracing():
+    """Installs the SDK provider with head sampling and the configured exporter."""
+    global _provider, _export_file
+    if _provider is not None or not settings.TRACING_ENABLED:
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": "vehicle-event-ms"}),
+        # Sample a ratio of new traces but always follow the caller's decision
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    if settings.TRACING_EXPORTER == "file":
+        _export_file = open(settings.TRACING_FILE_PATH, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(
+            out=_export_file, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(
+        "Tracing enabled",
+        extra={
+            "exporter": settings.TRACING_EXPORTER,
+            "sample_ratio": settings.TRACING_SAMPLE_RATIO,
+        },
+    )
+
+
+def shutdown_tracing():
+    global _provider, _export_file
+    if _provider is not None:
+        _provider.shutdown()  # Exports what is still batched
+        _provider = None
+    if _export_file is not None:
+        _export_file.close()
+        _export_file = None
+
+
+def inject_kafka_headers() -> List[Tuple[str, bytes]]:
+    """W3C trace context of the current span as Kafka message headers."""
+    carrier: dict = {}
+    propagate.inject(carrier)
+    return [(key, value.encode("utf-8")) for key, value in carrier.items()]
+
+
+def extract_kafka_context(
+    headers: Optional[Iterable[Tuple[str, bytes]]],
+) -> otel_context.Context:
+    """Parent context for a consumer span built from Kafka message headers."""
+    carrier = {key: value.decode("utf-8") for key, value in headers or () if value}
+    return propagate.extract(carrier)
+
+
+def extract_http_context(headers: Mapping[str, str]) -> otel_context.Context:
+    return propagate.extract(dict(headers))
@@ -1,11 +1,94 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_READ_URL: Optional[str] = None  # Replica for lag-tolerant lookups
+    DATABASE_SHARDS: str = ""  # Extra shards, e.g. "east=postgresql+asyncpg://...,west=..."
+    SHARD_CONTRACTORS: str = ""  # Contractor to shard, e.g. "ACME=east,TRANSUR=west"
+    SHARD_VEHICLE_RANGES: str = ""  # Inclusive idveh ranges, e.g. "1:4999=east"
+    SHARD_CACHE_SIZE: int = 100000  # Vehicle-to-shard resolutions kept in memory
+    SHARD_CACHE_TTL_SECONDS: float = 3600.0
+    DB_POOL_SIZE: int = 10  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under bursts
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reconnect connections older than this
+    DB_POOL_PRE_PING: bool = False  # Test connections on checkout (one extra round trip)
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Server-side statement_timeout, 0 disables
+    DB_PREWARM_CONNECTIONS: int = 10  # Opened and warmed at startup, 0 disables
+    DB_PREWARM_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_ENABLED: bool = False  # Concurrency limit and load shedding on the event route
+    ADMISSION_MAX_CONCURRENCY: int = 16  # Events processed at once, keep <= pool capacity
+    ADMISSION_MAX_QUEUE: int = 200  # Waiting events per lane before 429
+    ADMISSION_LOW_PRIORITY_MAX_QUEUE: int = 50  # Keep-alive lane, shed first
+    ADMISSION_MAX_WAIT_MS: int = 500  # Waiting longer than this returns 503
+    ADMISSION_CRITICAL_EVENT_CODES: str = ""  # Alarms admitted first, as "tipo:code,..." (ignition and OTA always are)
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
     KAFKA_PROCESSED_EVENTS_TOPIC: str = "vehicle_events_processed"
     KAFKA_RAW_EVENTS_TOPIC: str = "raw_vehicle_events"  # For consumer
+    KAFKA_ENABLED: bool = False  # Use the NoOp publisher when Kafka is not available
+    KAFKA_WAIT_FOR_DELIVERY: bool = False  # True waits for the broker ack per event
+    KAFKA_LINGER_MS: int = 20
+    KAFKA_MAX_BATCH_SIZE: int = 65536
+    KAFKA_COMPRESSION_TYPE: Optional[str] = "gzip"  # gzip, snappy, lz4, zstd or empty
+    KAFKA_SERIALIZER: str = "json"  # json, json-compact or binary (see messaging/serializers.py)
+    OUTBOX_ENABLED: bool = False  # Publish through the eventos_outbox table
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_POLL_INTERVAL_SECONDS: float = 0.5
+    OUTBOX_RETENTION_HOURS: int = 24  # Published rows older than this are deleted
+    OUTBOX_CLEANUP_INTERVAL_SECONDS: int = 300
+    EVENTOS_PARTITIONING_ENABLED: bool = False  # Requires migration 0003
+    EVENTOS_PARTITION_INTERVAL: str = "daily"  # daily or monthly
+    EVENTOS_PARTITIONS_AHEAD: int = 7  # Partitions kept ready past the current one
+    EVENTOS_RETENTION_DAYS: int = 0  # 0 keeps every partition
+    EVENTOS_RETENTION_ACTION: str = "detach"  # detach (archive) or drop
+    EVENTOS_PARTITION_CHECK_INTERVAL_SECONDS: int = 3600
+    CLUSTER_ENABLED: bool = False  # Route each vehicle to one instance (hash ring)
+    CLUSTER_NODE_ID: str = ""  # Defaults to the hostname
+    CLUSTER_NODE_URL: str = ""  # How peers reach this instance, default http://<host>:8000
+    CLUSTER_SEEDS: str = ""  # Known peers, e.g. "api-1=http://api-1:8000,api-2=http://api-2:8000"
+    CLUSTER_ROUTING_MODE: str = "forward"  # forward (proxy) or redirect (307)
+    CLUSTER_VIRTUAL_NODES: int = 128  # Ring points per instance
+    CLUSTER_HEARTBEAT_INTERVAL_SECONDS: float = 2.0
+    CLUSTER_FAILURE_THRESHOLD: int = 3  # Missed heartbeats before a peer leaves the ring
+    CLUSTER_FORWARD_TIMEOUT_SECONDS: float = 5.0
+    LOOKUP_CACHE_ENABLED: bool = False  # Cache eventosdesc, Procesos and route lookups
+    CACHE_MAX_ENTRIES: int = 10000  # Per cache
+    CACHE_TTL_SECONDS: float = 300.0  # Upper bound on staleness if notifications are lost
+    CACHE_INVALIDATION_PING_SECONDS: float = 10.0  # Health check of the LISTEN connection
+    VEHICLE_STATE_CACHE_ENABLED: bool = False  # Needs a single writer per vehicle
+    VEHICLE_SNAPSHOT_PATH: str = "vehicle_state.snap"  # Fixed-width, memory-mappable
+    VEHICLE_SNAPSHOT_INTERVAL_SECONDS: float = 60.0
+    PERIOD_STATE_CACHE_ENABLED: bool = False  # Also needs a single writer per vehicle
+    LOOKUP_CONCURRENCY_ENABLED: bool = False  # Run an event's independent lookups in parallel
+    LOOKUP_POOL_SIZE: int = 10  # Per shard, apart from the request pool
+    DEAD_LETTER_ENABLED: bool = False  # Store failed events and answer 202 instead of 500
+    DEAD_LETTER_PATH: str = "dead_letters.jsonl"  # Append-only; other workers add .1, .2...
+    DEAD_LETTER_RETRY_POLL_SECONDS: float = 5.0
+    DEAD_LETTER_RETRY_BATCH: int = 100  # Replays per pass
+    DEAD_LETTER_RETRY_BASE_SECONDS: float = 2.0  # Backoff doubles from here
+    DEAD_LETTER_RETRY_MAX_SECONDS: float = 300.0
+    DEAD_LETTER_MAX_ATTEMPTS: int = 10  # Then the record is parked as exhausted
+    WRITE_BEHIND_ENABLED: bool = False  # Recursos GPS status and odometers off the event transaction
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0  # Also the most a crash can lose
+    WRITE_BEHIND_BATCH_SIZE: int = 500  # Rows per flush statement; reaching it flushes early
+    WRITE_BEHIND_MAX_PENDING: int = 100000  # Odometer readings buffered; the oldest go beyond it
+    ODOMETER_MIN_DELTA: float = 0.0  # Skip readings that moved less than this...
+    ODOMETER_MIN_INTERVAL_SECONDS: float = 0.0  # ...within this long of the last one kept
+    SLOW_QUERY_THRESHOLD_MS: int = 200  # Statements slower than this are logged
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # Per-component overrides, e.g. "app.core=DEBUG,aiokafka=WARNING"
+    LOG_FORMAT: str = "json"  # json or text
+    LOG_SAMPLE_EVERY: int = 100  # Keep 1 in N high-volume (sampled) records
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped instead of blocking
+    PROFILER_MAX_SECONDS: int = 60  # Upper bound for POST /admin/profile
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 0.01  # Head sampling ratio for new traces
+    TRACING_EXPORTER: str = "file"  # file (JSON lines) or console
+    TRACING_FILE_PATH: str = "traces.jsonl"
     Maps_API_KEY: str  # Or another geocoding service API key
     API_KEY: str  # For basic API security
 
@@ -15,3 +98,7 @@ settings = Settings()
 
 if not settings.DATABASE_URL.startswith("postgresql+asyncpg://"):
     raise ValueError("DATABASE_URL must start with 'postgresql+asyncpg://'")
+if settings.DATABASE_READ_URL and not settings.DATABASE_READ_URL.startswith(
+    "postgresql+asyncpg://"
+):
+    raise ValueError("DATABASE_READ_URL must start with 'postgresql+asyncpg://'")
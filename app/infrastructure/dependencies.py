@@ -1,6 +1,8 @@
+import socket
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E501
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
@@ -8,18 +10,58 @@ from app.core.domain.services import GeolocationService
 from app.core.services.vehicle_event_processor_service import (
     VehicleEventProcessorService,
 )
+from app.infrastructure.adapters.api.schemas import VehicleEventRequest
+from app.infrastructure.adapters.cache.invalidation import InvalidationListener
+from app.infrastructure.adapters.cache.local_cache import CacheRegistry, LocalCache
+from app.infrastructure.adapters.cache.period_state import PeriodStateStore
+from app.infrastructure.adapters.cache.vehicle_state import VehicleStateStore
+from app.infrastructure.adapters.cluster.hash_ring import HashRing
+from app.infrastructure.adapters.cluster.membership import (
+    ClusterMembership,
+    owner_changed,
+)
+from app.infrastructure.adapters.database.instrumentation import instrument_engine
+from app.infrastructure.adapters.database.lookup_session import PooledLookupSession
+from app.infrastructure.adapters.database.partitions import PartitionManager
+from app.infrastructure.adapters.database.pool import engine_options, instrument_pool
 from app.infrastructure.adapters.database.repositories import (
     PeriodRepositoryImpl,
     SpecialRouteRepositoryImpl,
     VehicleEventRepositoryImpl,
     VehicleRepositoryImpl,
 )
+from app.infrastructure.adapters.database.sharding import (
+    DEFAULT_SHARD,
+    ShardRouter,
+    parse_mapping,
+    parse_vehicle_ranges,
+)
+from app.infrastructure.adapters.database.write_behind import (
+    OdometerWriter,
+    ResourceStatusWriter,
+)
+from app.infrastructure.adapters.deadletter.retrier import DeadLetterRetrier
+from app.infrastructure.adapters.deadletter.store import (
+    DeadLetterStore,
+    claim_path,
+)
 from app.infrastructure.adapters.geolocation.Maps_adapter import (
     PostgresGeolocationAdapter,
 )
+from app.infrastructure.adapters.messaging.kafka_publisher import (  # noqa: E501
+    KafkaEventPublisher,
+)
 from app.infrastructure.adapters.messaging.noop_publisher import (  # noqa: E501
     NoOpEventPublisher,
 )
+from app.infrastructure.adapters.messaging.outbox import (
+    OutboxEventPublisher,
+    OutboxRelay,
+)
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    QUEUE_DEPTH,
+    PrometheusMetricsRecorder,
+)
 from app.infrastructure.config.settings import settings
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -27,53 +69,342 @@ from app.infrastructure.config.settings import settings
 # ────────────────────────────────────────────────────────────────────────────────
 
 # Ensure DATABASE_URL uses asyncpg (e.g., postgresql+asyncpg://...)
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+# Pool sizes, timeouts and the statement cache come from Settings (DB_*)
+engine = create_async_engine(settings.DATABASE_URL, **engine_options())
 AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
     class_=AsyncSession,
 )
+instrument_engine(engine)
+instrument_pool(engine)
+
+# Optional replica for lookups that tolerate a few seconds of lag
+read_engine = (
+    create_async_engine(settings.DATABASE_READ_URL, **engine_options("replica"))
+    if settings.DATABASE_READ_URL
+    else None
+)
+AsyncReadSessionLocal = None
+if read_engine is not None:
+    AsyncReadSessionLocal = async_sessionmaker(
+        autoflush=False, bind=read_engine, class_=AsyncSession
+    )
+    instrument_engine(read_engine, name="replica")
+    instrument_pool(read_engine, name="replica")
+
+# Extra shards; DATABASE_URL above is the "default" shard and also holds the
+# vehicle directory used to resolve contractors.
+shard_engines = {DEFAULT_SHARD: engine}
+shard_sessions = {DEFAULT_SHARD: AsyncSessionLocal}
+for shard_name, shard_url in parse_mapping(settings.DATABASE_SHARDS).items():
+    if not shard_url.startswith("postgresql+asyncpg://"):
+        raise ValueError(f"Shard '{shard_name}' must use 'postgresql+asyncpg://'")
+    shard_engine = create_async_engine(
+        shard_url, **engine_options(f"shard_{shard_name}")
+    )
+    instrument_engine(shard_engine, name=f"shard_{shard_name}")
+    instrument_pool(shard_engine, name=f"shard_{shard_name}")
+    shard_engines[shard_name] = shard_engine
+    shard_sessions[shard_name] = async_sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=shard_engine,
+        class_=AsyncSession,
+    )
+
+# Independent lookups of an event run concurrently, one pooled connection
+# each. Their own pool per shard, so they never wait for connections held by
+# request transactions that are themselves waiting on lookups.
+lookup_engines = {}
+lookup_sessions = {}
+if settings.LOOKUP_CONCURRENCY_ENABLED:
+    for shard_name, shard_engine in shard_engines.items():
+        lookup_engine = create_async_engine(
+            shard_engine.url,
+            **{
+                **engine_options(f"lookup_{shard_name}"),
+                "pool_size": settings.LOOKUP_POOL_SIZE,
+            },
+        )
+        instrument_engine(lookup_engine, name=f"lookup_{shard_name}")
+        instrument_pool(lookup_engine, name=f"lookup_{shard_name}")
+        lookup_engines[shard_name] = lookup_engine
+        lookup_sessions[shard_name] = async_sessionmaker(
+            autoflush=False, bind=lookup_engine, class_=AsyncSession
+        )
+
+shard_router = ShardRouter(
+    shard_engines,
+    AsyncSessionLocal,
+    contractor_shards=parse_mapping(settings.SHARD_CONTRACTORS),
+    vehicle_ranges=parse_vehicle_ranges(settings.SHARD_VEHICLE_RANGES),
+)
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Singletons
 # ────────────────────────────────────────────────────────────────────────────────
 
-kafka_publisher = NoOpEventPublisher()
+kafka_publisher = (
+    KafkaEventPublisher() if settings.KAFKA_ENABLED else NoOpEventPublisher()
+)
+
+# With the outbox enabled, requests only write to eventos_outbox and one relay
+# per shard publishes through kafka_publisher in the background.
+outbox_relays = (
+    [OutboxRelay(sessions, kafka_publisher) for sessions in shard_sessions.values()]
+    if settings.OUTBOX_ENABLED
+    else []
+)
+
+# "Recursos" GPS status and odometer readings leave the event transaction and
+# are written in bulk by one pair of writers per shard
+resource_writers = {}
+odometer_writers = {}
+if settings.WRITE_BEHIND_ENABLED:
+    for shard_name, sessions in shard_sessions.items():
+        resource_writers[shard_name] = ResourceStatusWriter(sessions)
+        odometer_writers[shard_name] = OdometerWriter(sessions)
+write_behind_writers = [*resource_writers.values(), *odometer_writers.values()]
+
+partition_managers = (
+    [PartitionManager(shard_engine) for shard_engine in shard_engines.values()]
+    if settings.EVENTOS_PARTITIONING_ENABLED
+    else []
+)
+
+# In-process lookup caches, evicted through LISTEN/NOTIFY (migration 0005).
+# Reference tables are identical on every shard, so one cache serves them all
+# and each shard's changes are listened to.
+cache_registry = CacheRegistry()
+cache_registry.register("vehiculos", shard_router)
+descripcion_cache = tolerancia_cache = tiempoglobal_cache = None
+if settings.LOOKUP_CACHE_ENABLED:
+    descripcion_cache = LocalCache("evento_descripcion")
+    tolerancia_cache = LocalCache("tolerancia_tiempo")
+    tiempoglobal_cache = LocalCache("tiempoglobal")
+    cache_registry.register("eventosdesc", descripcion_cache)
+    cache_registry.register("Procesos", tolerancia_cache, key=None)
+    cache_registry.register("rutas_especiales_detalles", tiempoglobal_cache, key=int)
+
+vehicle_state = None
+if settings.VEHICLE_STATE_CACHE_ENABLED:
+    vehicle_state = VehicleStateStore()
+    cache_registry.register("vehiculos", vehicle_state)
+
+# Active and driver periods for the ignition state machine (migration 0007)
+period_state = None
+if settings.PERIOD_STATE_CACHE_ENABLED:
+    period_state = PeriodStateStore()
+    cache_registry.register("periodosactivo", period_state.active, key=int)
+    cache_registry.register("periodosconductores", period_state.drivers, key=None)
+
+cache_listeners = (
+    [
+        InvalidationListener(
+            shard_engine.url.render_as_string(hide_password=False), cache_registry, name
+        )
+        for name, shard_engine in shard_engines.items()
+    ]
+    if settings.LOOKUP_CACHE_ENABLED
+    or vehicle_state is not None
+    or period_state is not None
+    or shard_router.enabled
+    else []
+)
+
+# Vehicle affinity across instances (see adapters/cluster)
+cluster_membership = None
+if settings.CLUSTER_ENABLED:
+    _node_id = settings.CLUSTER_NODE_ID or socket.gethostname()
+    cluster_membership = ClusterMembership(
+        _node_id,
+        settings.CLUSTER_NODE_URL or f"http://{_node_id}:8000",
+        parse_mapping(settings.CLUSTER_SEEDS),
+    )
+
+
+def drop_moved_vehicle_state(previous: HashRing, ring: HashRing):
+    """Ring listener: state of vehicles that changed owner may be stale by
+    the time they come back, since another instance wrote it meanwhile."""
+    moved = owner_changed(previous, ring)
+    if vehicle_state is not None:
+        vehicle_state.invalidate_matching(moved)
+    if period_state is not None:
+        period_state.invalidate_vehicles(moved)
+
+
+def drop_vehicle_state(vehicle_id: str):
+    """Forgets one vehicle processed here while its owner was unreachable."""
+    if vehicle_state is not None:
+        vehicle_state.invalidate(vehicle_id)
+    if period_state is not None:
+        period_state.invalidate_vehicles(lambda other: other == vehicle_id)
+
+
+if cluster_membership is not None:
+    cluster_membership.add_listener(drop_moved_vehicle_state)
+
+metrics_recorder = PrometheusMetricsRecorder()
+QUEUE_DEPTH.labels("kafka_pending").set_function(
+    lambda: getattr(kafka_publisher, "pending_count", 0)
+)
+for shard_name, resource_writer in resource_writers.items():
+    QUEUE_DEPTH.labels(f"resource_status_pending_{shard_name}").set_function(
+        resource_writer.pending_count
+    )
+for shard_name, odometer_writer in odometer_writers.items():
+    QUEUE_DEPTH.labels(f"odometer_pending_{shard_name}").set_function(
+        odometer_writer.pending_count
+    )
+
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Dependencies
 # ────────────────────────────────────────────────────────────────────────────────
-async def get_db_session():
-    async with AsyncSessionLocal() as session:
+async def get_shard(request: Request) -> str:
+    """Shard owning the event's vehicle (``idveh`` in the JSON body)."""
+    if not shard_router.enabled:
+        return DEFAULT_SHARD
+    try:
+        body = await request.json()  # Starlette caches it for the endpoint
+    except ValueError:
+        return DEFAULT_SHARD
+    vehicle_id = body.get("idveh") if isinstance(body, dict) else None
+    return await shard_router.shard_for_vehicle(vehicle_id)
+
+
+@asynccontextmanager
+async def shard_transaction(shard: str):
+    async with shard_sessions[shard]() as session:
         async with session.begin():
             yield session
+        # Only reached once the transaction committed
+        if vehicle_state is not None:
+            vehicle_state.apply_committed(session)
+        if period_state is not None:
+            period_state.apply_committed(session)
+        for writers in (resource_writers, odometer_writers):
+            if shard in writers:
+                writers[shard].apply_committed(session)
 
 
-async def get_geolocation_service(
+async def get_db_session(shard: str = Depends(get_shard)):
+    async with shard_transaction(shard) as session:
+        yield session
+
+
+async def get_read_db_session(
     db_session: AsyncSession = Depends(get_db_session),
+    shard: str = Depends(get_shard),
+):
+    """Replica session when DATABASE_READ_URL is set, else the request session.
+
+    The replica follows the default shard only.
+    """
+    if AsyncReadSessionLocal is None or shard != DEFAULT_SHARD:
+        yield db_session
+        return
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
+async def get_geolocation_service(
+    read_session: AsyncSession = Depends(get_read_db_session),
 ) -> AsyncGenerator[GeolocationService, None]:
     # Retorna una instancia de PostgresGeolocationAdapter
-    # que usa la sesión de base de datos
-    yield PostgresGeolocationAdapter(session=db_session)
+    # que usa la sesión de lectura (getdireccion no escribe)
+    yield PostgresGeolocationAdapter(session=read_session)
 
 
 async def get_vehicle_event_processor_service(
     db_session: AsyncSession = Depends(get_db_session),
+    read_session: AsyncSession = Depends(get_read_db_session),
     geolocation_svc: GeolocationService = Depends(get_geolocation_service),
+    shard: str = Depends(get_shard),
 ) -> AsyncGenerator[VehicleEventProcessorService, None]:
-    vehicle_event_repo = VehicleEventRepositoryImpl(db_session)
-    vehicle_repo = VehicleRepositoryImpl(db_session)
-    period_repo = PeriodRepositoryImpl(db_session)
-    special_route_repo = SpecialRouteRepositoryImpl(db_session)
+    yield build_vehicle_event_processor(
+        db_session, read_session, geolocation_svc, shard
+    )
+
+
+def build_vehicle_event_processor(
+    db_session: AsyncSession,
+    read_session: AsyncSession,
+    geolocation_svc: GeolocationService,
+    shard: str = DEFAULT_SHARD,
+) -> VehicleEventProcessorService:
+    lookup_session = None
+    concurrent_lookups = shard in lookup_sessions
+    if concurrent_lookups:
+        lookup_session = PooledLookupSession(lookup_sessions[shard])
+        # Lag-tolerant reads keep going to the replica when there is one
+        read_session = (
+            PooledLookupSession(AsyncReadSessionLocal)
+            if AsyncReadSessionLocal is not None and shard == DEFAULT_SHARD
+            else lookup_session
+        )
+        geolocation_svc = PostgresGeolocationAdapter(session=read_session)
 
-    service = VehicleEventProcessorService(
+    vehicle_event_repo = VehicleEventRepositoryImpl(
+        db_session,
+        read_session,
+        descripcion_cache,
+        odometer_writers.get(shard),
+        lookup_session,
+    )
+    vehicle_repo = VehicleRepositoryImpl(
+        db_session,
+        read_session,
+        tolerancia_cache,
+        vehicle_state,
+        resource_writers.get(shard),
+        lookup_session,
+    )
+    period_repo = PeriodRepositoryImpl(db_session, lookup_session, period_state)
+    special_route_repo = SpecialRouteRepositoryImpl(
+        db_session, read_session, tiempoglobal_cache, lookup_session
+    )
+    event_publisher = (
+        OutboxEventPublisher(db_session) if settings.OUTBOX_ENABLED else kafka_publisher
+    )
+
+    return VehicleEventProcessorService(
         vehicle_event_repo=vehicle_event_repo,
         vehicle_repo=vehicle_repo,
         period_repo=period_repo,
         special_route_repo=special_route_repo,
         geolocation_service=geolocation_svc,
-        event_publisher=kafka_publisher,
+        event_publisher=event_publisher,
+        metrics=metrics_recorder,
+        concurrent_lookups=concurrent_lookups,
     )
 
-    yield service
+
+async def replay_vehicle_event(payload: dict) -> str:
+    """Processes a stored request body outside any HTTP request (dead letters)."""
+    event = VehicleEventRequest.model_validate(payload).to_entity()
+    shard = await shard_router.shard_for_vehicle(event.vehicle_id)
+    async with shard_transaction(shard) as session:
+        service = build_vehicle_event_processor(
+            session, session, PostgresGeolocationAdapter(session=session), shard
+        )
+        return await service.process_event(event)
+
+
+# Failed events are kept for background retries instead of answering 500
+dead_letter_store = (
+    DeadLetterStore(claim_path(settings.DEAD_LETTER_PATH))
+    if settings.DEAD_LETTER_ENABLED
+    else None
+)
+dead_letter_retrier = (
+    DeadLetterRetrier(dead_letter_store, replay_vehicle_event)
+    if dead_letter_store is not None
+    else None
+)
+if dead_letter_store is not None:
+    QUEUE_DEPTH.labels("dead_letter_pending").set_function(
+        dead_letter_store.pending_count
+    )
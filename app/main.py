@@ -1,25 +1,130 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+from prometheus_client import make_asgi_app
+from app.infrastructure.adapters.api.admin_routes import router as admin_router
+from app.infrastructure.adapters.api.cluster_routes import router as cluster_router
+from app.infrastructure.adapters.cluster.affinity import VehicleAffinityMiddleware
 from app.infrastructure.adapters.api.routes import router as vehicle_event_router
-from app.infrastructure.dependencies import kafka_publisher
+from app.infrastructure.adapters.api.routes import EventDeadLettered, dead_letter_handler
+from app.infrastructure.adapters.tracing.tracing import configure_tracing, shutdown_tracing
+from app.infrastructure.config.logging_config import configure_logging, shutdown_logging
+from app.infrastructure.adapters.database.pool import prewarm_pool
+from app.infrastructure.dependencies import (
+    cache_listeners,
+    cluster_membership,
+    dead_letter_retrier,
+    drop_vehicle_state,
+    kafka_publisher,
+    lookup_engines,
+    outbox_relays,
+    partition_managers,
+    read_engine,
+    shard_engines,
+    shard_sessions,
+    vehicle_state,
+    write_behind_writers,
+)
+from app.infrastructure.config.settings import settings
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    configure_logging()
+    configure_tracing()
+    # Pay connection setup and statement preparation before the first burst
+    engines = list(shard_engines.values()) + list(lookup_engines.values())
+    if read_engine is not None:
+        engines.append(read_engine)
+    await asyncio.gather(*(prewarm_pool(e) for e in engines))
+
     try:
-        print("🚀 Starting Kafka Producer...")
+        logger.info("Starting Kafka producer")
         await kafka_publisher.start()
     except Exception as e:
-        print(f"❌ Error starting Kafka producer: {e}")
+        logger.exception("Error starting Kafka producer")
         raise e
 
+    for cache_listener in cache_listeners:
+        await cache_listener.start()
+
+    if vehicle_state is not None:
+        # Listen first, then load: later changes are heard, earlier ones are
+        # caught by the snapshot reconcile
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *(listener.ready.wait() for listener in cache_listeners)
+                ),
+                settings.DB_PREWARM_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Cache invalidation listeners not ready, loading anyway")
+        await vehicle_state.start(shard_sessions.values())
+
+    for outbox_relay in outbox_relays:
+        logger.info("Starting outbox relay")
+        await outbox_relay.start()
+
+    for partition_manager in partition_managers:
+        logger.info("Starting eventos partition manager")
+        await partition_manager.start()
+
+    for writer in write_behind_writers:
+        logger.info("Starting %s write-behind writer", writer.name)
+        await writer.start()
+
+    if dead_letter_retrier is not None:
+        logger.info("Starting dead-letter retrier")
+        await dead_letter_retrier.start()
+
+    # Join last and leave first, so peers only route here while we can serve
+    if cluster_membership is not None:
+        logger.info("Joining cluster as %s", cluster_membership.node_id)
+        await cluster_membership.start()
+
     yield
     # Shutdown
+    if cluster_membership is not None:
+        logger.info("Leaving cluster")
+        await cluster_membership.stop()
+
+    if dead_letter_retrier is not None:
+        logger.info("Stopping dead-letter retrier")
+        await dead_letter_retrier.stop()
+
+    # After every event that could stage rows is done; flushes what is left
+    for writer in write_behind_writers:
+        logger.info("Stopping %s write-behind writer", writer.name)
+        await writer.stop()
+
+    for partition_manager in partition_managers:
+        logger.info("Stopping eventos partition manager")
+        await partition_manager.stop()
+
+    for outbox_relay in outbox_relays:
+        logger.info("Stopping outbox relay")
+        await outbox_relay.stop()
+
+    if vehicle_state is not None:
+        await vehicle_state.stop()
+
+    for cache_listener in cache_listeners:
+        await cache_listener.stop()
+
     try:
-        print("🛑 Stopping Kafka Producer...")
+        logger.info("Stopping Kafka producer")
         await kafka_publisher.stop()
-    except Exception as e:
-        print(f"❌ Error stopping Kafka producer: {e}")
+    except Exception:
+        logger.exception("Error stopping Kafka producer")
+
+    shutdown_tracing()
+    shutdown_logging()
 
 app = FastAPI(
     title="Vehicle Event Microservice",
@@ -29,6 +134,18 @@ app = FastAPI(
 )
 
 app.include_router(vehicle_event_router, prefix="/vehicle-events", tags=["Vehicle Events"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
+app.mount("/metrics", make_asgi_app())
+app.add_exception_handler(EventDeadLettered, dead_letter_handler)
+
+if cluster_membership is not None:
+    app.include_router(cluster_router, prefix="/cluster", tags=["Cluster"])
+    app.add_middleware(
+        VehicleAffinityMiddleware,
+        membership=cluster_membership,
+        path="/vehicle-events/process-vehicle-event",
+        on_local_fallback=drop_vehicle_state,
+    )
 
 @app.get("/")
 async def root():
@@ -0,0 +1,375 @@
+r"""Open-loop load generator for the vehicle event endpoint.
+
+Simulates a fleet (movement, ignition cycles, keep-alives, retransmissions)
+or replays recorded payloads at a fixed target rate, then reports latency
+percentiles, error rates and the sustained throughput:
+
+    python benchmarks/fleet_loadgen.py --rate 300 --duration 60 simulate --vehicles 500
+    python benchmarks/fleet_loadgen.py --duration 10 simulate --vehicles 50 \
+        --record fleet.jsonl
+    python benchmarks/fleet_loadgen.py --rate 1000 replay fleet.jsonl --loop
+
+Requests are scheduled at ``start + i / rate`` whether or not earlier ones
+finished (open loop), and latency is measured from the scheduled time so a
+stalled server shows up as latency instead of a lower offered rate.
+Vehicle ids must exist (estado 'Y') in the target database; use
+``--id-prefix``/``--id-offset`` to match a seeded fleet.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+ENDPOINT = "/vehicle-events/process-vehicle-event"
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Fleet simulation
+# ────────────────────────────────────────────────────────────────────────────────
+
+
+def _format_coord(value: float, positive: str, negative: str, width: int) -> str:
+    hemisphere = positive if value >= 0 else negative
+    return f"{hemisphere}{abs(value):0{width}.5f}"
+
+
+@dataclass
+class SimulatedVehicle:
+    vehicle_id: str
+    latitude: float
+    longitude: float
+    heading: float
+    speed: float = 0.0
+    ignition_on: bool = False
+    last_payload: Optional[dict] = field(default=None, repr=False)
+
+    def step(self, rng: random.Random, seconds: float, ignition_cycle_prob: float):
+        """Advances the vehicle and returns the ignition event code, if any."""
+        ignition_event = None
+        if rng.random() < ignition_cycle_prob:
+            self.ignition_on = not self.ignition_on
+            ignition_event = 5 if self.ignition_on else 6
+        if self.ignition_on:
+            self.speed = max(0.0, min(90.0, self.speed + rng.gauss(0, 8)))
+            self.heading = (self.heading + rng.gauss(0, 15)) % 360
+            distance_deg = self.speed / 3600 * seconds / 111.0
+            self.latitude += distance_deg * math.cos(math.radians(self.heading))
+            self.longitude += distance_deg * math.sin(math.radians(self.heading))
+        else:
+            self.speed = 0.0
+        return ignition_event
+
+
+class FleetSimulator:
+    """Endless stream of payloads for a fleet cycling through the vehicles."""
+
+    def __init__(
+        self,
+        vehicles: int,
+        id_prefix: str,
+        id_offset: int,
+        keep_alive_ratio: float,
+        retransmit_ratio: float,
+        ignition_cycle_prob: float,
+        report_interval: float,
+        center=(10.9685, -74.7813),
+        seed: int = 42,
+    ):
+        self.rng = random.Random(seed)
+        self.keep_alive_ratio = keep_alive_ratio
+        self.retransmit_ratio = retransmit_ratio
+        self.ignition_cycle_prob = ignition_cycle_prob
+        self.report_interval = report_interval
+        self.fleet = [
+            SimulatedVehicle(
+                vehicle_id=f"{id_prefix}{id_offset + i}",
+                latitude=center[0] + self.rng.uniform(-0.1, 0.1),
+                longitude=center[1] + self.rng.uniform(-0.1, 0.1),
+                heading=self.rng.uniform(0, 360),
+                ignition_on=self.rng.random() < 0.6,
+            )
+            for i in range(vehicles)
+        ]
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            for vehicle in self.fleet:
+                yield self._next_payload(vehicle)
+
+    def _next_payload(self, vehicle: SimulatedVehicle) -> dict:
+        # Modems resend the previous frame when they miss the ack
+        if vehicle.last_payload and self.rng.random() < self.retransmit_ratio:
+            return vehicle.last_payload
+
+        ignition_event = vehicle.step(
+            self.rng, self.report_interval, self.ignition_cycle_prob
+        )
+        if ignition_event is not None:
+            event_code = ignition_event
+        elif self.rng.random() < self.keep_alive_ratio:
+            event_code = 1
+        else:
+            event_code = 2
+
+        now = datetime.now().isoformat(timespec="seconds")
+        payload = {
+            "tipo": 0,
+            "idveh": vehicle.vehicle_id,
+            "idevento_": event_code,
+            "fechasys_": now,
+            "speed": round(vehicle.speed, 1),
+            "lat": _format_coord(vehicle.latitude, "N", "S", 8),
+            "lon": _format_coord(vehicle.longitude, "E", "W", 9),
+            "odometer": None,
+            "ip": "10.0.0.1",
+            "port": 5001,
+            "indexgeocerca": 0,
+            "vehicleon_": vehicle.ignition_on,
+            "signal_": "OK",
+            "realtime_": now,
+            "address_": None,
+            "city_": None,
+            "department_": None,
+            "fechakeep": now,
+        }
+        vehicle.last_payload = payload
+        return payload
+
+
+def replay_payloads(path: str, loop: bool) -> Iterator[dict]:
+    """Reads one payload per line; ``{"payload": {...}}`` wrappers are unwrapped."""
+    while True:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield record.get("payload", record)
+        if not loop:
+            return
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# Open-loop driver
+# ────────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Results:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    skipped: int = 0
+    sent: int = 0
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    payload: dict,
+    scheduled: float,
+    results: Results,
+    semaphore: asyncio.Semaphore,
+):
+    try:
+        response = await client.post(ENDPOINT, json=payload)
+        results.statuses[response.status_code] += 1
+    except httpx.HTTPError as e:
+        results.errors[type(e).__name__] += 1
+    finally:
+        results.latencies.append(time.perf_counter() - scheduled)
+        semaphore.release()
+
+
+async def drive(
+    payloads: Iterator[dict],
+    base_url: str,
+    api_key: str,
+    rate: float,
+    duration: float,
+    max_in_flight: int,
+    record_path: Optional[str],
+    timeout: float,
+) -> Tuple[Results, float]:
+    results = Results()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    recorder = open(record_path, "w", encoding="utf-8") if record_path else None
+    limits = httpx.Limits(max_connections=max_in_flight)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"X-API-Key": api_key},
+        limits=limits,
+        timeout=timeout,
+    ) as client:
+        start = time.perf_counter()
+        for i, payload in enumerate(payloads):
+            scheduled = start + i / rate
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if recorder:
+                recorder.write(json.dumps(payload) + "\n")
+            # The client itself must not become the bottleneck silently
+            if semaphore.locked():
+                results.skipped += 1
+                continue
+            await semaphore.acquire()
+            results.sent += 1
+            task = asyncio.create_task(
+                _send(client, payload, scheduled, results, semaphore)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    if recorder:
+        recorder.close()
+    return results, elapsed
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(
+        len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def report(results: Results, elapsed: float, rate: float) -> Dict[str, float]:
+    latencies = sorted(results.latencies)
+    completed = len(latencies)
+    ok = sum(count for status, count in results.statuses.items() if 200 <= status < 300)
+    # Skipped requests never got a latency, so under overload the percentiles
+    # only describe the lucky ones: count them as failures
+    failed = completed - ok + results.skipped
+    attempted = completed + results.skipped
+    summary = {
+        "target_rate": rate,
+        "sent": results.sent,
+        "skipped_client_saturated": results.skipped,
+        "completed": completed,
+        "duration_s": elapsed,
+        "sustained_eps": ok / elapsed if elapsed else 0.0,
+        "error_rate": failed / attempted if attempted else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] * 1000) if latencies else float("nan"),
+    }
+    print(f"Target rate        : {rate:.0f} ev/s")
+    print(f"Sent / completed   : {results.sent} / {completed} in {elapsed:.1f}s")
+    print(f"Skipped (client)   : {results.skipped}")
+    print(f"Sustained (2xx)    : {summary['sustained_eps']:.1f} ev/s")
+    print(f"Error rate         : {summary['error_rate']:.2%} (skipped included)")
+    print(
+        f"Latency p50/p95/p99: {summary['p50_ms']:.1f} / {summary['p95_ms']:.1f} / "
+        f"{summary['p99_ms']:.1f} ms (max {summary['max_ms']:.1f} ms)"
+    )
+    print(f"Status codes       : {dict(results.statuses)}")
+    if results.errors:
+        print(f"Transport errors   : {dict(results.errors)}")
+    if results.skipped:
+        print(
+            f"WARNING: {results.skipped} requests were skipped because "
+            f"--max-in-flight was reached. The target rate was not offered, and "
+            f"the latency percentiles exclude them. Raise --max-in-flight or "
+            f"treat this run as overloaded.",
+            file=sys.stderr,
+        )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Open-loop load generator for the vehicle event endpoint"
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY", ""))
+    parser.add_argument("--rate", type=float, default=100.0, help="Target events/s")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--max-in-flight", type=int, default=512)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--json", help="Also write the summary to this file")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    sim = sub.add_parser("simulate", help="Generate a synthetic fleet")
+    sim.add_argument("--vehicles", type=int, default=100)
+    sim.add_argument("--id-prefix", default="SIM")
+    sim.add_argument("--id-offset", type=int, default=0)
+    sim.add_argument("--keep-alive-ratio", type=float, default=0.3)
+    sim.add_argument("--retransmit-ratio", type=float, default=0.02)
+    sim.add_argument(
+        "--ignition-cycle-prob",
+        type=float,
+        default=0.01,
+        help="Probability per report that a vehicle toggles its ignition",
+    )
+    sim.add_argument(
+        "--report-interval", type=float, default=30.0, help="Modem seconds per report"
+    )
+    sim.add_argument("--seed", type=int, default=42)
+    sim.add_argument(
+        "--record", help="Write every generated payload to this JSONL file"
+    )
+
+    rep = sub.add_parser("replay", help="Replay payloads from a JSONL file")
+    rep.add_argument("path")
+    rep.add_argument("--loop", action="store_true", help="Restart at end of file")
+
+    args = parser.parse_args()
+    if args.mode == "simulate":
+        payloads = iter(
+            FleetSimulator(
+                vehicles=args.vehicles,
+                id_prefix=args.id_prefix,
+                id_offset=args.id_offset,
+                keep_alive_ratio=args.keep_alive_ratio,
+                retransmit_ratio=args.retransmit_ratio,
+                ignition_cycle_prob=args.ignition_cycle_prob,
+                report_interval=args.report_interval,
+                seed=args.seed,
+            )
+        )
+        record_path = args.record
+    else:
+        payloads = replay_payloads(args.path, args.loop)
+        record_path = None
+
+    results, elapsed = asyncio.run(
+        drive(
+            payloads,
+            args.base_url,
+            args.api_key,
+            args.rate,
+            args.duration,
+            args.max_in_flight,
+            record_path,
+            args.timeout,
+        )
+    )
+    summary = report(results, elapsed, args.rate)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+    # Non-zero so scripted runs cannot mistake a saturated client for a result
+    if results.skipped:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
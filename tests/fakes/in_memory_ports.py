@@ -0,0 +1,286 @@
+"""In-memory implementations of every port in ``app/core/ports``.
+
+They mirror the observable behaviour of the SQLAlchemy adapters closely
+enough to drive ``VehicleEventProcessorService`` through all of its
+branches without a database, for unit tests and microbenchmarks.
+"""
+
+import itertools
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.core.domain.entities import (
+    EventoDescripcion,
+    EventoResumen,
+    GeolocationInfo,
+    PeriodoActivo,
+    PeriodoConductor,
+    ProgramacionEspecialVehiculo,
+    PuntoControlEspecial,
+    RutaEspecialControl,
+    RutaEspecialDetalle,
+    Vehicle,
+    VehicleEvent,
+)
+from app.core.domain.services import GeolocationService
+from app.core.ports.event_publisher import EventPublisher
+from app.core.ports.metrics import MetricsRecorder
+from app.core.ports.repositories import (
+    PeriodRepository,
+    SpecialRouteRepository,
+    VehicleEventRepository,
+    VehicleRepository,
+)
+from app.core.services.vehicle_event_processor_service import _calculate_distance
+
+
+class InMemoryVehicleEventRepository(VehicleEventRepository):
+    def __init__(self, descriptions: Optional[Dict[int, EventoDescripcion]] = None):
+        self.descriptions = descriptions or {}
+        self.events: List[VehicleEvent] = []
+        self.odometers: List[Tuple[str, float, datetime]] = []
+        self.ejes_viales: List[Tuple[str, str, float, float, str]] = []
+        self.resumen: Dict[Tuple[str, int, date, int], EventoResumen] = {}
+        self._ids = itertools.count(1)
+
+    async def save_event(self, event: VehicleEvent) -> int:
+        self.events.append(event)
+        return next(self._ids)
+
+    async def save_odometer(self, vehicle_id: str, value: float, date: datetime):
+        self.odometers.append((vehicle_id, value, date))
+
+    async def get_last_event_with_gps(self, vehicle_id: str) -> Optional[VehicleEvent]:
+        since = datetime.now() - timedelta(days=2)
+        for event in reversed(self.events):
+            if (
+                event.vehicle_id == vehicle_id
+                and event.processed_latitude
+                and event.processed_date
+                and event.processed_date > since
+            ):
+                return event
+        return None
+
+    async def insert_ejes_viales(
+        self,
+        address: str,
+        city: str,
+        latitude: float,
+        longitude: float,
+        department: str,
+    ):
+        self.ejes_viales.append((address, city, latitude, longitude, department))
+
+    async def find_evento_descripcion(
+        self, event_code: int
+    ) -> Optional[EventoDescripcion]:
+        return self.descriptions.get(event_code)
+
+    async def find_eventos_resumen(
+        self, vehicle_id: str, event_code: int, date: date, hour: int
+    ) -> Optional[EventoResumen]:
+        return self.resumen.get((vehicle_id, event_code, date, hour))
+
+    async def update_eventos_resumen(
+        self, vehicle_id: str, event_code: int, date: date, hour: int, value: int
+    ):
+        summary = self.resumen.get((vehicle_id, event_code, date, hour))
+        if summary:
+            summary.valor = value
+
+    async def insert_eventos_resumen(
+        self, vehicle_id: str, event_code: int, value: int, date: date, hour: int
+    ):
+        self.resumen[(vehicle_id, event_code, date, hour)] = EventoResumen(
+            idvehiculo=vehicle_id,
+            idevento=event_code,
+            valor=value,
+            fecha=date,
+            hora=hour,
+        )
+
+
+class InMemoryVehicleRepository(VehicleRepository):
+    def __init__(
+        self,
+        vehicles: Optional[List[Vehicle]] = None,
+        tolerancias: Optional[Dict[str, int]] = None,
+    ):
+        self.vehicles: Dict[str, Vehicle] = {v.idvehiculo: v for v in vehicles or []}
+        self.tolerancias = tolerancias or {}
+        self.resources: Dict[Tuple[str, str], Tuple[datetime, str]] = {}
+
+    async def get_active_vehicle_by_id(self, vehicle_id: str) -> Optional[Vehicle]:
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None or vehicle.estado != "Y":
+            return None
+        # The SQL adapter builds a fresh entity per call; so do we
+        return vehicle.model_copy()
+
+    async def update_vehicle_status(self, vehicle: Vehicle):
+        if vehicle.idvehiculo in self.vehicles:
+            self.vehicles[vehicle.idvehiculo] = vehicle.model_copy()
+
+    async def get_vehicle_tolerancia_tiempo(self, vehicle_contratista: str) -> int:
+        return self.tolerancias.get(vehicle_contratista, 0)
+
+    async def update_resource_gps_status(
+        self, recurso_id: str, contratista_id: str, event_date: datetime, gps_ok: bool
+    ):
+        self.resources[(recurso_id, contratista_id)] = (
+            event_date,
+            "OK" if gps_ok else "NOTOK",
+        )
+
+
+class InMemoryPeriodRepository(PeriodRepository):
+    def __init__(self):
+        self.periodos: Dict[int, PeriodoActivo] = {}
+        self.periodos_conductores: Dict[int, PeriodoConductor] = {}
+        self._ids = itertools.count(1)
+
+    async def get_active_periodo(self, period_id: int) -> Optional[PeriodoActivo]:
+        return self.periodos.get(period_id)
+
+    async def create_periodo_activo(
+        self, vehicle_id: str, start_date: datetime, driver_id: Optional[int]
+    ) -> int:
+        period_id = next(self._ids)
+        self.periodos[period_id] = PeriodoActivo(
+            idperiodo=period_id,
+            idvehiculo=vehicle_id,
+            fechadesde=start_date,
+            idconductor=driver_id,
+        )
+        return period_id
+
+    async def update_periodo_activo_end_date(self, period_id: int, end_date: datetime):
+        if period_id in self.periodos:
+            self.periodos[period_id].fechahasta = end_date
+
+    async def get_last_periodo_conductor_for_reset(
+        self, vehicle_id: str, driver_id: int, current_date: datetime
+    ) -> Optional[PeriodoConductor]:
+        candidates = [
+            p
+            for p in self.periodos_conductores.values()
+            if p.idvehiculo == vehicle_id and p.idconductor == driver_id
+        ]
+        if not candidates:
+            return None
+        last = max(candidates, key=lambda p: p.fechadesde)
+        if last.fechahasta is None:
+            return last
+        if current_date - last.fechahasta < timedelta(minutes=1):
+            return last
+        return None
+
+    async def update_periodo_conductor_end_date(
+        self, period_id: int, end_date: Optional[datetime]
+    ):
+        if period_id in self.periodos_conductores:
+            self.periodos_conductores[period_id].fechahasta = end_date
+
+    async def create_periodo_conductor(
+        self, vehicle_id: str, driver_id: int, start_date: datetime
+    ) -> int:
+        period_id = next(self._ids)
+        self.periodos_conductores[period_id] = PeriodoConductor(
+            idperiodo=period_id,
+            idvehiculo=vehicle_id,
+            idconductor=driver_id,
+            fechadesde=start_date,
+        )
+        return period_id
+
+    async def deactivate_current_driver(self, vehicle_id: str, driver_id: int):
+        pass
+
+
+class InMemorySpecialRouteRepository(SpecialRouteRepository):
+    def __init__(
+        self,
+        programaciones: Optional[List[ProgramacionEspecialVehiculo]] = None,
+        detalles: Optional[List[RutaEspecialDetalle]] = None,
+        puntos: Optional[List[PuntoControlEspecial]] = None,
+    ):
+        self.programaciones = programaciones or []
+        self.detalles = detalles or []
+        self.puntos = {p.idpunto: p for p in puntos or []}
+        self.controles: List[RutaEspecialControl] = []
+
+    async def get_active_special_programacion_for_vehicle(
+        self, vehicle_id: str, current_date: datetime
+    ) -> Optional[ProgramacionEspecialVehiculo]:
+        matches = [
+            p
+            for p in self.programaciones
+            if p.idvehiculo == vehicle_id
+            and p.fechasalida.date() == current_date.date()
+            and p.finalizado == "N"
+            and p.cancelada == "N"
+            and p.activa == "S"
+        ]
+        return max(matches, key=lambda p: p.fechasalida) if matches else None
+
+    async def get_nearby_special_route_detail(
+        self,
+        route_id: int,
+        latitude: float,
+        longitude: float,
+        programacion_id: Optional[int] = None,
+    ) -> Optional[RutaEspecialDetalle]:
+        controlled = {
+            c.idpunto for c in self.controles if c.idprogramacion == programacion_id
+        }
+        for detalle in self.detalles:
+            punto = self.puntos.get(detalle.idpunto)
+            if (
+                detalle.idruta == route_id
+                and punto is not None
+                and detalle.idpunto not in controlled
+                and _calculate_distance(
+                    latitude, longitude, punto.latitud, punto.longitud
+                )
+                <= punto.radio
+            ):
+                return detalle
+        return None
+
+    async def get_initial_tiempoglobal(self, route_id: int) -> Optional[float]:
+        detalles = [d for d in self.detalles if d.idruta == route_id]
+        return min(detalles, key=lambda d: d.orden).tiempoglobal if detalles else None
+
+    async def insert_ruta_especial_control(self, control_data: RutaEspecialControl):
+        self.controles.append(control_data)
+
+
+class InMemoryGeolocationService(GeolocationService):
+    def __init__(self, address: Optional[GeolocationInfo] = None):
+        self.address = address or GeolocationInfo(
+            address="Calle 72 # 45-10", city="Barranquilla", department="Atlantico"
+        )
+
+    async def get_address_from_coords(
+        self, latitude: float, longitude: float
+    ) -> Optional[GeolocationInfo]:
+        return self.address
+
+
+class InMemoryEventPublisher(EventPublisher):
+    def __init__(self):
+        self.published: List[VehicleEvent] = []
+
+    async def publish_processed_event(self, event: VehicleEvent):
+        self.published.append(event)
+
+
+class InMemoryMetricsRecorder(MetricsRecorder):
+    def __init__(self):
+        self.stages: List[Tuple[str, float, int, int]] = []
+
+    def observe_stage(
+        self, stage: str, seconds: float, event_type: int, event_code: int
+    ):
+        self.stages.append((stage, seconds, event_type, event_code))
@@ -0,0 +1,153 @@
+"""Ready-made fleet state and events for each branch of ``process_event``."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+from app.core.domain.entities import (
+    EventoDescripcion,
+    ProgramacionEspecialVehiculo,
+    PuntoControlEspecial,
+    RutaEspecialDetalle,
+    Vehicle,
+    VehicleEvent,
+)
+from app.core.services.vehicle_event_processor_service import (
+    VehicleEventProcessorService,
+)
+from tests.fakes.in_memory_ports import (
+    InMemoryEventPublisher,
+    InMemoryGeolocationService,
+    InMemoryMetricsRecorder,
+    InMemoryPeriodRepository,
+    InMemorySpecialRouteRepository,
+    InMemoryVehicleEventRepository,
+    InMemoryVehicleRepository,
+)
+
+VEHICLE_ID = "SOBUSA305"
+SPECIAL_VEHICLE_ID = "SOBUSA999"
+CONTROL_POINT = (10.9878, -74.7889)
+
+
+@dataclass
+class FakePorts:
+    vehicle_events: InMemoryVehicleEventRepository
+    vehicles: InMemoryVehicleRepository
+    periods: InMemoryPeriodRepository
+    special_routes: InMemorySpecialRouteRepository
+    geolocation: InMemoryGeolocationService
+    publisher: InMemoryEventPublisher
+    metrics: InMemoryMetricsRecorder
+
+
+def _vehicle(vehicle_id: str) -> Vehicle:
+    return Vehicle(
+        idvehiculo=vehicle_id,
+        estado="Y",
+        tipo_modem="MT3000",
+        velocidad=20.0,
+        direccion="Calle 72 # 45-10",
+        latitud="N10.98000",
+        longitud="W074.78000",
+        municipio="Barranquilla",
+        departamento="Atlantico",
+        idconductor=77,
+        contratista="SOBUSA",
+        recurso="R-305",
+    )
+
+
+def build_service(concurrent_lookups: bool = False):
+    now = datetime.now()
+    ports = FakePorts(
+        vehicle_events=InMemoryVehicleEventRepository(
+            descriptions={
+                2: EventoDescripcion(evento="2", estatico="N"),
+                5: EventoDescripcion(evento="5", estatico="S"),
+                6: EventoDescripcion(evento="6", estatico="S"),
+            }
+        ),
+        vehicles=InMemoryVehicleRepository(
+            vehicles=[_vehicle(VEHICLE_ID), _vehicle(SPECIAL_VEHICLE_ID)],
+            tolerancias={"SOBUSA": 0},
+        ),
+        periods=InMemoryPeriodRepository(),
+        special_routes=InMemorySpecialRouteRepository(
+            programaciones=[
+                ProgramacionEspecialVehiculo(
+                    idprogramacion=1,
+                    idvehiculo=SPECIAL_VEHICLE_ID,
+                    fechasalida=now.replace(hour=0, minute=0, second=0, microsecond=0),
+                    finalizado="N",
+                    cancelada="N",
+                    activa="S",
+                    idruta=10,
+                )
+            ],
+            detalles=[
+                RutaEspecialDetalle(idruta=10, idpunto=100, orden=1, tiempoglobal=0.0),
+            ],
+            puntos=[
+                PuntoControlEspecial(
+                    idpunto=100,
+                    latitud=CONTROL_POINT[0],
+                    longitud=CONTROL_POINT[1],
+                    radio=200.0,
+                )
+            ],
+        ),
+        geolocation=InMemoryGeolocationService(),
+        publisher=InMemoryEventPublisher(),
+        metrics=InMemoryMetricsRecorder(),
+    )
+    service = VehicleEventProcessorService(
+        vehicle_event_repo=ports.vehicle_events,
+        vehicle_repo=ports.vehicles,
+        period_repo=ports.periods,
+        special_route_repo=ports.special_routes,
+        geolocation_service=ports.geolocation,
+        event_publisher=ports.publisher,
+        metrics=ports.metrics,
+        concurrent_lookups=concurrent_lookups,
+    )
+    return service, ports
+
+
+def _event(**overrides) -> VehicleEvent:
+    now = datetime.now()
+    values = dict(
+        event_type=0,
+        vehicle_id=VEHICLE_ID,
+        event_code=2,
+        system_date_str=now.isoformat(),
+        speed=35.0,
+        latitude_raw="N10.98310",
+        longitude_raw="W074.78520",
+        odometer=15234.5,
+        ip_address="10.0.0.15",
+        port=5001,
+        vehicle_on=True,
+        signal_status="OK",
+        realtime_date=now,
+        keep_alive_date=now - timedelta(seconds=30),
+    )
+    values.update(overrides)
+    return VehicleEvent(**values)
+
+
+SCENARIOS: Dict[str, Callable[[], VehicleEvent]] = {
+    "keep_alive": lambda: _event(event_code=1, odometer=None),
+    "gps_position": lambda: _event(),
+    "ignition_on": lambda: _event(event_code=5, vehicle_on=True),
+    "ignition_off": lambda: _event(event_code=6, vehicle_on=False),
+    "no_gps": lambda: _event(latitude_raw="N0.0", longitude_raw="W0.0", speed=0.0),
+    "ota_position": lambda: _event(
+        event_type=128, address="Via 40", city="Barranquilla", department="Atlantico"
+    ),
+    "special_route": lambda: _event(
+        vehicle_id=SPECIAL_VEHICLE_ID,
+        latitude_raw=f"N{CONTROL_POINT[0]:.5f}",
+        longitude_raw=f"W{abs(CONTROL_POINT[1]):09.5f}",
+    ),
+}
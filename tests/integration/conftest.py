@@ -0,0 +1,39 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+@pytest.fixture(scope="session")
+def postgis_url():
+    """Throwaway PostGIS container, the one the DB benchmark uses.
+
+    Skipped when testcontainers is not installed or Docker is unavailable.
+    """
+    pytest.importorskip("testcontainers.postgres")
+    from benchmarks.db_benchmark import _postgis_container
+
+    container = _postgis_container()
+    try:
+        container.start()
+    except Exception as error:
+        pytest.skip(f"PostGIS container unavailable: {error}")
+    yield container.get_connection_url()
+    container.stop()
+
+
+@pytest_asyncio.fixture
+async def postgis_engine(postgis_url):
+    """Engine on a fresh, empty database of the shared container."""
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    admin = create_async_engine(postgis_url, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.execute(text(f"CREATE DATABASE {name}"))
+    await admin.dispose()
+
+    engine = create_async_engine(make_url(postgis_url).set(database=name))
+    yield engine
+    await engine.dispose()
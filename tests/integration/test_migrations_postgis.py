@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.infrastructure.adapters.database.migrator import (
+    applied_versions,
+    invalid_indexes,
+    upgrade,
+)
+from benchmarks.db_benchmark import create_schema
+
+INSERT_EVENTO = (
+    "INSERT INTO eventos (idvehiculo, evento, fecha) VALUES ('V1', '2', {fecha})"
+)
+
+
+async def _scalar(conn, sql: str):
+    return (await conn.execute(text(sql))).scalar_one_or_none()
+
+
+@pytest.mark.asyncio
+async def test_upgrade_partitions_a_create_all_eventos_table(postgis_engine):
+    await create_schema(postgis_engine)
+    async with postgis_engine.begin() as conn:
+        await conn.execute(text(INSERT_EVENTO.format(fecha="now()")))
+
+    assert "0003" in await upgrade(postgis_engine)
+
+    async with postgis_engine.begin() as conn:
+        assert (
+            await _scalar(
+                conn, "SELECT relkind FROM pg_class WHERE oid = 'eventos'::regclass"
+            )
+            == "p"
+        )
+        assert (
+            await _scalar(
+                conn,
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conname = 'eventos_pkey'",
+            )
+            == "PRIMARY KEY (idevento, fecha)"
+        )
+        assert (
+            await _scalar(
+                conn,
+                "SELECT conrelid::regclass::text FROM pg_constraint "
+                "WHERE conname = 'eventos_legacy_pkey'",
+            )
+            == "eventos_legacy"
+        )
+        assert await invalid_indexes(conn) == []
+        # New rows still get ids and land in a partition
+        await conn.execute(text(INSERT_EVENTO.format(fecha="now()")))
+        assert await _scalar(conn, "SELECT count(*) FROM eventos") == 2
+
+    assert await upgrade(postgis_engine) == []
+
+
+@pytest.mark.asyncio
+async def test_future_dated_rows_stop_the_partitioning_untouched(postgis_engine):
+    await create_schema(postgis_engine)
+    async with postgis_engine.begin() as conn:
+        await conn.execute(
+            text(INSERT_EVENTO.format(fecha="now() + interval '1 year'"))
+        )
+
+    with pytest.raises(DBAPIError, match="dated on or after the cut-over"):
+        await upgrade(postgis_engine)
+
+    async with postgis_engine.begin() as conn:
+        assert (
+            await _scalar(
+                conn, "SELECT relkind FROM pg_class WHERE oid = 'eventos'::regclass"
+            )
+            == "r"
+        )
+        assert (
+            await _scalar(
+                conn,
+                "SELECT count(*) FROM pg_constraint "
+                "WHERE conname = 'eventos_legacy_fecha_check'",
+            )
+            == 0
+        )
+        assert "0003" not in await applied_versions(conn)
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.services.vehicle_event_processor_service import (
+    VehicleEventProcessorService,
+)
+from app.infrastructure.adapters.database.instrumentation import (
+    assert_max_statements,
+    instrument_engine,
+)
+from app.infrastructure.adapters.database.repositories import (
+    PeriodRepositoryImpl,
+    SpecialRouteRepositoryImpl,
+    VehicleEventRepositoryImpl,
+    VehicleRepositoryImpl,
+)
+from app.infrastructure.adapters.geolocation.Maps_adapter import (
+    PostgresGeolocationAdapter,
+)
+from benchmarks.db_benchmark import create_schema
+from tests.fakes.in_memory_ports import InMemoryEventPublisher
+from tests.fakes.scenarios import (
+    CONTROL_POINT,
+    SCENARIOS,
+    SPECIAL_VEHICLE_ID,
+    VEHICLE_ID,
+)
+
+# SQL round trips per branch of process_event, counted by instrument_engine
+# on the SQL adapters without caches or write-behind. Raise a budget only
+# together with the change that needs the extra statement.
+STATEMENT_BUDGETS = {
+    "keep_alive": 5,
+    "gps_position": 15,
+    "ignition_on": 18,
+    "ota_position": 4,
+    "special_route": 18,
+}
+
+
+async def _seed(engine):
+    """The fleet of ``tests/fakes/scenarios.py``, as rows."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO eventosdesc (evento, estatico) VALUES (:e, :s)"),
+            [{"e": "2", "s": "N"}, {"e": "5", "s": "S"}, {"e": "6", "s": "S"}],
+        )
+        await conn.execute(
+            text(
+                'INSERT INTO "Procesos" (proceso, contratistas, toleranciatiempo) '
+                "VALUES ('test', 'SOBUSA', 0)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO vehiculos (idvehiculo, estado, tipo_modem, contratista, "
+                "recurso, encendido, enc_apa, idconductor) "
+                "VALUES (:id, 'Y', 'MT3000', 'SOBUSA', 'R-305', false, 'A', 77)"
+            ),
+            [{"id": VEHICLE_ID}, {"id": SPECIAL_VEHICLE_ID}],
+        )
+        await conn.execute(
+            text(
+                'INSERT INTO "Recursos" (recurso, contratista, estado) '
+                "VALUES ('R-305', 'SOBUSA', 'A')"
+            )
+        )
+        await conn.execute(
+            text(
+                'INSERT INTO "EjesViales" (direccion, municipio, latitud, longitud, '
+                "dirnoform, the_geom, xpos, ypos) VALUES ('Calle 72 # 45-10', "
+                "'Barranquilla', :lat, :lon, 'Calle 72 # 45-10', "
+                "ST_SetSRID(ST_MakePoint(:lon, :lat), 4326), 0, 0)"
+            ),
+            {"lat": CONTROL_POINT[0], "lon": CONTROL_POINT[1]},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO puntoscontrol (idpunto, latitud, longitud, radio) "
+                "VALUES (100, :lat, :lon, 200)"
+            ),
+            {"lat": CONTROL_POINT[0], "lon": CONTROL_POINT[1]},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO rutas_especiales_detalles (idruta, idpunto, orden, "
+                "tiempoglobal) VALUES (10, 100, 1, 0)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO prog_especiales_vehiculos (idprogramacion, idvehiculo, "
+                "fechasalida, finalizado, cancelada, activa, idruta) "
+                "VALUES (1, :id, date_trunc('day', now()), 'N', 'N', 'S', 10)"
+            ),
+            {"id": SPECIAL_VEHICLE_ID},
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scenario, budget", sorted(STATEMENT_BUDGETS.items()))
+async def test_event_statement_budget(postgis_engine, scenario, budget):
+    await create_schema(postgis_engine)
+    await _seed(postgis_engine)
+    instrument_engine(postgis_engine, name="test")
+    session_factory = async_sessionmaker(
+        bind=postgis_engine, class_=AsyncSession, autoflush=False
+    )
+
+    # The first event of a vehicle and a repeated one take different paths
+    for _ in range(2):
+        with assert_max_statements(budget, label=scenario) as counter:
+            async with session_factory() as session:
+                async with session.begin():
+                    service = VehicleEventProcessorService(
+                        vehicle_event_repo=VehicleEventRepositoryImpl(session),
+                        vehicle_repo=VehicleRepositoryImpl(session),
+                        period_repo=PeriodRepositoryImpl(session),
+                        special_route_repo=SpecialRouteRepositoryImpl(session),
+                        geolocation_service=PostgresGeolocationAdapter(session),
+                        event_publisher=InMemoryEventPublisher(),
+                    )
+                    await service.process_event(SCENARIOS[scenario]())
+        assert counter.statements > 0
@@ -0,0 +1,232 @@
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.domain.entities import PeriodoActivo, PeriodoConductor, Vehicle
+from app.infrastructure import dependencies
+from app.infrastructure.adapters.cache.period_state import PeriodStateStore
+from app.infrastructure.adapters.cache.vehicle_state import VehicleStateStore
+from app.infrastructure.adapters.cluster.affinity import (
+    VehicleAffinityMiddleware,
+)
+from app.infrastructure.adapters.cluster.hash_ring import HashRing
+from app.infrastructure.adapters.cluster.membership import (
+    ClusterMembership,
+)
+
+PATH = "/vehicle-events/process-vehicle-event"
+
+
+def _node_app(name: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post(PATH)
+    async def process(request: Request):
+        body = await request.json()
+        return {"node": name, "idveh": body["idveh"]}
+
+    return app
+
+
+def _vehicle_owned_by(ring: HashRing, node_id: str) -> str:
+    return next(v for v in (f"V{i}" for i in range(1000)) if ring.owner(v) == node_id)
+
+
+def test_ring_spreads_keys_and_moves_a_fair_share_on_join():
+    two = HashRing({"a": "http://a", "b": "http://b"})
+    three = HashRing({"a": "http://a", "b": "http://b", "c": "http://c"})
+
+    owners = [three.owner(f"V{i}") for i in range(3000)]
+    assert all(owners.count(node) > 700 for node in "abc")
+    # Only keys that now belong to "c" change owner
+    assert 0.2 < two.moved_fraction(three) < 0.45
+    assert all(
+        two.owner(f"V{i}") == three.owner(f"V{i}")
+        for i in range(3000)
+        if three.owner(f"V{i}") != "c"
+    )
+
+
+def test_membership_changes_rebuild_the_ring_and_notify():
+    membership = ClusterMembership("a", "http://a", {}, failure_threshold=2)
+    changes = []
+    membership.add_listener(lambda old, new: changes.append((len(old), len(new))))
+
+    membership.merge({"a": "http://a", "b": "http://b/"})
+    assert membership.members == {"a": "http://a", "b": "http://b"}
+    membership.remove_member("b")
+    membership.remove_member("a")  # never removes itself
+    assert changes == [(1, 2), (2, 1)]
+
+    # Peers seen failing are not re-learned through gossip
+    membership._failures["b"] = 2
+    membership.merge({"b": "http://b"})
+    assert "b" not in membership.members
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_drops_unreachable_peers():
+    membership = ClusterMembership("a", "http://a", {}, failure_threshold=2)
+    membership.add_member("b", "http://b")
+
+    def refuse(request):
+        raise httpx.ConnectError("refused")
+
+    membership.client = httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+    await membership.heartbeat()
+    assert "b" in membership.members
+    await membership.heartbeat()
+    assert "b" not in membership.members
+
+
+@pytest.fixture
+def cluster():
+    membership = ClusterMembership("a", "http://a", {})
+    membership.add_member("b", "http://b")
+    membership.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=_node_app("b"))
+    )
+    return membership
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://a"
+    )
+
+
+@pytest.mark.asyncio
+async def test_events_are_forwarded_to_their_owner(cluster):
+    app = VehicleAffinityMiddleware(_node_app("a"), cluster, PATH)
+    local = _vehicle_owned_by(cluster.ring, "a")
+    remote = _vehicle_owned_by(cluster.ring, "b")
+
+    async with _client(app) as client:
+        assert (await client.post(PATH, json={"idveh": local})).json()["node"] == "a"
+        forwarded = await client.post(PATH, json={"idveh": remote})
+        assert forwarded.json() == {"node": "b", "idveh": remote}
+
+        # Already forwarded once: processed here whatever the ring says
+        pinned = await client.post(
+            PATH, json={"idveh": remote}, headers={"X-Cluster-Forwarded-By": "b"}
+        )
+        assert pinned.json()["node"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_owner_backoff_reaches_the_caller(cluster):
+    busy = FastAPI()
+
+    @busy.post(PATH)
+    async def reject():
+        return JSONResponse(
+            {"detail": "Overloaded"}, status_code=503, headers={"Retry-After": "2"}
+        )
+
+    cluster.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=busy))
+    app = VehicleAffinityMiddleware(_node_app("a"), cluster, PATH)
+    remote = _vehicle_owned_by(cluster.ring, "b")
+
+    async with _client(app) as client:
+        response = await client.post(PATH, json={"idveh": remote})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+    assert response.json() == {"detail": "Overloaded"}
+
+
+@pytest.mark.asyncio
+async def test_redirect_mode_points_at_the_owner(cluster):
+    app = VehicleAffinityMiddleware(_node_app("a"), cluster, PATH, mode="redirect")
+    remote = _vehicle_owned_by(cluster.ring, "b")
+
+    async with _client(app) as client:
+        response = await client.post(PATH, json={"idveh": remote})
+    assert response.status_code == 307
+    assert response.headers["location"] == "http://b" + PATH
+
+
+@pytest.mark.asyncio
+async def test_unreachable_owner_falls_back_to_local_processing(cluster):
+    def refuse(request):
+        raise httpx.ConnectError("refused")
+
+    cluster.client = httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+    dropped = []
+    app = VehicleAffinityMiddleware(
+        _node_app("a"), cluster, PATH, on_local_fallback=dropped.append
+    )
+    remote = _vehicle_owned_by(cluster.ring, "b")
+
+    async with _client(app) as client:
+        response = await client.post(PATH, json={"idveh": remote})
+    assert response.json()["node"] == "a"
+    # Neither the owner's state is read nor this event's state kept
+    assert dropped == [remote, remote]
+
+
+def _vehicle(vehicle_id: str) -> Vehicle:
+    return Vehicle(
+        idvehiculo=vehicle_id,
+        estado="Y",
+        ultimaactualizacion=datetime(2025, 8, 20),
+        contratista="ACME",
+    )
+
+
+def test_rebalance_drops_state_of_vehicles_that_changed_owner(monkeypatch):
+    store = VehicleStateStore()
+    monkeypatch.setattr(dependencies, "vehicle_state", store)
+    membership = ClusterMembership("a", "http://a", {})
+    membership.add_listener(dependencies.drop_moved_vehicle_state)
+    vehicle_ids = [f"V{i}" for i in range(200)]
+    for vehicle_id in vehicle_ids:
+        store.put(_vehicle(vehicle_id))
+
+    membership.add_member("b", "http://b")  # a -> b for some of them
+    moved = {v for v in vehicle_ids if membership.ring.owner(v) == "b"}
+    assert moved and all(store.get(v) is None for v in moved)
+    for vehicle_id in moved:  # What b's events would have left here
+        store.put(_vehicle(vehicle_id))
+
+    membership.remove_member("b")  # ... and back to a
+    assert all(store.get(v) is None for v in moved)
+    assert all(store.get(v) is not None for v in set(vehicle_ids) - moved)
+
+
+def test_rebalance_drops_periods_of_vehicles_that_changed_owner(monkeypatch):
+    store = PeriodStateStore()
+    monkeypatch.setattr(dependencies, "period_state", store)
+    membership = ClusterMembership("a", "http://a", {})
+    membership.add_listener(dependencies.drop_moved_vehicle_state)
+    start = datetime(2025, 8, 20)
+    vehicle_ids = [f"V{i}" for i in range(200)]
+    for period_id, vehicle_id in enumerate(vehicle_ids):
+        store.active.put(
+            period_id,
+            PeriodoActivo(idperiodo=period_id, idvehiculo=vehicle_id, fechadesde=start),
+        )
+        store.drivers.put(
+            (vehicle_id, 7),
+            PeriodoConductor(
+                idperiodo=period_id,
+                idvehiculo=vehicle_id,
+                idconductor=7,
+                fechadesde=start,
+            ),
+        )
+    store.active.put(1000, None)  # A period not opened yet when looked up
+
+    membership.add_member("b", "http://b")
+    moved = {v for v in vehicle_ids if membership.ring.owner(v) == "b"}
+    assert moved
+    assert {p.idvehiculo for p, _ in store.active._entries.values()} == (
+        set(vehicle_ids) - moved
+    )
+    assert {v for v, _ in store.drivers._entries} == set(vehicle_ids) - moved
+
+    kept = next(v for v in vehicle_ids if v not in moved)
+    dependencies.drop_vehicle_state(kept)  # Processed here as a fallback
+    assert all(v != kept for v, _ in store.drivers._entries)
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.adapters.database.lookup_session import (
+    PooledLookupSession,
+)
+from tests.fakes.scenarios import (
+    SCENARIOS,
+    SPECIAL_VEHICLE_ID,
+    VEHICLE_ID,
+    build_service,
+)
+
+
+class _Overlap:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def slow(self, method):
+        async def wrapper(*args, **kwargs):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                return await method(*args, **kwargs)
+            finally:
+                self.in_flight -= 1
+
+        return wrapper
+
+
+def _slow_lookups(ports, overlap):
+    ports.vehicles.get_vehicle_tolerancia_tiempo = overlap.slow(
+        ports.vehicles.get_vehicle_tolerancia_tiempo
+    )
+    ports.vehicle_events.find_evento_descripcion = overlap.slow(
+        ports.vehicle_events.find_evento_descripcion
+    )
+    ports.periods.get_active_periodo = overlap.slow(ports.periods.get_active_periodo)
+    ports.special_routes.get_active_special_programacion_for_vehicle = overlap.slow(
+        ports.special_routes.get_active_special_programacion_for_vehicle
+    )
+    ports.geolocation.get_address_from_coords = overlap.slow(
+        ports.geolocation.get_address_from_coords
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent, peak", [(False, 1), (True, 5)])
+async def test_independent_lookups_overlap_only_when_enabled(concurrent, peak):
+    service, ports = build_service(concurrent_lookups=concurrent)
+    overlap = _Overlap()
+    _slow_lookups(ports, overlap)
+
+    await service.process_event(SCENARIOS["special_route"]())
+
+    assert overlap.peak == peak
+    assert len(ports.special_routes.controles) == 1
+    lookup_stages = {stage for stage, *_ in ports.metrics.stages}
+    assert {
+        "tolerance_lookup",
+        "period_lookup",
+        "special_route_lookup",
+    } <= lookup_stages
+
+
+@pytest.mark.asyncio
+async def test_concurrent_and_sequential_runs_write_the_same_state():
+    results = []
+    for concurrent in (False, True):
+        service, ports = build_service(concurrent_lookups=concurrent)
+        for name in ("ignition_on", "gps_position", "no_gps", "ignition_off"):
+            await service.process_event(SCENARIOS[name]())
+        await service.process_event(SCENARIOS["special_route"]())
+        vehicle = ports.vehicles.vehicles[VEHICLE_ID]
+        results.append(
+            (
+                [(e.event_code, e.latitude_raw) for e in ports.vehicle_events.events],
+                [p.fechahasta is None for p in ports.periods.periodos.values()],
+                (vehicle.ultperiodo, vehicle.latitud, vehicle.enc_apa),
+                ports.vehicles.vehicles[SPECIAL_VEHICLE_ID].latitud,
+                len(ports.special_routes.controles),
+            )
+        )
+    assert results[0] == results[1]
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_cancels_the_others_and_keeps_its_error():
+    service, ports = build_service(concurrent_lookups=True)
+    cancelled = []
+
+    async def hangs(*args):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fails(*args):
+        await asyncio.sleep(0)
+        raise ConnectionResetError("lookup connection lost")
+
+    ports.periods.get_active_periodo = hangs
+    ports.vehicle_events.find_evento_descripcion = fails
+
+    with pytest.raises(ConnectionResetError):
+        await service.process_event(SCENARIOS["gps_position"]())
+    assert cancelled == [True]
+    assert ports.vehicle_events.events == []
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def freeze(self):
+        return lambda: _FakeResult(list(self.rows))
+
+
+class _FakeSession:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        self.log.append("open")
+        return self
+
+    async def __aexit__(self, *exc):
+        self.log.append("close")
+
+    async def execute(self, statement, params=None):
+        await asyncio.sleep(0)
+        return _FakeResult([(statement, params)])
+
+
+@pytest.mark.asyncio
+async def test_pooled_lookup_session_uses_one_session_per_statement():
+    log = []
+    session = PooledLookupSession(lambda: _FakeSession(log))
+
+    first, second = await asyncio.gather(
+        session.execute("SELECT 1"), session.execute("SELECT 2", {"x": 1})
+    )
+
+    assert first.rows == [("SELECT 1", None)]
+    assert second.rows == [("SELECT 2", {"x": 1})]
+    assert log == ["open", "open", "close", "close"]
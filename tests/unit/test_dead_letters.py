@@ -0,0 +1,193 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import exc as sa_exc
+
+from app.infrastructure.adapters.api import routes
+from app.infrastructure.adapters.api.schemas import VehicleEventRequest
+from app.infrastructure.adapters.deadletter import store as store_module
+from app.infrastructure.adapters.deadletter.retrier import (
+    DeadLetterRetrier,
+    backoff_delay,
+)
+from app.infrastructure.adapters.deadletter.store import (
+    PERMANENT,
+    TRANSIENT,
+    DeadLetterStore,
+    claim_path,
+    classify_error,
+)
+
+
+class _PgError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def _request():
+    return VehicleEventRequest(
+        tipo=0,
+        idveh="7",
+        idevento_=2,
+        fechasys_="2024-01-01 12:00:00",
+        speed=40.0,
+        lat="N19.40000",
+        lon="W099.10000",
+        ip="10.0.0.1",
+        port=5000,
+        fechakeep=datetime(2024, 1, 1, 12, 0, 0),
+    )
+
+
+def test_connection_and_deadlock_errors_are_transient():
+    assert classify_error(sa_exc.OperationalError("x", {}, Exception())) == TRANSIENT
+    assert classify_error(asyncio.TimeoutError()) == TRANSIENT
+    assert classify_error(ConnectionResetError()) == TRANSIENT
+    deadlock = sa_exc.DBAPIError("x", {}, _PgError("40P01"))
+    assert classify_error(deadlock) == TRANSIENT
+    violation = sa_exc.IntegrityError("x", {}, _PgError("23505"))
+    assert classify_error(violation) == PERMANENT
+    assert classify_error(ValueError("bad payload")) == PERMANENT
+
+
+@pytest.mark.asyncio
+async def test_store_reload_keeps_last_state_and_skips_torn_line(tmp_path):
+    path = str(tmp_path / "dead.jsonl")
+    store = DeadLetterStore(path)
+    kept = await store.add({"idveh": 1}, asyncio.TimeoutError())
+    done = await store.add({"idveh": 2}, asyncio.TimeoutError())
+    kept.attempts = 3
+    await store.save(kept)
+    done.status = "done"
+    await store.save(done)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"payload": {"idveh": 3}, "err')  # Crash mid-write
+
+    reloaded = DeadLetterStore(path)
+    assert [r.id for r in reloaded.list()] == [kept.id]
+    assert reloaded.get(kept.id).attempts == 3
+    assert reloaded.pending_count() == 1
+
+
+@pytest.mark.asyncio
+async def test_store_compacts_to_records_still_needing_attention(tmp_path):
+    path = str(tmp_path / "dead.jsonl")
+    store = DeadLetterStore(path, compact_ratio=1)
+    for i in range(70):
+        record = await store.add({"idveh": i}, asyncio.TimeoutError())
+        record.status = "done"
+        await store.save(record)
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) < 70
+    assert len(store) == 0
+
+
+def test_backoff_grows_and_is_capped():
+    for attempts, full in ((1, 2.0), (3, 8.0), (20, 60.0)):
+        delay = backoff_delay(attempts, base=2.0, maximum=60.0)
+        assert full / 2 <= delay <= full
+
+
+@pytest.mark.asyncio
+async def test_retrier_reschedules_parks_and_completes(tmp_path):
+    store = DeadLetterStore(str(tmp_path / "dead.jsonl"))
+    flaky = await store.add({"idveh": 1}, asyncio.TimeoutError())
+    broken = await store.add({"idveh": 2}, asyncio.TimeoutError())
+    outcomes = {1: [asyncio.TimeoutError(), None], 2: [ValueError("bad")]}
+
+    async def replay(payload):
+        outcome = outcomes[payload["idveh"]].pop(0)
+        if outcome is not None:
+            raise outcome
+        return "ok"
+
+    retrier = DeadLetterRetrier(
+        store, replay, base_delay=10.0, max_delay=10.0, max_attempts=5
+    )
+    assert await retrier.retry_due() == 0
+    assert broken.status == PERMANENT
+    assert flaky.status == "pending" and flaky.attempts == 1
+    assert store.due(flaky.created_at + 1.0, 10) == []
+
+    assert await retrier.retry_due(now=flaky.next_attempt_at) == 1
+    assert store.get(flaky.id) is None
+    assert [r.id for r in DeadLetterStore(store.path).list()] == [broken.id]
+
+
+@pytest.mark.asyncio
+async def test_retrier_gives_up_after_max_attempts(tmp_path):
+    store = DeadLetterStore(str(tmp_path / "dead.jsonl"))
+    record = await store.add({"idveh": 1}, asyncio.TimeoutError())
+
+    async def replay(payload):
+        raise asyncio.TimeoutError()
+
+    retrier = DeadLetterRetrier(store, replay, max_attempts=2)
+    await retrier.retry_due()
+    await retrier.retry_due(now=record.next_attempt_at)
+    assert record.status == "exhausted"
+    assert store.due(float("inf"), 10) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_event_is_stored_and_answered_with_202(tmp_path, monkeypatch):
+    store = DeadLetterStore(str(tmp_path / "dead.jsonl"))
+    monkeypatch.setattr(routes, "dead_letter_store", store)
+
+    class FailingService:
+        async def process_event(self, event):
+            raise sa_exc.OperationalError("x", {}, Exception("connection lost"))
+
+    request = _request()
+    with pytest.raises(routes.EventDeadLettered) as raised:
+        await routes._process(FailingService(), request.to_entity(), request)
+    record = raised.value.record
+    assert record.error_class == TRANSIENT
+    assert VehicleEventRequest.model_validate(record.payload) == request
+
+    response = await routes.dead_letter_handler(None, raised.value)
+    assert response.status_code == 202
+    assert json.loads(response.body)["status"] == "ACCEPTED"
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_is_answered_with_500_and_not_stored(
+    tmp_path, monkeypatch
+):
+    store = DeadLetterStore(str(tmp_path / "dead.jsonl"))
+    monkeypatch.setattr(routes, "dead_letter_store", store)
+
+    class RejectingService:
+        async def process_event(self, event):
+            raise sa_exc.IntegrityError("x", {}, _PgError("23505"))
+
+    request = _request()
+    with pytest.raises(HTTPException) as raised:
+        await routes._process(RejectingService(), request.to_entity(), request)
+    assert raised.value.status_code == 500
+    assert len(store) == 0
+
+
+def test_each_process_claims_its_own_dead_letter_file(monkeypatch, tmp_path):
+    base = str(tmp_path / "dead.jsonl")
+    monkeypatch.setattr(store_module, "_claimed", {})
+    assert claim_path(base) == base
+    assert claim_path(base) == base  # Same process, same file
+    first = store_module._claimed
+
+    # Another worker: its own lock on a separate open file
+    monkeypatch.setattr(store_module, "_claimed", {})
+    assert claim_path(base) == str(tmp_path / "dead.1.jsonl")
+    second = store_module._claimed
+
+    # The first worker exits; its replacement takes over its file
+    first[base][1].close()
+    monkeypatch.setattr(store_module, "_claimed", {})
+    assert claim_path(base) == base
+    for claimed in (second, store_module._claimed):
+        claimed[base][1].close()
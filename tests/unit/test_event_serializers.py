@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.domain.entities import GeolocationInfo, VehicleEvent
+from app.infrastructure.adapters.messaging.serializers import (
+    BinaryEventSerializer,
+    CompactJsonEventSerializer,
+    JsonEventSerializer,
+    get_event_serializer,
+)
+
+
+def _processed_event():
+    return VehicleEvent(
+        event_type=0,
+        vehicle_id="SOBUSA305",
+        event_code=5,
+        system_date_str="2025-08-20T00:00:00",
+        speed=42.5,
+        latitude_raw="N10.12345",
+        longitude_raw="W074.12345",
+        odometer=1234.5,
+        ip_address="127.0.0.1",
+        port=8080,
+        vehicle_on=True,
+        realtime_date=datetime(2025, 8, 20, 10, 30, 15, 123456),
+        keep_alive_date=datetime(2025, 8, 20, 10, 30),
+        processed_latitude=10.12345,
+        processed_longitude=-74.12345,
+        processed_speed=42.5,
+        processed_date=datetime(2025, 8, 20, 10, 30, 15),
+        geolocation=GeolocationInfo(
+            address="Calle 1", city="Barranquilla", department="Atlantico"
+        ),
+        ignition_status="5",
+        event_db_id=987654321,
+    )
+
+
+@pytest.mark.parametrize(
+    "serializer",
+    [JsonEventSerializer(), CompactJsonEventSerializer(), BinaryEventSerializer()],
+)
+def test_round_trip(serializer):
+    event = _processed_event()
+    assert serializer.deserialize(serializer.serialize(event)) == event
+
+
+def test_default_json_keeps_the_full_message():
+    event = _processed_event()
+    serializer = get_event_serializer("json")
+    assert serializer.serialize(event) == event.model_dump_json().encode("utf-8")
+
+
+def test_binary_is_smaller_than_full_json():
+    event = _processed_event()
+    binary = BinaryEventSerializer().serialize(event)
+    assert len(binary) < len(event.model_dump_json().encode("utf-8")) / 2
+
+
+def test_binary_rejects_unknown_version():
+    payload = bytearray(BinaryEventSerializer().serialize(_processed_event()))
+    payload[2] = 99
+    with pytest.raises(ValueError):
+        BinaryEventSerializer().deserialize(bytes(payload))
+
+
+def test_unknown_serializer_name():
+    with pytest.raises(ValueError):
+        get_event_serializer("xml")
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from app.infrastructure.adapters.database.partitions import (
+    Partition,
+    PartitionManager,
+    next_boundary,
+    parse_partition_bound,
+    partition_name,
+)
+
+NOW = datetime(2026, 10, 19, 15, 30)
+
+
+def _manager(**kwargs):
+    return PartitionManager(engine=None, **kwargs)
+
+
+def test_boundaries_and_names():
+    assert next_boundary(NOW, "daily") == datetime(2026, 10, 20)
+    assert next_boundary(datetime(2026, 12, 31, 23), "monthly") == datetime(2027, 1, 1)
+    assert partition_name(datetime(2026, 10, 20), "daily") == "eventos_p20261020"
+    assert partition_name(datetime(2026, 10, 1), "monthly") == "eventos_p202610"
+
+
+def test_parse_partition_bound():
+    legacy = parse_partition_bound(
+        "eventos_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-10-21 00:00:00')"
+    )
+    assert legacy == Partition("eventos_legacy", None, datetime(2026, 10, 21))
+    assert parse_partition_bound("eventos_default", "DEFAULT") is None
+
+
+def test_missing_ranges_continue_from_the_legacy_cutover():
+    partitions = [Partition("eventos_legacy", None, datetime(2026, 10, 21))]
+    ranges = list(_manager(ahead=3).missing_ranges(partitions, NOW))
+    assert ranges == [
+        (datetime(2026, 10, 21), datetime(2026, 10, 22)),
+        (datetime(2026, 10, 22), datetime(2026, 10, 23)),
+    ]
+    # Up to date: nothing to create
+    partitions.append(Partition("eventos_p20261021", *ranges[0]))
+    partitions.append(Partition("eventos_p20261022", *ranges[1]))
+    assert list(_manager(ahead=3).missing_ranges(partitions, NOW)) == []
+
+
+def test_monthly_ranges_align_after_a_mid_month_cutover():
+    partitions = [Partition("eventos_legacy", None, datetime(2026, 10, 21))]
+    ranges = list(_manager(interval="monthly", ahead=1).missing_ranges(partitions, NOW))
+    assert ranges == [
+        (datetime(2026, 10, 21), datetime(2026, 11, 1)),
+        (datetime(2026, 11, 1), datetime(2026, 12, 1)),
+    ]
+
+
+def test_retention_only_selects_fully_expired_partitions():
+    partitions = [
+        Partition("eventos_legacy", None, datetime(2026, 9, 1)),
+        Partition("eventos_p20261011", datetime(2026, 10, 11), datetime(2026, 10, 12)),
+        Partition("eventos_p20261012", datetime(2026, 10, 12), datetime(2026, 10, 13)),
+    ]
+    expired = _manager(retention_days=7).expired(partitions, NOW)
+    assert [p.name for p in expired] == ["eventos_legacy", "eventos_p20261011"]
+    assert _manager(retention_days=0).expired(partitions, NOW) == []
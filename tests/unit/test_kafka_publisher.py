@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.core.domain.entities import VehicleEvent
+from app.infrastructure.adapters.messaging.kafka_publisher import (
+    KafkaEventPublisher,
+)
+
+
+class FakeProducer:
+    def __init__(self):
+        self.sent = []
+        self.deliveries = []
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        self.sent.append((topic, value, key))
+        delivery = asyncio.get_running_loop().create_future()
+        self.deliveries.append(delivery)
+        return delivery
+
+
+def _event(vehicle_id="ABC123"):
+    return VehicleEvent(
+        event_type=0,
+        vehicle_id=vehicle_id,
+        event_code=2,
+        system_date_str="2025-08-20T00:00:00",
+        speed=10.0,
+        latitude_raw="N10.1",
+        longitude_raw="W074.1",
+        ip_address="127.0.0.1",
+        port=8080,
+        keep_alive_date=datetime(2025, 8, 20),
+    )
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_delivery():
+    publisher = KafkaEventPublisher()
+    publisher.wait_for_delivery = False
+    publisher.producer = FakeProducer()
+
+    await publisher.publish_processed_event(_event())
+
+    topic, _, key = publisher.producer.sent[0]
+    assert key == b"ABC123"
+    assert publisher.pending_count == 1
+
+    publisher.producer.deliveries[0].set_result(None)
+    await asyncio.sleep(0)
+    assert publisher.pending_count == 0
+    assert publisher.delivered_count == 1
+
+
+@pytest.mark.asyncio
+async def test_delivery_failure_is_counted():
+    publisher = KafkaEventPublisher()
+    publisher.wait_for_delivery = False
+    publisher.producer = FakeProducer()
+
+    await publisher.publish_processed_event(_event())
+    publisher.producer.deliveries[0].set_exception(RuntimeError("broker down"))
+    await asyncio.sleep(0)
+
+    assert publisher.failed_count == 1
+    assert publisher.delivered_count == 0
+
+
+@pytest.mark.asyncio
+async def test_serialization_failure_is_counted_and_logged(caplog):
+    class BrokenSerializer:
+        content_type = "application/json"
+
+        def serialize(self, event):
+            raise ValueError("not serializable")
+
+    publisher = KafkaEventPublisher()
+    publisher.serializer = BrokenSerializer()
+    publisher.producer = FakeProducer()
+
+    await publisher.publish_processed_event(_event())
+
+    assert publisher.producer.sent == []
+    assert publisher.failed_count == 1
+    assert "not serializable" in caplog.text
@@ -0,0 +1,54 @@
+import json
+import logging
+import queue
+
+from app.infrastructure.config.logging_config import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+def _record(msg="hello", **extra):
+    record = logging.makeLogRecord({"name": "app.core", "msg": msg, "levelno": 20})
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_filter_keeps_one_in_n():
+    sampler = SamplingFilter(every=10)
+    kept = [sampler.filter(_record(sampled=True)) for _ in range(100)]
+    assert sum(kept) == 10
+    assert sampler.filter(_record())  # unsampled records always pass
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(_record(vehicle_id="ABC123", sampled=True))
+    payload = json.loads(line)
+    assert payload["msg"] == "hello"
+    assert payload["vehicle_id"] == "ABC123"
+    assert "sampled" not in payload
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.emit(_record())
+    handler.emit(_record())
+    assert handler.dropped == 1
+
+
+def test_shutdown_restores_the_root_handlers():
+    root = logging.getLogger()
+    original = root.handlers
+    marker = logging.NullHandler()
+    root.handlers = [marker]
+    try:
+        configure_logging()
+        assert isinstance(root.handlers[0], DroppingQueueHandler)
+        shutdown_logging()
+        assert root.handlers == [marker]
+    finally:
+        shutdown_logging()
+        root.handlers = original
@@ -0,0 +1,240 @@
+import pytest
+
+from app.infrastructure.adapters.database import migrator
+from app.infrastructure.adapters.database.migrator import (
+    find_seq_scans,
+    load_migrations,
+    split_statements,
+    upgrade,
+)
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.log.append("BEGIN")
+
+    async def __aexit__(self, exc_type, *exc):
+        self.conn.log.append("ROLLBACK" if exc_type else "COMMIT")
+
+
+class _Connection:
+    """Logs statements and transaction boundaries; fails on ``fail_on``."""
+
+    def __init__(self, log, fail_on):
+        self.log = log
+        self.fail_on = fail_on
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def begin(self):
+        return _Transaction(self)
+
+    async def execution_options(self, isolation_level):
+        self.log.append(isolation_level)
+        return self
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"failed: {sql}")
+        self.log.append(sql.split(" (")[0] if "schema_migrations" in sql else sql)
+        return []
+
+
+class _Engine:
+    def __init__(self, fail_on=None):
+        self.log = []
+        self.fail_on = fail_on
+
+    def connect(self):
+        return _Connection(self.log, self.fail_on)
+
+
+def _migrations(monkeypatch, tmp_path, files):
+    for name, sql in files.items():
+        (tmp_path / name).write_text(sql)
+    monkeypatch.setattr(migrator, "load_migrations", lambda: load_migrations(tmp_path))
+
+
+def test_bundled_migrations_are_ordered_and_split():
+    migrations = load_migrations()
+    versions = [m.version for m in migrations]
+    assert versions == sorted(versions)
+    assert versions[:4] == ["0001", "0002", "0003", "0004"]
+    for migration in migrations:
+        statements = migration.statements()
+        assert statements
+        assert all(not s.endswith(";") for s in statements)
+    indexes = " ".join(migrations[1].statements())
+    assert indexes.count("CREATE INDEX CONCURRENTLY IF NOT EXISTS") == 6
+
+
+def test_split_statements_skips_comments_and_blank_lines():
+    sql = (
+        "-- header\nCREATE TABLE a (id int);\n\n"
+        "-- why\nCREATE INDEX i\n    ON a (id);\n"
+    )
+    assert split_statements(sql) == [
+        "CREATE TABLE a (id int)",
+        "CREATE INDEX i\n    ON a (id)",
+    ]
+
+
+def test_split_statements_keeps_dollar_quoted_blocks_whole():
+    sql = (
+        "DO $$\nBEGIN\n    -- inside the block\n    ALTER TABLE a RENAME TO b;\n"
+        "    CREATE TABLE a (id int);\nEND\n$$;\n\nANALYZE a;\n"
+    )
+    statements = split_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].startswith("DO $$") and statements[0].endswith("$$")
+    assert "-- inside the block" in statements[0]
+    assert statements[1] == "ANALYZE a"
+
+
+def test_bad_migration_names_are_rejected(tmp_path):
+    (tmp_path / "add_index.sql").write_text("SELECT 1;")
+    with pytest.raises(ValueError):
+        load_migrations(tmp_path)
+
+
+def test_find_seq_scans_walks_nested_plans():
+    plan = [
+        {
+            "Plan": {
+                "Node Type": "Limit",
+                "Plans": [
+                    {
+                        "Node Type": "Nested Loop",
+                        "Plans": [
+                            {"Node Type": "Index Scan", "Relation Name": "vehiculos"},
+                            {"Node Type": "Seq Scan", "Relation Name": "eventos"},
+                        ],
+                    }
+                ],
+            }
+        }
+    ]
+    assert find_seq_scans(plan) == ["eventos"]
+    assert find_seq_scans([{"Plan": {"Node Type": "Index Only Scan"}}]) == []
+
+
+def test_bundled_migrations_scan_eventos_outside_the_swap_transaction():
+    steps = {m.version: m.steps() for m in load_migrations()}
+    assert [autocommit for autocommit, _ in steps["0003"]] == [False, True, False]
+    validate, index = steps["0003"][1][1]
+    assert "VALIDATE CONSTRAINT" in validate and "CONCURRENTLY" in index
+
+
+@pytest.mark.asyncio
+async def test_migration_runs_in_one_transaction_with_its_version(
+    monkeypatch, tmp_path
+):
+    _migrations(
+        monkeypatch,
+        tmp_path,
+        {"0001_a.sql": "CREATE TABLE a (id int);\nALTER TABLE a ADD b int;\n"},
+    )
+    engine = _Engine(fail_on="ALTER TABLE")
+
+    with pytest.raises(RuntimeError):
+        await upgrade(engine)
+
+    assert engine.log[-3:] == ["BEGIN", "CREATE TABLE a (id int)", "ROLLBACK"]
+    engine = _Engine()
+    assert await upgrade(engine) == ["0001"]
+    assert engine.log[-5:] == [
+        "BEGIN",
+        "CREATE TABLE a (id int)",
+        "ALTER TABLE a ADD b int",
+        "INSERT INTO schema_migrations",
+        "COMMIT",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_builds_run_in_autocommit_before_the_version_row(
+    monkeypatch, tmp_path
+):
+    index = "CREATE INDEX CONCURRENTLY IF NOT EXISTS i ON a (id)"
+    _migrations(
+        monkeypatch,
+        tmp_path,
+        {"0001_a.sql": f"CREATE TABLE IF NOT EXISTS a (id int);\n{index};\n"},
+    )
+    engine = _Engine()
+
+    await upgrade(engine)
+
+    assert engine.log[-8:] == [
+        "BEGIN",
+        "CREATE TABLE IF NOT EXISTS a (id int)",
+        "COMMIT",
+        "AUTOCOMMIT",
+        index,
+        "BEGIN",
+        "INSERT INTO schema_migrations",
+        "COMMIT",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_statements_between_autocommit_ones_share_a_transaction(
+    monkeypatch, tmp_path
+):
+    validate = "ALTER TABLE a VALIDATE CONSTRAINT c"
+    index = "CREATE INDEX CONCURRENTLY IF NOT EXISTS i ON a (id)"
+    block = "DO $$\nBEGIN\n    ALTER TABLE a VALIDATE CONSTRAINT c;\nEND\n$$"
+    _migrations(
+        monkeypatch,
+        tmp_path,
+        {
+            "0001_a.sql": (
+                f"CREATE TABLE a (id int);\n{validate};\n{index};\n"
+                f"{block};\nALTER TABLE a ADD b int;\n"
+            )
+        },
+    )
+    engine = _Engine()
+
+    await upgrade(engine)
+
+    assert engine.log[-11:] == [
+        "BEGIN",
+        "CREATE TABLE a (id int)",
+        "COMMIT",
+        "AUTOCOMMIT",
+        validate,
+        index,
+        "BEGIN",
+        block,
+        "ALTER TABLE a ADD b int",
+        "INSERT INTO schema_migrations",
+        "COMMIT",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_build_without_if_not_exists_is_rejected_before_running(
+    monkeypatch, tmp_path
+):
+    _migrations(
+        monkeypatch,
+        tmp_path,
+        {
+            "0001_ok.sql": "CREATE TABLE a (id int);",
+            "0002_bad.sql": "CREATE INDEX CONCURRENTLY i ON a (id);",
+        },
+    )
+    engine = _Engine()
+
+    with pytest.raises(ValueError, match="0002_bad.sql"):
+        await upgrade(engine)
+    assert "CREATE TABLE a (id int)" not in engine.log
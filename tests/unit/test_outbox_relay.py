@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from aiokafka.errors import KafkaTimeoutError
+
+from app.core.domain.entities import VehicleEvent
+from app.infrastructure.adapters.messaging.kafka_publisher import (
+    KafkaEventPublisher,
+)
+from app.infrastructure.adapters.messaging.outbox import OutboxRelay
+
+
+def _event(vehicle_id: str) -> VehicleEvent:
+    return VehicleEvent(
+        event_type=0,
+        vehicle_id=vehicle_id,
+        event_code=2,
+        system_date_str="2025-08-20T00:00:00",
+        speed=10.0,
+        latitude_raw="N10.1",
+        longitude_raw="W074.1",
+        ip_address="127.0.0.1",
+        port=8080,
+        keep_alive_date=datetime(2025, 8, 20),
+    )
+
+
+class FailingProducer:
+    """Acknowledges on flush, except for the vehicles in ``rejected``."""
+
+    def __init__(self, rejected=(), refuse_after=None):
+        self.rejected = set(rejected)
+        self.refuse_after = refuse_after
+        self.deliveries = []
+
+    async def send(self, topic, value=None, key=None, headers=None):
+        if self.refuse_after is not None and len(self.deliveries) >= self.refuse_after:
+            raise KafkaTimeoutError("accumulator full")
+        delivery = asyncio.get_running_loop().create_future()
+        self.deliveries.append((key.decode(), delivery))
+        return delivery
+
+    async def flush(self):
+        for vehicle_id, delivery in self.deliveries:
+            if delivery.done():
+                continue
+            if vehicle_id in self.rejected:
+                delivery.set_exception(RuntimeError("broker down"))
+            else:
+                delivery.set_result(None)
+
+
+class _OutboxSession:
+    """Serves pending outbox rows and records which ids get marked."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.marked = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt):
+        if stmt.is_select:
+            rows = self.rows
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+        (ids,) = [v for k, v in stmt.compile().params.items() if k.startswith("id")]
+        self.marked.extend(ids)
+
+
+def _relay(producer, vehicle_ids):
+    publisher = KafkaEventPublisher()
+    publisher.producer = producer
+    rows = [
+        SimpleNamespace(id=row_id, payload=_event(vehicle_id).model_dump_json())
+        for row_id, vehicle_id in enumerate(vehicle_ids, start=1)
+    ]
+    session = _OutboxSession(rows)
+    return OutboxRelay(lambda: session, publisher), session, publisher
+
+
+@pytest.mark.asyncio
+async def test_only_acknowledged_rows_are_marked_published():
+    relay, session, publisher = _relay(
+        FailingProducer(rejected={"BAD"}), ["V1", "BAD", "V3"]
+    )
+
+    assert await relay.relay_batch() == 2
+    assert session.marked == [1, 3]
+    assert relay.last_published_id == 3
+    assert (publisher.delivered_count, publisher.failed_count) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_marked_when_the_broker_is_down():
+    relay, session, _ = _relay(FailingProducer(rejected={"V1", "V2"}), ["V1", "V2"])
+
+    assert await relay.relay_batch() == 0
+    assert session.marked == []
+
+
+@pytest.mark.asyncio
+async def test_refused_send_leaves_the_rest_of_the_batch_pending():
+    relay, session, publisher = _relay(
+        FailingProducer(refuse_after=1), ["V1", "V2", "V3"]
+    )
+
+    assert await relay.relay_batch() == 1
+    assert session.marked == [1]
+    assert publisher.failed_count == 1
@@ -0,0 +1,154 @@
+import itertools
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.domain.entities import PeriodoActivo, PeriodoConductor
+from app.core.domain.periods import (
+    CLOSE,
+    START,
+    DriverPeriodStep,
+    active_period_step,
+    driver_period_step,
+)
+from app.infrastructure.adapters.cache.period_state import (
+    PeriodStateStore,
+)
+from app.infrastructure.adapters.database.migrator import (
+    MIGRATIONS_DIR,
+    load_migrations,
+)
+from app.infrastructure.adapters.database.repositories import (
+    PeriodRepositoryImpl,
+)
+from tests.fakes.scenarios import SCENARIOS, VEHICLE_ID, build_service
+
+NOW = datetime(2024, 5, 1, 6, 0, 0)
+
+
+def _driver_period(fechahasta=None) -> PeriodoConductor:
+    return PeriodoConductor(
+        idperiodo=7,
+        idvehiculo="V1",
+        idconductor=3,
+        fechadesde=NOW - timedelta(hours=8),
+        fechahasta=fechahasta,
+    )
+
+
+@pytest.mark.parametrize(
+    "last, code, step",
+    [
+        (None, 5, DriverPeriodStep(start=True)),
+        (None, 6, DriverPeriodStep()),
+        (_driver_period(), 5, DriverPeriodStep(close=7, start=True)),
+        (_driver_period(), 6, DriverPeriodStep(close=7)),
+        (_driver_period(NOW - timedelta(seconds=30)), 5, DriverPeriodStep(reopen=7)),
+        (_driver_period(NOW - timedelta(seconds=30)), 6, DriverPeriodStep()),
+        (_driver_period(NOW - timedelta(minutes=5)), 5, DriverPeriodStep(start=True)),
+    ],
+)
+def test_driver_period_transitions(last, code, step):
+    assert driver_period_step(last, code, NOW) == step
+
+
+def test_active_period_transitions():
+    open_period = PeriodoActivo(idperiodo=1, idvehiculo="V1", fechadesde=NOW)
+    closed_period = open_period.model_copy(update={"fechahasta": NOW})
+    assert active_period_step(None, 2, True) == START
+    assert active_period_step(closed_period, 5, False) == START
+    assert active_period_step(open_period, 2, True) is None
+    assert active_period_step(open_period, 6, True) == CLOSE
+    assert active_period_step(open_period, 2, False) == CLOSE
+    assert active_period_step(None, 6, False) is None
+
+
+@pytest.mark.asyncio
+async def test_current_period_survives_events_without_ignition():
+    service, ports = build_service()
+    for _ in range(4):
+        await service.process_event(SCENARIOS["gps_position"]())
+
+    assert len(ports.periods.periodos) == 1
+    (period_id,) = ports.periods.periodos
+    assert ports.vehicles.vehicles[VEHICLE_ID].ultperiodo == period_id
+    assert {e.period_id for e in ports.vehicle_events.events} == {period_id}
+
+
+@pytest.mark.asyncio
+async def test_ignition_cycle_drives_the_driver_period():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["ignition_on"]())
+    # A repeated "on" used to fail subtracting a NULL fechahasta
+    await service.process_event(SCENARIOS["ignition_on"]())
+    await service.process_event(SCENARIOS["ignition_off"]())
+    await service.process_event(SCENARIOS["ignition_on"]())  # Within a minute
+
+    periods = sorted(
+        ports.periods.periodos_conductores.values(), key=lambda p: p.idperiodo
+    )
+    assert len(periods) == 2
+    assert periods[0].fechahasta is not None  # Closed by the repeated "on"
+    assert periods[1].fechahasta is None  # Closed by "off", then reopened
+
+
+class _Session:
+    """Records statements; UPDATE ... RETURNING yields the stored row."""
+
+    def __init__(self):
+        self.info = {}
+        self.statements = []
+        self.rows = {}
+        self._ids = itertools.count(100)
+
+    def add(self, row):
+        row.idperiodo = next(self._ids)
+        self.rows[row.idperiodo] = row
+
+    async def flush(self):
+        pass
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        period_id = stmt.whereclause.right.value
+        row = self.rows.get(period_id)
+        if row is not None and stmt.is_update:
+            (fechahasta,) = stmt._values.values()
+            row.fechahasta = fechahasta.value
+        return SimpleNamespace(scalar_one_or_none=lambda: row)
+
+
+@pytest.mark.asyncio
+async def test_warm_state_leaves_only_the_writes():
+    state = PeriodStateStore()
+    session = _Session()
+    repo = PeriodRepositoryImpl(session, period_state=state)
+
+    period_id = await repo.create_periodo_conductor("V1", 3, NOW)
+    assert len(state.drivers) == 0  # Not committed yet
+    state.apply_committed(session)
+
+    last = await repo.get_last_periodo_conductor_for_reset("V1", 3, NOW)
+    assert last.idperiodo == period_id
+    assert session.statements == []
+
+    await repo.update_periodo_conductor_end_date(period_id, NOW)
+    assert len(session.statements) == 1  # No SELECT before the UPDATE
+    state.apply_committed(session)
+    closed = await repo.get_last_periodo_conductor_for_reset(
+        "V1", 3, NOW + timedelta(seconds=10)
+    )
+    assert closed.fechahasta == NOW
+    assert len(session.statements) == 1
+
+
+def test_period_migration_only_announces_external_edits():
+    migration = next(
+        m
+        for m in load_migrations(MIGRATIONS_DIR)
+        if m.name == "period_state_invalidation"
+    )
+    sql = " ".join(migration.statements())
+    assert "INSERT" not in sql
+    assert "UPDATE OF fechahasta" not in sql and ", fechahasta" not in sql
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.adapters.database.instrumentation import (
+    QueryBudgetExceeded,
+    assert_max_statements,
+    instrument_engine,
+    instrumented,
+    statement_fingerprint,
+    track_statements,
+)
+
+engine = create_engine("sqlite://")
+instrument_engine(engine, name="test")
+
+
+def test_fingerprint_ignores_parameter_values():
+    assert statement_fingerprint(
+        "SELECT * FROM vehiculos WHERE idvehiculo = 'ABC' AND estado = 'Y'"
+    ) == statement_fingerprint(
+        "SELECT *  FROM vehiculos\n WHERE idvehiculo = 'XYZ' AND estado = 'N'"
+    )
+    assert statement_fingerprint(
+        "SELECT * FROM eventos WHERE idevento = $1"
+    ) != statement_fingerprint("SELECT * FROM vehiculos WHERE idvehiculo = $1")
+
+
+def test_statements_are_counted_per_block():
+    with engine.connect() as conn:
+        with track_statements() as counter:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+    assert counter.statements == 2
+
+
+def test_statement_budget():
+    with engine.connect() as conn:
+        with assert_max_statements(2, label="keep_alive"):
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+        with pytest.raises(QueryBudgetExceeded):
+            with assert_max_statements(1, label="keep_alive"):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+@pytest.mark.asyncio
+async def test_instrumented_counts_repository_calls():
+    @instrumented("fake_repository")
+    class FakeRepository:
+        async def lookup(self, value):
+            return value * 2
+
+    with track_statements() as counter:
+        assert await FakeRepository().lookup(21) == 42
+    assert counter.repository_calls == 1
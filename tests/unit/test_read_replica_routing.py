@@ -0,0 +1,72 @@
+import pytest
+
+from app.infrastructure.adapters.cache.local_cache import LocalCache
+from app.infrastructure.adapters.database.repositories import (
+    SpecialRouteRepositoryImpl,
+    VehicleEventRepositoryImpl,
+    VehicleRepositoryImpl,
+)
+
+
+class _EmptyResult:
+    def scalar_one_or_none(self):
+        return None
+
+    def first(self):
+        return None
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.statements.append(stmt)
+        return _EmptyResult()
+
+
+@pytest.mark.asyncio
+async def test_lookups_go_to_the_read_session():
+    primary, replica = _RecordingSession(), _RecordingSession()
+    await VehicleEventRepositoryImpl(primary, replica).find_evento_descripcion(1)
+    await VehicleRepositoryImpl(primary, replica).get_vehicle_tolerancia_tiempo("V1")
+
+    assert len(replica.statements) == 2
+    assert primary.statements == []
+
+
+@pytest.mark.asyncio
+async def test_writes_stay_on_the_primary():
+    primary, replica = _RecordingSession(), _RecordingSession()
+    await VehicleRepositoryImpl(primary, replica).get_active_vehicle_by_id("V1")
+
+    assert len(primary.statements) == 1
+    assert replica.statements == []
+
+
+@pytest.mark.asyncio
+async def test_without_replica_everything_uses_the_primary():
+    primary = _RecordingSession()
+    await VehicleEventRepositoryImpl(primary).find_evento_descripcion(1)
+    assert len(primary.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_lookups_are_loaded_from_the_primary():
+    primary, replica, lookup = (
+        _RecordingSession(),
+        _RecordingSession(),
+        _RecordingSession(),
+    )
+    await VehicleEventRepositoryImpl(
+        primary, replica, LocalCache("d"), lookup_session=lookup
+    ).find_evento_descripcion(1)
+    await VehicleRepositoryImpl(
+        primary, replica, LocalCache("t"), lookup_session=lookup
+    ).get_vehicle_tolerancia_tiempo("V1")
+    await SpecialRouteRepositoryImpl(
+        primary, replica, LocalCache("g"), lookup_session=lookup
+    ).get_initial_tiempoglobal(1)
+
+    assert len(lookup.statements) == 3
+    assert replica.statements == [] and primary.statements == []
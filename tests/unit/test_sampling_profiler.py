@@ -0,0 +1,34 @@
+import threading
+import time
+
+from app.infrastructure.adapters.profiling.sampling_profiler import (
+    SamplingProfiler,
+)
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def test_collapsed_stacks_contain_sampled_function():
+    profiler = SamplingProfiler()
+    profiler.start(threading.get_ident(), interval=0.001)
+    busy_work(0.2)
+    output = profiler.stop()
+
+    assert not profiler.running
+    lines = output.splitlines()
+    assert lines
+    assert any("busy_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert ";" in stack
+
+
+def test_focus_discards_unrelated_stacks():
+    profiler = SamplingProfiler()
+    profiler.start(threading.get_ident(), interval=0.001, focus="process_event")
+    busy_work(0.05)
+    assert profiler.stop() == ""
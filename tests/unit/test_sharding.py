@@ -0,0 +1,98 @@
+import pytest
+
+from app.infrastructure.adapters.database.sharding import (
+    DEFAULT_SHARD,
+    ShardRouter,
+    parse_mapping,
+    parse_vehicle_ranges,
+)
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class _Directory:
+    """Stands in for an async_sessionmaker over the vehicle directory."""
+
+    def __init__(self, contractors):
+        self.contractors = contractors
+        self.lookups = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.lookups += 1
+        vehicle_id = stmt.compile().params["idvehiculo_1"]
+        return _Result(self.contractors.get(vehicle_id))
+
+
+def test_parse_mapping_keeps_equals_in_values():
+    mapping = parse_mapping("east=postgresql+asyncpg://u:p@h/db?x=1, west=u2")
+    assert mapping == {"east": "postgresql+asyncpg://u:p@h/db?x=1", "west": "u2"}
+    with pytest.raises(ValueError):
+        parse_mapping("east")
+
+
+def test_vehicle_ranges_compare_numeric_ids_as_numbers():
+    (first,) = parse_vehicle_ranges("2:1000=east")
+    assert first.contains("999")
+    assert not first.contains("1001")
+    with pytest.raises(ValueError):
+        parse_vehicle_ranges("2-1000=east")
+
+
+@pytest.mark.asyncio
+async def test_ranges_win_then_contractor_then_default():
+    directory = _Directory({"V1": "ACME", "V2": "OTHER"})
+    router = ShardRouter(
+        ["east", "west"],
+        directory,
+        contractor_shards={"ACME": "west"},
+        vehicle_ranges=parse_vehicle_ranges("1:500=east"),
+    )
+
+    assert await router.shard_for_vehicle("42") == "east"
+    assert await router.shard_for_vehicle("V1") == "west"
+    assert await router.shard_for_vehicle("V2") == DEFAULT_SHARD
+    assert await router.shard_for_vehicle(None) == DEFAULT_SHARD
+    assert directory.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_resolutions_are_cached_until_invalidated():
+    directory = _Directory({"V1": "ACME"})
+    router = ShardRouter(["west"], directory, contractor_shards={"ACME": "west"})
+
+    for _ in range(3):
+        assert await router.shard_for_vehicle("V1") == "west"
+    assert directory.lookups == 1
+
+    directory.contractors["V1"] = "NEW"
+    router.invalidate("V1")
+    assert await router.shard_for_vehicle("V1") == DEFAULT_SHARD
+
+
+@pytest.mark.asyncio
+async def test_single_database_never_queries_the_directory():
+    directory = _Directory({"V1": "ACME"})
+    router = ShardRouter([], directory, contractor_shards={})
+    assert not router.enabled
+    assert await router.shard_for_vehicle("V1") == DEFAULT_SHARD
+    assert directory.lookups == 0
+
+
+def test_unknown_target_shard_is_rejected():
+    with pytest.raises(ValueError):
+        ShardRouter(["east"], _Directory({}), contractor_shards={"ACME": "north"})
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.infrastructure.adapters.metrics.prometheus_metrics import (
+    PrometheusMetricsRecorder,
+    event_type_label,
+)
+from app.infrastructure.config.settings import settings
+from app.infrastructure.dependencies import get_vehicle_event_processor_service
+from app.main import app
+from tests.fakes.scenarios import VEHICLE_ID, build_service
+
+
+def _payload(vehicle_id: str) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "tipo": 0,
+        "idveh": vehicle_id,
+        "idevento_": 2,
+        "fechasys_": now,
+        "speed": 35.0,
+        "lat": "N10.98310",
+        "lon": "W074.78520",
+        "odometer": 15234.5,
+        "ip": "10.0.0.15",
+        "port": 5001,
+        "indexgeocerca": 0,
+        "vehicleon_": True,
+        "signal_": "OK",
+        "realtime_": now,
+        "address_": "Calle 72",
+        "city_": "Barranquilla",
+        "department_": "Atlantico",
+        "fechakeep": now,
+    }
+
+
+def _stage_counts(text: str) -> dict:
+    (family,) = [
+        f
+        for f in text_string_to_metric_families(text)
+        if f.name == "vehicle_event_stage_duration_seconds"
+    ]
+    return {
+        s.labels["stage"]: s.value
+        for s in family.samples
+        if s.name.endswith("_count") and s.labels["event_code_class"] == "other"
+    }
+
+
+@pytest.fixture
+def client():
+    service, _ = build_service()
+    service.metrics = PrometheusMetricsRecorder()
+    app.dependency_overrides[get_vehicle_event_processor_service] = lambda: service
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_processed_events_show_up_in_the_scrape(client):
+    async with client:
+        before = _stage_counts((await client.get("/metrics/")).text)
+        for vehicle_id in (VEHICLE_ID, "UNKNOWN1"):  # The second one is INACTIVO
+            response = await client.post(
+                "/vehicle-events/process-vehicle-event",
+                json=_payload(vehicle_id),
+                headers={"X-API-Key": settings.API_KEY},
+            )
+            assert response.status_code == 200
+        after = _stage_counts((await client.get("/metrics/")).text)
+
+    def delta(stage):
+        return after.get(stage, 0) - before.get(stage, 0)
+
+    assert delta("total") == 2
+    assert delta("vehicle_lookup") == 2
+    assert delta("event_insert") == 1
+
+
+def test_unknown_event_types_share_one_label():
+    assert [event_type_label(t) for t in (0, 300, 128)] == ["0", "300", "128"]
+    assert {event_type_label(t) for t in (1, 7, 99999, -3)} == {"other"}
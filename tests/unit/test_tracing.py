@@ -0,0 +1,75 @@
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from app.infrastructure.adapters.database import instrumentation
+from app.infrastructure.adapters.database.instrumentation import (
+    instrumented,
+)
+from app.infrastructure.adapters.tracing import tracing
+from app.infrastructure.adapters.tracing.tracing import (
+    configure_tracing,
+    extract_kafka_context,
+    inject_kafka_headers,
+    shutdown_tracing,
+)
+from app.infrastructure.config.settings import settings
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """SDK tracer recording to memory, swapped in for this test only; the
+    global tracer provider is never touched."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    sdk_tracer = provider.get_tracer("test")
+    monkeypatch.setattr(tracing, "tracer", sdk_tracer)
+    monkeypatch.setattr(instrumentation, "tracer", sdk_tracer)
+    yield sdk_tracer, exporter
+    provider.shutdown()
+
+
+@instrumented("vehicle_repository")
+class FakeVehicleRepository:
+    async def get_active_vehicle_by_id(self, vehicle_id):
+        return vehicle_id
+
+
+@pytest.mark.asyncio
+async def test_repository_calls_are_child_spans(spans):
+    tracer, exporter = spans
+    with tracer.start_as_current_span("process_vehicle_event") as parent:
+        await FakeVehicleRepository().get_active_vehicle_by_id("ABC123")
+
+    finished = {span.name: span for span in exporter.get_finished_spans()}
+    child = finished["vehicle_repository.get_active_vehicle_by_id"]
+    assert child.parent.span_id == parent.get_span_context().span_id
+
+
+def test_kafka_headers_carry_trace_context(spans):
+    tracer, _ = spans
+    with tracer.start_as_current_span("kafka.publish") as span:
+        headers = inject_kafka_headers()
+
+    assert any(key == "traceparent" for key, _ in headers)
+    remote = trace.get_current_span(extract_kafka_context(headers))
+    assert remote.get_span_context().trace_id == span.get_span_context().trace_id
+
+
+def test_shutdown_closes_the_file_exporter(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE_PATH", str(tmp_path / "spans.jsonl"))
+    monkeypatch.setattr(trace, "set_tracer_provider", lambda provider: None)
+
+    configure_tracing()
+    out = tracing._export_file
+    shutdown_tracing()
+
+    assert out.closed
+    assert tracing._export_file is None and tracing._provider is None
@@ -0,0 +1,83 @@
+import pytest
+
+from tests.fakes.scenarios import SCENARIOS, VEHICLE_ID, build_service
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_updates_vehicle_without_saving_event():
+    service, ports = build_service()
+    message = await service.process_event(SCENARIOS["keep_alive"]())
+
+    assert "Vivo" in message
+    assert ports.vehicle_events.events == []
+    assert len(ports.publisher.published) == 1
+
+
+@pytest.mark.asyncio
+async def test_gps_event_is_saved_and_summarised():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["gps_position"]())
+    await service.process_event(SCENARIOS["gps_position"]())
+
+    assert len(ports.vehicle_events.events) == 2
+    (summary,) = ports.vehicle_events.resumen.values()
+    assert summary.valor == 2
+    assert ports.vehicles.vehicles[VEHICLE_ID].latitud == "N10.98310"
+    assert ports.vehicles.resources[("R-305", "SOBUSA")][1] == "OK"
+
+
+@pytest.mark.asyncio
+async def test_ignition_on_then_off_opens_and_closes_period():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["ignition_on"]())
+    period_id = ports.vehicles.vehicles[VEHICLE_ID].ultperiodo
+    assert ports.periods.periodos[period_id].fechahasta is None
+
+    await service.process_event(SCENARIOS["ignition_off"]())
+    assert ports.periods.periodos[period_id].fechahasta is not None
+
+
+@pytest.mark.asyncio
+async def test_no_gps_falls_back_to_last_known_position():
+    service, ports = build_service()
+    message = await service.process_event(SCENARIOS["no_gps"]())
+
+    assert "ultima info valida" in message
+    assert ports.vehicle_events.events[0].latitude_raw == "N10.98000"
+
+
+@pytest.mark.asyncio
+async def test_ota_updates_position():
+    service, ports = build_service()
+    message = await service.process_event(SCENARIOS["ota_position"]())
+
+    assert "OTA" in message
+    assert ports.vehicles.vehicles[VEHICLE_ID].direccion == "Via 40"
+
+
+@pytest.mark.asyncio
+async def test_special_route_records_control_point():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["special_route"]())
+
+    (control,) = ports.special_routes.controles
+    assert control.idpunto == 100
+    assert control.idprogramacion == 1
+
+
+@pytest.mark.asyncio
+async def test_control_point_is_recorded_once_per_program():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["special_route"]())
+    await service.process_event(SCENARIOS["special_route"]())
+
+    assert len(ports.special_routes.controles) == 1
+
+
+@pytest.mark.asyncio
+async def test_stages_are_reported_to_metrics():
+    service, ports = build_service()
+    await service.process_event(SCENARIOS["gps_position"]())
+
+    stages = {stage for stage, *_ in ports.metrics.stages}
+    assert {"vehicle_lookup", "event_insert", "publish", "total"} <= stages
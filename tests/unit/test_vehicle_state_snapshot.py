@@ -0,0 +1,178 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.domain.entities import Vehicle
+from app.infrastructure.adapters.cache.vehicle_state import (
+    HEADER,
+    RECORD,
+    VehicleStateStore,
+    encode_vehicle,
+    read_snapshot,
+    write_snapshot,
+)
+
+UPDATED = datetime(2025, 8, 20, 10, 30, 15, 123456)
+
+
+def _vehicle(vehicle_id="V1", **overrides) -> Vehicle:
+    fields = dict(
+        idvehiculo=vehicle_id,
+        estado="Y",
+        velocidad=42.5,
+        direccion="Calle 72 # 45-10",
+        latitud="10.96850",
+        longitud="-74.78130",
+        ultperiodo=991,
+        idconductor=7,
+        idconductor_actual=7,
+        ultimaactualizacion=UPDATED,
+        encendido=True,
+        indexevento=123456789012,
+        contratista="ACME",
+    )
+    fields.update(overrides)
+    return Vehicle(**fields)
+
+
+def test_snapshot_round_trips_through_the_memory_map(tmp_path):
+    path = str(tmp_path / "vehicles.snap")
+    vehicles = [_vehicle("V1"), _vehicle("V2", encendido=None, municipio="Soledad")]
+    too_long = _vehicle("V3", direccion="x" * 500)
+
+    assert write_snapshot(path, vehicles + [too_long]) == (2, 1)
+    assert os.path.getsize(path) == HEADER.size + 2 * RECORD.size
+    assert read_snapshot(path) == vehicles
+
+
+def test_unusable_snapshots_are_ignored(tmp_path):
+    assert read_snapshot(str(tmp_path / "missing.snap")) == []
+
+    path = tmp_path / "vehicles.snap"
+    write_snapshot(str(path), [_vehicle("V1"), _vehicle("V2")])
+    path.write_bytes(path.read_bytes()[:-10])
+    assert read_snapshot(str(path)) == []
+
+    path.write_bytes(b"XXXX" + encode_vehicle(_vehicle()))
+    assert read_snapshot(str(path)) == []
+
+
+def test_updates_reach_the_store_only_after_commit():
+    store = VehicleStateStore(path="unused")
+    session = SimpleNamespace(info={})
+    store.stage(session, _vehicle(velocidad=10.0))
+    assert store.get("V1") is None
+
+    store.apply_committed(session)
+    cached = store.get("V1")
+    assert cached.velocidad == 10.0
+    cached.velocidad = 99.0  # Callers get copies
+    assert store.get("V1").velocidad == 10.0
+
+
+class _Directory:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_entries_that_changed_while_down(tmp_path):
+    path = str(tmp_path / "vehicles.snap")
+    write_snapshot(
+        path, [_vehicle("V1"), _vehicle("V2"), _vehicle("V3"), _vehicle("V4")]
+    )
+    later = datetime(2025, 8, 21)
+    shard_a = _Directory(
+        [
+            ("V1", UPDATED, "Y", "ACME", 7, None, None),  # unchanged
+            ("V2", later, "Y", "ACME", 7, None, None),  # moved since
+        ]
+    )
+    shard_b = _Directory([("V3", UPDATED, "N", "ACME", 7, None, None)])  # off
+
+    store = VehicleStateStore(path=path, interval=3600)
+    await store.start([shard_a, shard_b])
+    try:
+        assert store.get("V1") is not None
+        assert [store.get(v) for v in ("V2", "V3", "V4")] == [None, None, None]
+    finally:
+        await store.stop()
+
+
+_WIRING = """
+import asyncio
+
+from app.infrastructure.adapters.cache.invalidation import InvalidationListener
+from app.infrastructure.adapters.cache.vehicle_state import VehicleStateStore
+import app.main as main
+
+calls = []
+
+
+async def _listen(self):
+    calls.append("listen")
+    self.ready.set()
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+async def _start(self, directories):
+    calls.append("start")
+
+
+async def _stop(self):
+    calls.append("stop")
+
+
+InvalidationListener.start = _listen
+InvalidationListener.stop = _noop
+VehicleStateStore.start = _start
+VehicleStateStore.stop = _stop
+main.prewarm_pool = _noop
+
+
+async def _run():
+    async with main.lifespan(main.app):
+        pass
+
+
+asyncio.run(_run())
+assert len(main.vehicle_state) == 0, "expected an empty store"
+assert calls == ["listen", "start", "stop"], calls
+"""
+
+
+def test_empty_store_is_still_wired_into_startup(tmp_path):
+    # A fresh store is empty, and so falsy: only the flag may decide
+    env = {
+        **os.environ,
+        "VEHICLE_STATE_CACHE_ENABLED": "true",
+        "VEHICLE_SNAPSHOT_PATH": str(tmp_path / "vehicles.snap"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _WIRING],
+        cwd=Path(__file__).resolve().parents[2],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.adapters.database.repositories import (
+    VehicleEventRepositoryImpl,
+    VehicleRepositoryImpl,
+)
+from app.infrastructure.adapters.database.write_behind import (
+    OdometerWriter,
+    ResourceStatusWriter,
+    WriteBehindWriter,
+)
+
+NOW = datetime(2024, 5, 1, 6, 0, 0)
+
+
+class _Session:
+    """Records statements; fails them while ``fail`` is set."""
+
+    def __init__(self, log):
+        self.info = {}
+        self.log = log
+        self.fail = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def begin(self):
+        return self
+
+    async def execute(self, stmt):
+        if self.fail:
+            raise ConnectionResetError("connection lost")
+        self.log.append(stmt)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _params(stmt) -> dict:
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+@pytest.mark.asyncio
+async def test_resource_status_is_staged_until_commit_and_coalesced():
+    log = []
+    writer = ResourceStatusWriter(lambda: _Session(log))
+    session = _Session([])
+    repo = VehicleRepositoryImpl(session, resource_writer=writer)
+
+    await repo.update_resource_gps_status("R1", "C1", NOW, True)
+    await repo.update_resource_gps_status("R1", "C1", NOW + timedelta(seconds=5), False)
+    await repo.update_resource_gps_status("R2", "C1", NOW, True)
+    assert session.log == [] and writer.pending_count() == 0
+
+    writer.apply_committed(session)
+    # A late, older event does not overwrite the newer status
+    late = _Session([])
+    writer.stage(late, ("R1", "C1", NOW - timedelta(seconds=5), "OK"))
+    writer.apply_committed(late)
+
+    assert await writer.flush() == 2
+    (stmt,) = log
+    sql = _sql(stmt)
+    assert sql.startswith('UPDATE "Recursos"') and "FROM (VALUES" in sql
+    assert writer.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_event_writes_nothing():
+    writer = OdometerWriter(lambda: _Session([]))
+    session = _Session([])
+    await VehicleEventRepositoryImpl(session, odometer_writer=writer).save_odometer(
+        "V1", 10.0, NOW
+    )
+    session.info.clear()  # What the session holds after a rollback
+    writer.apply_committed(session)
+    assert writer.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_odometer_readings_are_filtered_and_inserted_in_bulk():
+    log = []
+    writer = OdometerWriter(lambda: _Session(log), min_delta=1.0, min_interval=60)
+    session = _Session([])
+    for seconds, value in [(0, 100.0), (10, 100.5), (20, 102.0), (120, 102.1)]:
+        writer.stage(session, ("V1", value, NOW + timedelta(seconds=seconds)))
+    writer.stage(session, ("V2", 50.0, NOW))
+    writer.apply_committed(session)
+
+    assert await writer.flush() == 4  # 100.5 moved too little, too soon
+    (stmt,) = log
+    assert "ON CONFLICT (idvehiculo, fecha) DO NOTHING" in _sql(stmt)
+    assert sorted(v for k, v in _params(stmt).items() if k.startswith("valor")) == [
+        50.0,
+        100.0,
+        102.0,
+        102.1,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_the_batch_for_the_next_one():
+    log = []
+    flush_session = _Session(log)
+    writer = ResourceStatusWriter(lambda: flush_session)
+    session = _Session([])
+    writer.stage(session, ("R1", "C1", NOW, "OK"))
+    writer.apply_committed(session)
+
+    flush_session.fail = True
+    with pytest.raises(ConnectionResetError):
+        await writer.flush()
+    # Newer status arrived meanwhile; it wins over the restored one
+    writer.stage(session, ("R1", "C1", NOW + timedelta(seconds=1), "NOTOK"))
+    writer.apply_committed(session)
+    flush_session.fail = False
+    assert await writer.flush() == 1
+    assert _params(log[0])["param_4"] == "NOTOK"
+
+
+def test_odometer_buffer_drops_the_oldest_beyond_max_pending():
+    writer = OdometerWriter(lambda: _Session([]), max_pending=2)
+    session = _Session([])
+    for minute in range(3):
+        writer.stage(session, ("V1", float(minute), NOW + timedelta(minutes=minute)))
+    writer.apply_committed(session)
+    assert [value for _, value, _ in writer._take(10)] == [1.0, 2.0]
+
+
+def test_writer_missing_a_hook_fails_when_built():
+    class _NoRestore(OdometerWriter):
+        _restore = WriteBehindWriter._restore
+
+    with pytest.raises(TypeError, match="_restore"):
+        _NoRestore(lambda: _Session([]))